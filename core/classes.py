@@ -1,5 +1,6 @@
 # core/classes.py
 from __future__ import annotations
+import random
 from typing import Any, Dict, List, Tuple, Optional
 
 from core.ac import calc_ac
@@ -12,7 +13,7 @@ except Exception:
 try:
     from core.spell_training import learn_spells_for_level
 except Exception:
-    def learn_spells_for_level(f, level):
+    def learn_spells_for_level(f, level, rng=None):
         return
 
 def _cap_spell_slots_for_class(cls_name: str, pad_slots: list) -> list:
@@ -248,10 +249,10 @@ pad = [0] + slots
     f["spell_slots_total"] = pad[:]
     if not f.get("spell_slots_current"): f["spell_slots_current"] = pad[:]
 
-def _apply_skald_level(f: Dict[str, Any], L: int) -> None:
+def _apply_skald_level(f: Dict[str, Any], L: int, rng: Optional[random.Random] = None) -> None:
     _apply_skald_casting_for_level(f, L)
     try:
-        learn_spells_for_level(f, L)
+        learn_spells_for_level(f, L, rng)
     except Exception:
         pass
     if L >= 6: f["skald_aura_charm_fear"] = True
@@ -287,10 +288,10 @@ def _apply_warpriest_casting_for_level(f: Dict[str, Any], L: int) -> None:
     f["spell_slots_total"] = pad[:]
     if not f.get("spell_slots_current"): f["spell_slots_current"] = pad[:]
 
-def _apply_warpriest_level(f: Dict[str, Any], L: int) -> None:
+def _apply_warpriest_level(f: Dict[str, Any], L: int, rng: Optional[random.Random] = None) -> None:
     _apply_warpriest_casting_for_level(f, L)
     try:
-        learn_spells_for_level(f, L)
+        learn_spells_for_level(f, L, rng)
     except Exception:
         pass
 
@@ -338,10 +339,10 @@ def _apply_druid_casting_for_level(f: Dict[str, Any], L: int) -> None:
     f["wildshape_cast_while_shaped"] = (L >= 18)
     f["spell_slots_unlimited"] = (L >= 20)
 
-def _apply_druid_level(f: Dict[str, Any], L: int) -> None:
+def _apply_druid_level(f: Dict[str, Any], L: int, rng: Optional[random.Random] = None) -> None:
     _apply_druid_casting_for_level(f, L)
     try:
-        learn_spells_for_level(f, L)
+        learn_spells_for_level(f, L, rng)
     except Exception:
         pass
 
@@ -461,10 +462,10 @@ pad = [0] + _wiz_slots_for_level(L)
     f["wiz_aoe_ally_exempt"] = 3 if L >= 17 else (2 if L >= 10 else (1 if L >= 3 else 0))
     f["ac"] = calc_ac(f)
 
-def _apply_wizard_level(f: Dict[str, Any], L: int) -> None:
+def _apply_wizard_level(f: Dict[str, Any], L: int, rng: Optional[random.Random] = None) -> None:
     _apply_wizard_init(f)
     try:
-        learn_spells_for_level(f, L)
+        learn_spells_for_level(f, L, rng)
     except Exception:
         pass
 
@@ -558,24 +559,25 @@ def ensure_class_features(f: Dict[str, Any]) -> None:
     _recompute_hp_from_formula(f)
     f["ac"] = calc_ac(f)
 
-def apply_class_level_up(f: Dict[str, Any], new_level: int) -> None:
+def apply_class_level_up(f: Dict[str, Any], new_level: int, rng: Optional[random.Random] = None) -> None:
+    """Level-`new_level` class features; `rng` drives spell picks (see core.spell_training.learn_spells_for_level)."""
     cls = _norm_class(f.get("class", ""))
     if cls == "Berserker":
         if new_level in _BERSERKER_ASI:
             caps = {"STR":20, "DEX":20, "CON":20, "INT":20, "CHA":20}
             _allocate_asi_via_training(f, points=2, hard_caps=caps)
     elif cls == "Skald":
-        _apply_skald_level(f, new_level)
+        _apply_skald_level(f, new_level, rng)
         if _skald_needs_asi(new_level):
             caps = {"STR":20, "DEX":20, "CON":20, "INT":20, "CHA":20}
             _allocate_asi_via_training(f, points=2, hard_caps=caps)
     elif cls == "War Priest":
-        _apply_warpriest_level(f, new_level)
+        _apply_warpriest_level(f, new_level, rng)
         if _warpriest_needs_asi(new_level):
             caps = {"STR":20, "DEX":20, "CON":20, "INT":20, "CHA":20}
             _allocate_asi_via_training(f, points=2, hard_caps=caps)
     elif cls == "Druid":
-        _apply_druid_level(f, new_level)
+        _apply_druid_level(f, new_level, rng)
         if _druid_needs_asi(new_level):
             caps = {"STR":20, "DEX":20, "CON":20, "INT":20, "CHA":20}
             _allocate_asi_via_training(f, points=2, hard_caps=caps)
@@ -590,7 +592,7 @@ def apply_class_level_up(f: Dict[str, Any], new_level: int) -> None:
             caps = {"STR":20, "DEX":20, "CON":20, "INT":20, "CHA":20}
             _allocate_asi_via_training(f, points=2, hard_caps=caps)
     elif cls == "Wizard":
-        _apply_wizard_level(f, new_level)
+        _apply_wizard_level(f, new_level, rng)
         if _wizard_needs_asi(new_level):
             caps = {"STR":20, "DEX":20, "CON":20, "INT":20, "CHA":20}
             _allocate_asi_via_training(f, points=2, hard_caps=caps)
@@ -18,6 +18,12 @@ TIEBREAKERS = ("KILL_DIFF", "HEAD_TO_HEAD")
 # -------- Match / Grid --------
 TURN_LIMIT: int = 100
 
+# -------- Simulation --------
+SIM_WORKERS: int = 0                 # processes for AI-vs-AI week sims (0/1 = serial on the caller's thread)
+SIM_FIDELITY: str = "full"           # AI-vs-AI fixtures: "full" engine; opt in to "reduced" (analytic) or "surrogate" (fitted model)
+SIM_FIDELITY_RIVALS: str = "full"    # fixtures involving one of the user's rivals (when SIM_FIDELITY is reduced/surrogate)
+RIVAL_WINDOW: int = 2                # rivals = clubs within this many table places of the user
+
 # -------- RNG / Seeds --------
 DEFAULT_SEED: int = 1337
 
@@ -16,10 +16,10 @@ _rng = random.Random()
 STD_ARRAY: List[int] = [16, 14, 12, 10, 8]
 ABIL_KEYS: List[str] = ["STR", "DEX", "CON", "INT", "CHA"]  # WIS removed project-wide
 
-def _weighted_choice(weights: Dict[str, float]) -> str:
+def _weighted_choice(weights: Dict[str, float], rng: random.Random = _rng) -> str:
     items = list(weights.items())
     total = sum(w for _, w in items) or 1.0
-    pick = _rng.random() * total
+    pick = rng.random() * total
     acc = 0.0
     for key, w in items:
         acc += w
@@ -78,7 +78,7 @@ def _choose_race(team: Dict[str, Any] | None, rng: random.Random) -> str:
     weights = (team or {}).get("race_weights") or DEFAULT_RACE_WEIGHTS
     for r in RACES:
         weights.setdefault(r, 1.0)
-    return _weighted_choice(weights)
+    return _weighted_choice(weights, rng)
 
 def _assign_dev_trait(rng: random.Random) -> str:
     pools = [("bad", 0.12), ("normal", 0.58), ("star", 0.22), ("superstar", 0.08)]
@@ -94,14 +94,18 @@ def _uniform_fighter_style(rng: random.Random) -> str:
     # If the base class selection returns "Fighter", choose a style name to display as class
     return rng.choice(sorted(FIGHTER_STYLE_CLASSES))
 
-def generate_fighter(team: Dict[str, Any] | None = None, seed: int | None = None) -> Dict[str, Any]:
+def generate_fighter(team: Dict[str, Any] | None = None, seed: int | None = None,
+                     rng: random.Random | None = None) -> Dict[str, Any]:
     """
     Primary player generator.
+    - Randomness: `rng` if given (e.g. a core.rng.CounterRNG stream for this roster slot), else
+      random.Random(seed), else the module RNG. The fighter keeps a stream key drawn from it
+      (`rng_key`), so a career seeded stream also seeds the spells it learns later.
     - Uses five-stat array (no WIS).
     - Class chosen via ratings.CLASS_FIT_WEIGHTS (already updated to renamed classes).
     - Stores xp_total for new progression system (xp leveling is applied post-match).
     """
-    rng = _rng if seed is None else random.Random(seed)
+    if rng is None: rng = _rng if seed is None else random.Random(seed)
 
     race = _choose_race(team, rng)
     base = _roll_standard_array(rng)
@@ -148,6 +152,8 @@ def generate_fighter(team: Dict[str, Any] | None = None, seed: int | None = None
         "origin": (team or {}).get("country"),
         "age": rng.randint(18, 38),
         "dev_trait": dev_trait,
+        # this fighter's stream key (spell picks on level-ups without a match stream)
+        "rng_key": rng.getrandbits(64),
 
         # Progression scaffolding (new canonical field)
         "xp_total": 0,
@@ -0,0 +1,260 @@
+# core/matchups.py
+from __future__ import annotations
+import hashlib, json, math, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.rng import derive
+
+# Class-vs-class matchup matrix.
+# How does class X at level L fare 1v1 against class Y at level M: every (class, level) pair of the
+# CLASS_STARTING_KIT classes and levels 1-20, played with standard fighters (standard_fighter) on
+# the engine's default headless path. Both sides of a cell play half the seeds as the roster's
+# first actor, so the cell is symmetric: p(Y, M vs X, L) = 1 - p(X, L vs Y, M) - draws.
+#
+# Storage: data/matchups/<rules fingerprint>.json, flat count arrays over the fixed universe of
+# (class, level) entries, so a query is two dict lookups and an index (MatchupMatrix.win_prob).
+# The fingerprint hashes the rule sources (RULES_FILES): editing engine/tbcombat.py or
+# core/classes.py points load_matrix at a new, empty file, and the old results are never read.
+# build_matrix fills only missing cells, on a process pool, saving as chunks finish; an
+# interrupted build resumes where it stopped. Teams are estimated by decomposition into pairings
+# (MatchupMatrix.team_win_prob).
+#
+#   python -m tools.build_matchups build --levels 1-20 --seeds 200
+
+ROOT = Path(__file__).resolve().parent.parent
+MATCHUPS_DIR = ROOT / "data" / "matchups"
+RULES_FILES: Tuple[str, ...] = ("engine/tbcombat.py", "core/classes.py", "engine/profiles.py",
+                                "engine/class_features.py", "engine/lockstep.py")
+MATRIX_VERSION = 1
+LEVELS: Tuple[int, ...] = tuple(range(1, 21))
+MATRIX_SEED = 0x4D41544348   # "MATCH"
+CELL_SEEDS = 200
+MAX_TURNS = 400
+# Team decomposition (team_win_prob): home log-odds = PAIR_SCALE * mean pairing log-odds
+# + SIZE_LOGIT * log(home size / away size). Fitted against direct team sims with
+# `tools.build_matchups teams` (mean abs error ~0.07 on teams of 2-4, levels 1/5/10).
+PAIR_SCALE = 1.25
+SIZE_LOGIT = 10.0
+
+try:
+    from core.classes import CLASS_STARTING_KIT, ensure_class_features, grant_starting_kit
+    MAIN_HANDS: Dict[str, Dict[str, Any]] = {c: kit["weapons"][0] for c, kit in CLASS_STARTING_KIT.items() if kit.get("weapons")}
+    MATCHUP_CLASSES: Tuple[str, ...] = tuple(CLASS_STARTING_KIT)
+except Exception:  # class tables unavailable: the same main hands, no class setup
+    CLASS_STARTING_KIT = None
+    ensure_class_features = grant_starting_kit = None
+    MAIN_HANDS = {
+        "Berserker": {"name": "Greataxe", "dice": "1d12", "ability": "STR", "two_handed": True},
+        "Archer": {"name": "Longbow", "dice": "1d8", "ability": "DEX", "ranged": True, "range": (2, 4), "two_handed": True},
+        "Defender": {"name": "Longsword", "dice": "1d8", "ability": "STR", "versatile": True, "two_handed_dice": "1d10"},
+        "Duelist": {"name": "Shortsword", "dice": "1d6", "finesse": True},
+        "Stalker": {"name": "Longbow", "dice": "1d8", "ability": "DEX", "ranged": True, "range": (2, 4), "two_handed": True},
+        "War Priest": {"name": "Mace", "dice": "1d6", "ability": "STR"},
+        "Wizard": {"name": "Quarterstaff", "dice": "1d6", "versatile": True, "two_handed_dice": "1d8"},
+        "Crusader": {"name": "Warhammer", "dice": "1d8", "ability": "STR", "versatile": True, "two_handed_dice": "1d10"},
+    }
+    MATCHUP_CLASSES = tuple(MAIN_HANDS)
+
+
+# ---------------- Rules fingerprint ----------------
+@lru_cache(maxsize=1)
+def rules_fingerprint() -> str:
+    """sha256 over the rule sources (a missing file hashes as absent) and MATRIX_VERSION."""
+    h = hashlib.sha256(f"v{MATRIX_VERSION}|{','.join(MATCHUP_CLASSES)}".encode())
+    for rel in RULES_FILES:
+        h.update(rel.encode())
+        try: h.update((ROOT / rel).read_bytes())
+        except OSError: h.update(b"\0missing")
+    return h.hexdigest()
+
+def matrix_path(fingerprint: Optional[str] = None) -> Path:
+    return MATCHUPS_DIR / f"{(fingerprint or rules_fingerprint())[:16]}.json"
+
+
+# ---------------- Standard fighters ----------------
+_STANDARD_ARRAY = (15, 14, 13, 12, 10)
+_ASI_LEVELS = (4, 8, 12, 16, 19)
+
+def standard_fighter(cls: str, level: int, team_id: int = 0, name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    A fighter dict for matchup cells: the standard array in the class's fit-weight order (core.ratings),
+    +2 to the best stat at each ASI level (cap 20), then class setup and starting kit from core.classes.
+    """
+    from core.ratings import CLASS_FIT_WEIGHTS, CLASS_PROFILES, _normalize_class_key  # late: ratings pulls in the spell tables
+    key = _normalize_class_key(cls); w = CLASS_FIT_WEIGHTS.get(key, CLASS_FIT_WEIGHTS["fighter"])
+    order = sorted(w, key=lambda k: -w[k])   # stable: ties keep STR, DEX, CON, INT, CHA
+    stats = {k.upper(): v for k, v in zip(order, _STANDARD_ARRAY, strict=True)}; stats["WIS"] = 10
+    for lv in _ASI_LEVELS:
+        if level < lv: break
+        for k in (order[0].upper(), order[1].upper()):
+            if stats[k] < 20: stats[k] = min(20, stats[k] + 2); break
+    f = {"pid": f"{cls}-{level}-{team_id}", "name": name or f"{cls} L{level}", "class": cls, "level": int(level),
+         "team_id": team_id, "alive": True, "tx": 0, "ty": team_id, **stats}
+    if ensure_class_features is not None:
+        f["hp"] = 10**6  # capped at the class formula
+        ensure_class_features(f); grant_starting_kit(f)
+    else:
+        die = CLASS_PROFILES.get(key, CLASS_PROFILES["fighter"])["hit_die"]; con = (stats["CON"] - 10) // 2
+        f["hp"] = f["max_hp"] = die + con + (level - 1) * (die // 2 + 1 + con)
+        f["ac"] = 12 + (stats["DEX"] - 10) // 2
+        item = MAIN_HANDS.get(cls)
+        if item: f["inventory"] = {"weapons": [dict(item, id="w_0")]}; f["equipped"] = {"main_hand_id": "w_0"}
+    return f
+
+
+# ---------------- Playing cells ----------------
+def play_cell(a: Tuple[str, int], b: Tuple[str, int], seeds: int = CELL_SEEDS, engine: str = "scalar") -> Tuple[int, int, int]:
+    """(seeds, wins of a, wins of b) for `a` vs `b` 1v1; each side is listed first for half the seeds."""
+    from engine.model import actor_from_dict  # late: engine imports core.tactics
+    fa = standard_fighter(a[0], a[1], 0, "A"); fb = standard_fighter(b[0], b[1], 1, "B")
+    half = seeds // 2; wa = wb = 0
+    if engine == "lockstep":
+        from engine.lockstep import run_lockstep
+        for first, n, k in (((fa, fb), half, 0), ((fb, fa), seeds - half, 1)):
+            r = run_lockstep([actor_from_dict(dict(f)) for f in first], n, seed=derive(MATRIX_SEED, *a, *b, k),
+                             max_rounds=MAX_TURNS)
+            wa += int((r.winner == 0).sum()); wb += int((r.winner == 1).sum())
+        return seeds, wa, wb
+    from engine.events import NullSink
+    from engine.tbcombat import TBCombat
+    for i in range(seeds):
+        first = (fa, fb) if i < half else (fb, fa)
+        c = TBCombat(None, None, [actor_from_dict(dict(f)) for f in first], 8, 8, seed=derive(MATRIX_SEED, *a, *b, i),
+                     events=NullSink(), rng_kind="counter")
+        turns = 0
+        while c.winner is None and turns < MAX_TURNS: c.take_turn(); turns += 1
+        wa += c.winner == 0; wb += c.winner == 1
+    return seeds, wa, wb
+
+def _play_chunk(pairs: Sequence[Tuple[int, int]], entries: Sequence[Tuple[str, int]], seeds: int,
+                engine: str) -> List[Tuple[int, int, int, int, int]]:
+    return [(i, j, *play_cell(entries[i], entries[j], seeds, engine)) for i, j in pairs]
+
+
+# ---------------- Matrix ----------------
+class MatchupMatrix:
+    """
+    Counts per ordered cell over the fixed universe of (class, level) entries, flat row-major:
+    cell (i, j) = entry i vs entry j, stored for both orders. Missing cells have n == 0.
+    """
+    __slots__ = ("fingerprint", "classes", "levels", "entries", "_index", "n", "wins", "meta")
+
+    def __init__(self, fingerprint: str, classes: Sequence[str] = MATCHUP_CLASSES, levels: Sequence[int] = LEVELS):
+        self.fingerprint = fingerprint; self.classes = tuple(classes); self.levels = tuple(levels)
+        self.entries: Tuple[Tuple[str, int], ...] = tuple((c, lv) for c in self.classes for lv in self.levels)
+        self._index = {e: i for i, e in enumerate(self.entries)}
+        size = len(self.entries) ** 2
+        self.n = [0] * size; self.wins = [0] * size
+        self.meta: Dict[str, Any] = {}
+
+    def __len__(self) -> int: return len(self.entries)
+    def index(self, cls: str, level: int) -> Optional[int]: return self._index.get((cls, int(level)))
+
+    # ---- queries (O(1)) ----
+    def record(self, cls_a: str, level_a: int, cls_b: str, level_b: int) -> Optional[Tuple[int, int, int]]:
+        """(games, wins of a, wins of b), or None when the cell has not been built."""
+        i = self.index(cls_a, level_a); j = self.index(cls_b, level_b)
+        if i is None or j is None: return None
+        k = i * len(self.entries) + j; n = self.n[k]
+        return (n, self.wins[k], self.wins[j * len(self.entries) + i]) if n else None
+    def win_prob(self, cls_a: str, level_a: int, cls_b: str, level_b: int) -> Optional[float]:
+        """P(a beats b) 1v1, draws counted as half a win; None when the cell has not been built."""
+        r = self.record(cls_a, level_a, cls_b, level_b)
+        if r is None: return None
+        n, wa, wb = r
+        return (wa + 0.5 * (n - wa - wb)) / n
+
+    def team_win_prob(self, home: Sequence[Tuple[str, int]], away: Sequence[Tuple[str, int]]) -> Optional[float]:
+        """
+        Decomposition estimate for small teams from the home-vs-away pairings (see PAIR_SCALE,
+        SIZE_LOGIT). None if any pairing has not been built.
+        """
+        if not home or not away: return None
+        logits = []
+        for a in home:
+            for b in away:
+                p = self.win_prob(a[0], a[1], b[0], b[1])
+                if p is None: return None
+                p = min(max(p, 1e-3), 1 - 1e-3); logits.append(math.log(p / (1 - p)))
+        z = PAIR_SCALE * sum(logits) / len(logits) + SIZE_LOGIT * math.log(len(home) / len(away))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    # ---- building ----
+    def missing(self, classes: Optional[Iterable[str]] = None, levels: Optional[Iterable[int]] = None) -> List[Tuple[int, int]]:
+        """Unbuilt unordered cells (i <= j) among the given classes and levels (default: all)."""
+        cs = set(classes or self.classes); ls = {int(v) for v in (levels or self.levels)}
+        idx = [i for i, (c, lv) in enumerate(self.entries) if c in cs and lv in ls]; m = len(self.entries)
+        return [(i, j) for a, i in enumerate(idx) for j in idx[a:] if not self.n[i * m + j]]
+    def add(self, i: int, j: int, n: int, wi: int, wj: int) -> None:
+        m = len(self.entries)
+        if i == j:  # mirror: both orders are the same cell
+            self.n[i * m + i] += n; self.wins[i * m + i] += (wi + wj) // 2; return
+        self.n[i * m + j] += n; self.wins[i * m + j] += wi
+        self.n[j * m + i] += n; self.wins[j * m + i] += wj
+    def built(self) -> int: return sum(1 for i in range(len(self.entries)) for j in range(i, len(self.entries)) if self.n[i * len(self.entries) + j])
+
+    # ---- disk ----
+    def to_dict(self) -> Dict[str, Any]:
+        return {"fingerprint": self.fingerprint, "version": MATRIX_VERSION, "classes": list(self.classes),
+                "levels": list(self.levels), "meta": self.meta, "n": self.n, "wins": self.wins}
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "MatchupMatrix":
+        m = cls(d["fingerprint"], d["classes"], d["levels"])
+        if len(d["n"]) != len(m.n): raise ValueError("matchup matrix size does not match its classes/levels")
+        m.n = [int(v) for v in d["n"]]; m.wins = [int(v) for v in d["wins"]]; m.meta = dict(d.get("meta", {}))
+        return m
+    def save(self, path: Optional[Path] = None) -> Path:
+        path = Path(path or matrix_path(self.fingerprint)); path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)  # atomic: an interrupted build never leaves a torn file
+        return path
+
+def load_matrix(path: Optional[Path] = None, *, fingerprint: Optional[str] = None) -> MatchupMatrix:
+    """The matrix for the current rules (or `fingerprint`); empty when none has been built yet."""
+    fp = fingerprint or rules_fingerprint()
+    try:
+        m = MatchupMatrix.from_dict(json.loads(Path(path or matrix_path(fp)).read_text(encoding="utf-8")))
+        if m.fingerprint == fp: return m
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return MatchupMatrix(fp)
+
+@lru_cache(maxsize=1)
+def current_matrix() -> MatchupMatrix:
+    """load_matrix(), cached per process (for predictions; call current_matrix.cache_clear() after a build)."""
+    return load_matrix()
+
+def build_matrix(classes: Optional[Iterable[str]] = None, levels: Optional[Iterable[int]] = None, *,
+                 seeds: int = CELL_SEEDS, workers: Optional[int] = 0, engine: str = "scalar", chunk: int = 32,
+                 save_every: float = 10.0, path: Optional[Path] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> MatchupMatrix:
+    """
+    Fill the missing cells among `classes` x `levels` (default: all) and save. Chunks of `chunk`
+    cells run on `workers` processes (0/1 = serial, None = os.cpu_count()); the file is rewritten
+    at most every `save_every` seconds and once at the end, so an interrupted build resumes.
+    """
+    m = load_matrix(path); todo = m.missing(classes, levels); total = len(todo); done = 0
+    m.meta.update({"seeds": seeds, "engine": engine})
+    chunks = [todo[k:k + chunk] for k in range(0, len(todo), chunk)]
+    last = time.monotonic()
+    def merge(rows) -> None:
+        nonlocal done, last
+        for i, j, n, wi, wj in rows: m.add(i, j, n, wi, wj)
+        done += len(rows)
+        if progress: progress(done, total)
+        if time.monotonic() - last >= save_every: m.save(path); last = time.monotonic()
+    n = (os.cpu_count() or 1) if workers is None else int(workers)
+    try:
+        if n <= 1 or len(chunks) <= 1:
+            for c in chunks: merge(_play_chunk(c, m.entries, seeds, engine))
+        else:
+            with ProcessPoolExecutor(max_workers=min(n, len(chunks))) as pool:
+                for fut in as_completed([pool.submit(_play_chunk, c, m.entries, seeds, engine) for c in chunks]):
+                    merge(fut.result())
+    finally:
+        if done: m.save(path); current_matrix.cache_clear()
+    return m
@@ -37,6 +37,12 @@ CLASS_ALIASES: Dict[str, str] = {
     "cleric": "war_priest",
     "warlock": "wizard",
     "sorcerer": "wizard",
+    "war priest": "war_priest",
+    # fighter styles (core.classes FIGHTER_STYLE_CLASSES)
+    "archer": "fighter",
+    "defender": "fighter",
+    "enforcer": "fighter",
+    "duelist": "fighter",
 }
 
 def _normalize_class_key(cls: str) -> str:
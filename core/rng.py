@@ -1,6 +1,7 @@
 from __future__ import annotations
 import hashlib
 import random
+import struct
 
 def int_from_str(s: str, bits: int = 48) -> int:
     """Stable non-crypto hash -> int."""
@@ -20,3 +21,109 @@ def child_seed(parent_seed: int, label: str) -> int:
 
 def child_rng(parent_seed: int, label: str) -> random.Random:
     return random.Random(child_seed(parent_seed, label))
+
+
+# ---------------- Counter-based streams ----------------
+# SplitMix64: output i of the stream keyed K is mix(K + (i + 1) * GAMMA), so any draw is a pure
+# function of (key, counter). Streams for (career seed, season, week, fixture, actor, ...) are
+# derived by folding the keys into the parent key; ints are folded as-is and strings by their
+# UTF-8 bytes (no digests, no Python hash()), so every process derives the same stream.
+MASK64 = (1 << 64) - 1
+GAMMA = 0x9E3779B97F4A7C15
+
+def splitmix64(x: int) -> int:
+    z = (x + GAMMA) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def _key_int(k) -> int:
+    if isinstance(k, bool) or not isinstance(k, (int, str, bytes)): k = str(k)
+    if isinstance(k, int): return k & MASK64
+    b = k.encode("utf-8") if isinstance(k, str) else k
+    x = len(b)
+    for i in range(0, len(b), 8):
+        x = splitmix64(x ^ int.from_bytes(b[i:i + 8], "little"))
+    return x ^ 0x5555555555555555  # keep "1" and 1 apart
+
+def derive(seed: int, *keys) -> int:
+    """64-bit key of the stream (seed, *keys); derive(derive(s, a), b) == derive(s, a, b)."""
+    x = int(seed) & MASK64
+    for k in keys:
+        x = splitmix64(x ^ splitmix64(_key_int(k)))
+    return x
+
+
+class CounterRNG(random.Random):
+    """
+    random.Random API (randint, shuffle, choice, ...) over a SplitMix64 stream. The state is just
+    (key, counter): `split(*keys)` makes an independent child stream, and getstate/setstate are
+    O(1), which keeps TBCombat snapshots cheap.
+    """
+    def __init__(self, seed: int = 0, *keys):
+        super().__init__()    # calls self.seed(None): nothing to do before the key exists
+        self._key = derive(seed, *keys); self._n = 0
+
+    @classmethod
+    def from_key(cls, key: int) -> "CounterRNG":
+        r = cls(); r._key = int(key) & MASK64; return r
+
+    def seed(self, a=None, version=2) -> None:
+        """Restart the stream keyed `a` (None: restart the current stream)."""
+        if a is not None: self._key = derive(a if isinstance(a, int) else _key_int(a))
+        self._n = 0
+
+    @property
+    def key(self) -> int: return self._key
+    def split(self, *keys) -> "CounterRNG": return CounterRNG.from_key(derive(self._key, *keys))
+
+    def _next64(self) -> int:
+        z = (self._key + (self._n + 1) * GAMMA) & MASK64; self._n += 1  # == splitmix64(key + n * GAMMA)
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def random(self) -> float: return (self._next64() >> 11) * (1.0 / 9007199254740992.0)
+
+    def _randbelow(self, n: int) -> int:
+        # Lemire multiply-shift on one 64-bit word; rejection keeps it exactly uniform
+        if n > MASK64: return super()._randbelow(n)
+        m = self._next64() * n
+        if (m & MASK64) < n:
+            t = ((1 << 64) - n) % n
+            while (m & MASK64) < t: m = self._next64() * n
+        return m >> 64
+
+    def randint(self, a: int, b: int) -> int: return a + self._randbelow(b - a + 1)
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 64: return self._next64() >> (64 - k) if k else 0
+        words = (k + 63) // 64; key = self._key; n = self._n; out = []
+        for i in range(n + 1, n + words + 1):  # _next64 inlined: bulk draws feed the buffered dice
+            z = (key + i * GAMMA) & MASK64
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+            out.append(z ^ (z >> 31))
+        self._n = n + words
+        return int.from_bytes(struct.pack(f"<{words}Q", *out), "little") & ((1 << k) - 1)
+
+    def randbytes(self, n: int) -> bytes:
+        return self.getrandbits(n * 8).to_bytes(n, "little")
+
+    def getstate(self): return ("counter", self._key, self._n)
+    def setstate(self, state) -> None:
+        _, self._key, self._n = state
+
+def fixture_seed(career_seed: int, season, week: int, home, away) -> int:
+    """Stream key of one fixture's match; the same in every process and in any simulation order."""
+    return derive(career_seed, "fixture", season, int(week), str(home), str(away))
+
+def make_rng(kind: str, seed: int) -> random.Random:
+    """'mt' -> random.Random(seed) (Mersenne Twister); 'counter' -> CounterRNG(seed)."""
+    if kind == "mt": return random.Random(seed)
+    if kind == "counter": return CounterRNG(seed)
+    raise ValueError(f"unknown rng kind: {kind!r} (expected 'mt' or 'counter')")
+
+def actor_stream(career_seed: int, season, week: int, home, away, actor, *keys) -> CounterRNG:
+    """Stream of one actor in one fixture (e.g. post-match level-ups and the spells they learn)."""
+    return CounterRNG(fixture_seed(career_seed, season, week, home, away), "actor", str(actor), *keys)
@@ -1,9 +1,20 @@
 from __future__ import annotations
 
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import dataclasses
+from collections import Counter
+from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional, Tuple
-import random
 from datetime import date
 
+from core.config import RIVAL_WINDOW, SIM_FIDELITY, SIM_FIDELITY_RIVALS, SIM_WORKERS
+from core.rng import CounterRNG, fixture_seed
+from core.surrogate import FixtureFeatures, fixture_features, load_surrogate
+
 # weekly training hook
 try:
     from core.usecases.integration_points import weekly_training_tick
@@ -14,6 +25,9 @@ except Exception:
 # Engine for headless sims
 try:
     from engine.tbcombat import TBCombat
+    from engine.events import NullSink
+    from engine.model import CombatActor, actor_from_dict
+    from engine.analytic import resolve_analytic
 except Exception:
     TBCombat = None  # if you only record results externally
 
@@ -30,6 +44,16 @@ def _current_week_index(career) -> int:
     except Exception:
         return 0
 
+_HOME_KEYS = ("home_id", "home_tid", "home", "A")
+_AWAY_KEYS = ("away_id", "away_tid", "away", "B")
+
+def _first_key(d: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    # first key that is set (team id 0 is a real team, so no `or` chains)
+    for k in keys:
+        if d.get(k) is not None:
+            return d[k]
+    return None
+
 def _fixtures_for_week(career, week_index: int) -> List[Tuple[Any, Any]]:
     fx_by_week = getattr(career, "fixtures_by_week", None) or getattr(career, "rounds", None)
     if isinstance(fx_by_week, list) and 0 <= week_index < len(fx_by_week):
@@ -37,9 +61,7 @@ def _fixtures_for_week(career, week_index: int) -> List[Tuple[Any, Any]]:
         out = []
         for p in week:
             if isinstance(p, dict):
-                a = p.get("home_id") or p.get("home_tid") or p.get("home") or p.get("A")
-                b = p.get("away_id") or p.get("away_tid") or p.get("away") or p.get("B")
-                out.append((a, b))
+                out.append((_first_key(p, _HOME_KEYS), _first_key(p, _AWAY_KEYS)))
             elif isinstance(p, (list, tuple)) and len(p) >= 2:
                 out.append((p[0], p[1]))
         return out
@@ -52,8 +74,8 @@ def _fixtures_for_week(career, week_index: int) -> List[Tuple[Any, Any]]:
                 continue
             if int(w) - 1 == week_index or int(w) == week_index:
                 if isinstance(m, dict):
-                    a = m.get("home_id") or m.get("home_tid") or m.get("home") or m.get("A")
-                    b = m.get("away_id") or m.get("away_tid") or m.get("away") or m.get("B")
+                    a = _first_key(m, _HOME_KEYS)
+                    b = _first_key(m, _AWAY_KEYS)
                 else:
                     a = getattr(m, "home_id", getattr(m, "home_tid", getattr(m, "home", getattr(m, "A", None))))
                     b = getattr(m, "away_id", getattr(m, "away_tid", getattr(m, "away", getattr(m, "B", None))))
@@ -62,7 +84,13 @@ def _fixtures_for_week(career, week_index: int) -> List[Tuple[Any, Any]]:
             return out
     return []
 
-def _team_roster(career, tid) -> List[Dict]:
+def _team_fighters(career, tid) -> List[Any]:
+    for t in getattr(career, "teams", []):
+        if str(t.get("tid", t.get("id"))) == str(tid):
+            return t.get("fighters") or t.get("players") or []
+    return []
+
+def _team_roster(career, tid) -> List[CombatActor]:
     teams = getattr(career, "teams", [])
     for t in teams:
         if str(t.get("tid", t.get("id"))) == str(tid):
@@ -77,7 +105,7 @@ def _team_roster(career, tid) -> List[Dict]:
                 d.setdefault("max_hp", d.get("max_hp", d.get("HP_max", d.get("hp", 10))))
                 d.setdefault("ac", d.get("ac", d.get("AC", 10)))
                 d.setdefault("alive", d.get("alive", True))
-                out.append(d)
+                out.append(actor_from_dict(d))  # attribute + mapping access; the career dict is untouched
             return out
     return []
 
@@ -108,64 +136,207 @@ def _advance_week(career) -> None:
     except Exception:
         pass
 
+# ---------- fixture jobs (serial or process pool) ----------
+# A week's AI fixtures are independent. Each one becomes a FixtureJob: the pickled roster (home side
+# first, team ids already set) and a stable per-fixture seed, so a worker process rebuilds exactly
+# the match the caller would have played. run_fixtures returns results in job order whatever order
+# the pool finishes them in, and they are recorded in fixture order: the career ends up the same for
+# any worker count. workers <= 1 (core.config.SIM_WORKERS default) plays them on the calling thread.
+#
+# Fidelity (per job; choose_fidelity picks it per fixture from core.config or career.fidelity_policy):
+#   "full"       the TBCombat engine, turn by turn (tactics, dice, movement)
+#   "reduced"    engine.analytic: same rosters and to-hit/damage formulas, expected damage, no
+#                events/controllers/grid
+#   "surrogate"  core.surrogate: kills drawn from a model fitted on full runs (OVR, Elo, class mix);
+#                falls back to "reduced" until a model has been fitted
+# drift_report measures how far a tier strays from "full" on the same jobs.
+
+FIDELITY_FULL = "full"
+FIDELITY_REDUCED = "reduced"
+FIDELITY_SURROGATE = "surrogate"
+FIDELITIES: Tuple[str, ...] = (FIDELITY_FULL, FIDELITY_REDUCED, FIDELITY_SURROGATE)
+
+SIM_GRID: Tuple[int, int] = (11, 11)
+MAX_TURNS = 2000
+
+@dataclass(frozen=True, slots=True)
+class FixtureJob:
+    index: int                  # position in the week's fixture list
+    home_tid: Any
+    away_tid: Any
+    seed: int
+    roster: bytes               # roster_snapshot(home + away)
+    cols: int = SIM_GRID[0]
+    rows: int = SIM_GRID[1]
+    rng_kind: str = "counter"
+    max_turns: int = MAX_TURNS
+    fidelity: str = FIDELITY_FULL
+    features: Optional[FixtureFeatures] = None   # for the surrogate tier
+
+def roster_snapshot(fighters: Iterable[Any]) -> bytes:
+    """Serialize a match roster once in the parent; workers (or the serial path) unpickle a private copy."""
+    return pickle.dumps(list(fighters), pickle.HIGHEST_PROTOCOL)
+
+def rivals(career, window: int = RIVAL_WINDOW) -> frozenset:
+    """Club ids (as str) within `window` table places of the user's club, plus career.rivals if set."""
+    out = {str(t) for t in (getattr(career, "rivals", None) or ())}
+    user_tid = getattr(career, "user_tid", None)
+    if user_tid is None or window <= 0: return frozenset(out)
+    try: rows = career.table_rows_sorted()
+    except Exception: rows = []
+    order = [str(r.get("tid")) for r in rows]
+    if str(user_tid) in order:
+        i = order.index(str(user_tid))
+        out.update(order[max(0, i - window):i + window + 1])
+    out.discard(str(user_tid))
+    return frozenset(out)
+
+def choose_fidelity(career, home_tid: Any, away_tid: Any, rival_ids: Optional[frozenset] = None) -> str:
+    """
+    Fidelity for one fixture: `career.fidelity_policy(career, home, away)` when the career has one,
+    else core.config SIM_FIDELITY_RIVALS for fixtures involving a rival and SIM_FIDELITY elsewhere.
+    """
+    policy = getattr(career, "fidelity_policy", None)
+    if callable(policy): return str(policy(career, home_tid, away_tid))
+    if rival_ids is None: rival_ids = rivals(career)
+    return SIM_FIDELITY_RIVALS if (str(home_tid) in rival_ids or str(away_tid) in rival_ids) else SIM_FIDELITY
+
+def week_jobs(career, week_index: Optional[int] = None, *, fidelity: Optional[str] = None) -> List[FixtureJob]:
+    """
+    Jobs for the AI-vs-AI fixtures of a week (the user's fixture is left to be played), each at
+    `fidelity`, or at choose_fidelity's pick per fixture when None.
+    """
+    wk = _current_week_index(career) if week_index is None else int(week_index)
+    user_tid = getattr(career, "user_tid", None)
+    if fidelity is not None and fidelity not in FIDELITIES:
+        raise ValueError(f"unknown fidelity: {fidelity!r} (expected one of {FIDELITIES})")
+    rival_ids = rivals(career) if fidelity is None else frozenset()
+    jobs: List[FixtureJob] = []
+    for (home_tid, away_tid) in _fixtures_for_week(career, wk):
+        if user_tid is not None and (str(home_tid) == str(user_tid) or str(away_tid) == str(user_tid)):
+            continue
+        jobs.append(fixture_job(career, len(jobs), wk, home_tid, away_tid, fidelity=fidelity, rival_ids=rival_ids))
+    return jobs
+
+def fixture_job(career, index: int, week_index: int, home_tid: Any, away_tid: Any, *,
+                fidelity: Optional[str] = None, rival_ids: Optional[frozenset] = None) -> FixtureJob:
+    """
+    The job for one fixture (0-based `week_index`), as week_jobs builds it; callers with their own
+    fixture list (ui.state_season_hub) use it so a fixture plays the same from either entry point.
+    """
+    # one stream per fixture (no hash(): that is salted per process)
+    seed = fixture_seed(getattr(career, "seed", 12345), getattr(career, "season", 1), week_index, home_tid, away_tid)
+    roster = b""
+    if TBCombat is not None:
+        home_roster = _team_roster(career, home_tid)
+        away_roster = _team_roster(career, away_tid)
+        for p in away_roster:
+            p["team_id"] = 1
+        roster = roster_snapshot(home_roster + away_roster)
+    fid = fidelity or choose_fidelity(career, home_tid, away_tid, rival_ids)
+    feats = (fixture_features(career, home_tid, away_tid, _team_fighters(career, home_tid), _team_fighters(career, away_tid))
+             if fid == FIDELITY_SURROGATE else None)
+    return FixtureJob(index, home_tid, away_tid, seed, roster, fidelity=fid, features=feats)
+
+def play_fixture(job: FixtureJob) -> Dict[str, Any]:
+    """Play one job headless at its fidelity (top-level so a process pool can pickle it); -> result dict."""
+    fid = job.fidelity
+    model = load_surrogate() if fid == FIDELITY_SURROGATE and job.features is not None else None
+    if model is None and fid == FIDELITY_SURROGATE: fid = FIDELITY_REDUCED
+    if model is not None:
+        k_home, k_away = model.sample(job.features, job.seed)
+        decided = 0 if k_home > k_away else (1 if k_away > k_home else -1)
+    elif fid == FIDELITY_REDUCED and TBCombat is not None and job.roster:
+        r = resolve_analytic(pickle.loads(job.roster), seed=job.seed)
+        k_home, k_away, decided = r.k_home, r.k_away, r.winner
+    elif TBCombat is not None and job.roster:
+        fighters = pickle.loads(job.roster)
+        # results only: no event log needed
+        engine = TBCombat(str(job.home_tid), str(job.away_tid), fighters, job.cols, job.rows, seed=job.seed,
+                          events=NullSink(), rng_kind=job.rng_kind)
+        start_home, start_away = engine.alive_count(0), engine.alive_count(1)
+        # run to completion (the engine sets `winner` on the decisive kill or a stalemate)
+        steps = 0
+        while engine.winner is None and steps < job.max_turns:
+            engine.take_turn()
+            steps += 1
+        # kills = fighters the other side lost
+        k_home = start_away - engine.alive_count(1)
+        k_away = start_home - engine.alive_count(0)
+        decided = engine.winner
+    else:
+        rng = CounterRNG.from_key(job.seed)
+        k_home = rng.randint(0, 4)
+        k_away = rng.randint(0, 4)
+        decided = None
+    return {"home_tid": job.home_tid, "away_tid": job.away_tid, "K_home": k_home, "K_away": k_away,
+            "k_home": k_home, "k_away": k_away, "engine_winner": decided, "fidelity": fid,
+            "winner": 0 if k_home > k_away else (1 if k_away > k_home else None)}
+
+def run_fixtures(jobs: Iterable[FixtureJob], *, workers: Optional[int] = 0,
+                 chunksize: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Results for `jobs`, in job order. workers: 0/1 = serial, None = os.cpu_count(); chunksize
+    defaults to about four chunks per worker. Falls back to serial if the pool cannot run.
+    """
+    jobs = list(jobs)
+    n = (os.cpu_count() or 1) if workers is None else int(workers)
+    if n <= 1 or len(jobs) <= 1:
+        return [play_fixture(j) for j in jobs]
+    n = min(n, len(jobs))
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (4 * n))
+    try:
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            return list(pool.map(play_fixture, jobs, chunksize=max(1, int(chunksize))))
+    except (OSError, BrokenProcessPool):
+        return [play_fixture(j) for j in jobs]
+
+def drift_report(jobs: Iterable[FixtureJob], fidelity: str, *, workers: Optional[int] = 0) -> Dict[str, float]:
+    """
+    How far `fidelity` strays from full fidelity on the same jobs (seeds and rosters):
+      kills_mae      mean |kills - full kills| per side
+      kills_bias     mean (kills - full kills) per side (> 0: the tier overstates kills)
+      winner_agree   share of fixtures with the same result (home / away / draw)
+      home_win_diff  home win rate minus the full engine's
+      kills_tvd      total variation distance between the kill distributions
+      speedup        full wall time / tier wall time
+    """
+    jobs = list(jobs)
+    if not jobs: return {}
+    def timed(fid):
+        t0 = time.perf_counter()
+        out = run_fixtures([_with_fidelity(j, fid) for j in jobs], workers=workers)
+        return out, time.perf_counter() - t0
+    full, t_full = timed(FIDELITY_FULL); tier, t_tier = timed(fidelity)
+    n = len(jobs); kf = Counter(); kt = Counter(); err = bias = agree = hw_f = hw_t = 0
+    for a, b in zip(full, tier, strict=True):
+        for side in ("k_home", "k_away"):
+            err += abs(b[side] - a[side]); bias += b[side] - a[side]; kf[a[side]] += 1; kt[b[side]] += 1
+        agree += a["winner"] == b["winner"]; hw_f += a["winner"] == 0; hw_t += b["winner"] == 0
+    return {"fixtures": float(n), "kills_mae": err / (2 * n), "kills_bias": bias / (2 * n), "winner_agree": agree / n,
+            "home_win_diff": (hw_t - hw_f) / n, "kills_tvd": 0.5 * sum(abs(kf[k] - kt[k]) for k in kf.keys() | kt.keys()) / (2 * n),
+            "speedup": t_full / t_tier if t_tier > 0 else float("inf")}
+
+def _with_fidelity(job: FixtureJob, fidelity: str) -> FixtureJob:
+    return dataclasses.replace(job, fidelity=fidelity)
+
 # ---------- core sim function ----------
 
-def simulate_week_ai(career) -> bool:
+def simulate_week_ai(career, *, workers: Optional[int] = SIM_WORKERS, chunksize: Optional[int] = None,
+                     fidelity: Optional[str] = None) -> bool:
     """
     Simulate all AI-vs-AI fixtures of the current week.
     If the user's team has a fixture this week and is unplayed, skip it (user can play).
-    After simming, apply weekly training gains.
+    Fixtures run on `workers` processes (see run_fixtures); results are recorded in fixture
+    order, so any worker count gives the same career. `fidelity` forces one tier for every
+    fixture (default: choose_fidelity per fixture). After simming, apply weekly training gains.
     """
     wk = _current_week_index(career)
-    pairs = _fixtures_for_week(career, wk)
-    if not pairs:
+    if not _fixtures_for_week(career, wk):
         return False
 
-    user_tid = getattr(career, "user_tid", None)
-
-    for (home_tid, away_tid) in pairs:
-        # Skip user's fixture so they can play it manually
-        if user_tid is not None and (str(home_tid) == str(user_tid) or str(away_tid) == str(user_tid)):
-            continue
-
-        # If engine is available, do a light headless sim; else random score
-        if TBCombat is not None:
-            home_roster = _team_roster(career, home_tid)
-            away_roster = _team_roster(career, away_tid)
-            # tag team_id for away
-            for p in away_roster:
-                p["team_id"] = 1
-            fighters = home_roster + away_roster
-            seed = getattr(career, "seed", 12345) ^ (wk << 8) ^ hash((str(home_tid), str(away_tid))) & 0xFFFFFFFF
-            engine = TBCombat(str(home_tid), str(away_tid), fighters, grid_w=11, grid_h=11, seed=seed)
-            # run to completion
-            steps = 0
-            while engine.winner is None and steps < 2000:
-                engine.take_turn()
-                steps += 1
-            # derive kills from down events
-            downs_home = 0
-            downs_away = 0
-            for ev in engine.typed_events:
-                if ev.get("type") == "down":
-                    # Approximation: assume downs of away counted for home, etc.
-                    # (Precise attribution would track team of the downed.)
-                    # Here we just count totals; tweak later if you store per-team kills.
-                    pass
-            # Better proxy: use winner and random small scores
-            if engine.winner == 0:
-                k_home, k_away = 3, 1
-            elif engine.winner == 1:
-                k_home, k_away = 1, 3
-            else:
-                k_home, k_away = 2, 2
-        else:
-            rng = random.Random(hash((wk, str(home_tid), str(away_tid))) & 0xFFFFFFFF)
-            k_home = rng.randint(0, 4)
-            k_away = rng.randint(0, 4)
-
-        result = {"home_tid": home_tid, "away_tid": away_tid, "K_home": k_home, "K_away": k_away,
-                  "winner": 0 if k_home > k_away else (1 if k_away > k_home else None)}
+    for result in run_fixtures(week_jobs(career, wk, fidelity=fidelity), workers=workers, chunksize=chunksize):
         _record_result(career, result)
 
     # Training tick for every club (very light)
@@ -1,7 +1,9 @@
 
 from __future__ import annotations
 import random
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional
+
+from core.rng import CounterRNG
 
 try:
     from core.spell_catalog import SPELLS
@@ -49,14 +51,22 @@ def _capacity_for_slot(f: Dict[str,Any], slot_type: int) -> int:
     # subtract how many we already know at that slot
     return max(0, cur - _known_count_by_slot(f, slot_type))
 
-def learn_spells_for_level(f: Dict[str,Any], level: int) -> None:
+def _spell_stream(f: Dict[str, Any], level: int) -> CounterRNG:
+    key = f.get("rng_key")
+    if key is not None: return CounterRNG(int(key), "spells", int(level))
+    return CounterRNG(0, "fighter", str(f.get("pid", f.get("id", f.get("name", "")))), "spells", int(level))
+
+def learn_spells_for_level(f: Dict[str,Any], level: int, rng: Optional[random.Random] = None) -> None:
     """
     At character level `level`, learn spells whose 'learn_at_level' equals `level`.
     Fill up to current slot capacity per slot_type using precedence:
       1) training pair (position+role) match
       2) position-only match
       3) class match (remaining)
-      4) random from class
+      4) random from class, shuffled with `rng` (e.g. core.rng.actor_stream for the match that
+         earned the level). Without one, the shuffle is keyed by the fighter's own stream key
+         (`rng_key`, stamped by core.creator.generate_fighter), or by its pid/id/name for fighters
+         from older saves, and the level, so it is the same in any process and any order.
     """
     _ensure_known_struct(f)
     cls = f.get("class")
@@ -110,6 +120,7 @@ def learn_spells_for_level(f: Dict[str,Any], level: int) -> None:
         # 4) random fill if still short
         if capacity > 0:
             rest = [s for s in spells if not _already_known(f, s["spell"])]
-            random.shuffle(rest)
+            if rng is None: rng = _spell_stream(f, level)
+            rng.shuffle(rest)
             for s in rest:
                 add_if_possible(s["spell"])
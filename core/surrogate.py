@@ -0,0 +1,131 @@
+# core/surrogate.py
+from __future__ import annotations
+import json
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.rng import CounterRNG
+
+# Surrogate fixture model (the "surrogate" tier of core.sim).
+# Predicts the share of the opposing roster each side downs from a few fixture features: mean OVR
+# of each roster (core.ratings), club Elo (career.reputation), roster sizes and class mix. The
+# weights are fitted offline by ridge least squares on full-engine runs
+# (`python -m tools.calibrate_fidelity fit`) and stored in data/surrogate.json; kills are then drawn
+# from a binomial around the prediction with the fixture's seed, so results stay reproducible.
+
+SURROGATE_PATH = Path(__file__).resolve().parent.parent / "data" / "surrogate.json"
+START_ELO = 1500.0
+
+@dataclass(frozen=True, slots=True)
+class FixtureFeatures:
+    ovr_home: float
+    ovr_away: float
+    elo_home: float
+    elo_away: float
+    size_home: int
+    size_away: int
+    classes_home: Tuple[Tuple[str, int], ...] = ()
+    classes_away: Tuple[Tuple[str, int], ...] = ()
+
+def _ovr(f: Dict[str, Any]) -> float:
+    v = f.get("ovr", f.get("OVR"))
+    if v is not None: return float(v)
+    from core.ratings import compute_ovr  # late: ratings pulls in the spell tables
+    return float(compute_ovr(dict(f)))    # a copy: compute_ovr also writes role_fit
+
+def roster_features(roster: Sequence[Dict[str, Any]]) -> Tuple[float, int, Tuple[Tuple[str, int], ...]]:
+    """-> (mean OVR, size, sorted class counts) of a roster of fighter dicts."""
+    living = [f for f in roster if f.get("alive", True)]
+    ovr = sum(_ovr(f) for f in living) / len(living) if living else 0.0
+    mix = Counter(str(f.get("class", f.get("cls", "")) or "").strip().title() for f in living)
+    return ovr, len(living), tuple(sorted(mix.items()))
+
+def club_elo(career, tid: Any) -> float:
+    rep = getattr(career, "reputation", None)
+    clubs = rep.get("clubs", {}) if isinstance(rep, dict) else {}
+    try: return float(clubs.get(str(tid), START_ELO))
+    except (TypeError, ValueError): return START_ELO
+
+def fixture_features(career, home_tid: Any, away_tid: Any,
+                     home: Sequence[Dict[str, Any]], away: Sequence[Dict[str, Any]]) -> FixtureFeatures:
+    oh, nh, ch = roster_features(home); oa, na, ca = roster_features(away)
+    return FixtureFeatures(oh, oa, club_elo(career, home_tid), club_elo(career, away_tid), nh, na, ch, ca)
+
+
+# ---------------- Model ----------------
+@dataclass(frozen=True)
+class SurrogateModel:
+    classes: Tuple[str, ...]          # class-mix features, in weight order
+    w_home: Tuple[float, ...]         # -> share of the away roster the home side downs
+    w_away: Tuple[float, ...]
+    samples: int = 0
+
+    @staticmethod
+    def vector(fx: FixtureFeatures, classes: Sequence[str]) -> List[float]:
+        ch = dict(fx.classes_home); ca = dict(fx.classes_away)
+        return ([1.0, (fx.ovr_home - fx.ovr_away) / 10.0, (fx.elo_home - fx.elo_away) / 100.0,
+                 float(fx.size_home - fx.size_away)] + [float(ch.get(c, 0) - ca.get(c, 0)) for c in classes])
+
+    def predict(self, fx: FixtureFeatures) -> Tuple[float, float]:
+        """Expected share of the opposing roster downed, (home, away), each in [0, 1]."""
+        x = self.vector(fx, self.classes)
+        def share(w): return max(0.0, min(1.0, sum(a * b for a, b in zip(w, x, strict=True))))
+        return share(self.w_home), share(self.w_away)
+
+    def expected_kills(self, fx: FixtureFeatures) -> Tuple[float, float]:
+        ph, pa = self.predict(fx); return ph * fx.size_away, pa * fx.size_home
+
+    def sample(self, fx: FixtureFeatures, seed: int) -> Tuple[int, int]:
+        """Kills (home, away) drawn around the prediction; a side that is wiped out downs no one after."""
+        ph, pa = self.predict(fx); rng = CounterRNG(seed)
+        kh = sum(1 for _ in range(fx.size_away) if rng.random() < ph)
+        ka = sum(1 for _ in range(fx.size_home) if rng.random() < pa)
+        if kh >= fx.size_away and ka >= fx.size_home:  # both wiped: the stronger prediction survives one
+            if ph >= pa: ka = max(0, fx.size_home - 1)
+            else: kh = max(0, fx.size_away - 1)
+        return kh, ka
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"classes": list(self.classes), "w_home": list(self.w_home), "w_away": list(self.w_away), "samples": self.samples}
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SurrogateModel":
+        return cls(tuple(d["classes"]), tuple(float(v) for v in d["w_home"]), tuple(float(v) for v in d["w_away"]), int(d.get("samples", 0)))
+    def save(self, path: Path = SURROGATE_PATH) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+
+def _solve(A: List[List[float]], b: List[float]) -> List[float]:
+    """Gaussian elimination with partial pivoting (the systems here are a handful of features wide)."""
+    n = len(b); M = [row[:] + [b[i]] for i, row in enumerate(A)]
+    for c in range(n):
+        p = max(range(c, n), key=lambda r: abs(M[r][c]))
+        if abs(M[p][c]) < 1e-12: continue
+        M[c], M[p] = M[p], M[c]
+        for r in range(n):
+            if r != c and M[r][c]:
+                f = M[r][c] / M[c][c]; M[r] = [x - f * y for x, y in zip(M[r], M[c], strict=True)]
+    return [M[i][n] / M[i][i] if abs(M[i][i]) >= 1e-12 else 0.0 for i in range(n)]
+
+def _ridge(X: List[List[float]], y: List[float], ridge: float) -> Tuple[float, ...]:
+    k = len(X[0])
+    A = [[sum(row[i] * row[j] for row in X) + (ridge if i == j and i else 0.0) for j in range(k)] for i in range(k)]
+    return tuple(_solve(A, [sum(row[i] * t for row, t in zip(X, y, strict=True)) for i in range(k)]))
+
+def fit_surrogate(samples: Iterable[Tuple[FixtureFeatures, int, int]], *, ridge: float = 1.0) -> SurrogateModel:
+    """Fit on (features, home kills, away kills) from full-fidelity runs."""
+    samples = [s for s in samples if s[0].size_home and s[0].size_away]
+    if not samples: raise ValueError("no samples to fit the surrogate on")
+    classes = tuple(sorted({c for fx, _, _ in samples for c, _ in fx.classes_home + fx.classes_away}))
+    X = [SurrogateModel.vector(fx, classes) for fx, _, _ in samples]
+    yh = [kh / fx.size_away for fx, kh, _ in samples]; ya = [ka / fx.size_home for fx, _, ka in samples]
+    return SurrogateModel(classes, _ridge(X, yh, ridge), _ridge(X, ya, ridge), len(samples))
+
+@lru_cache(maxsize=4)
+def load_surrogate(path: Optional[str] = None) -> Optional[SurrogateModel]:
+    """The fitted model on disk (cached per process), or None when none has been fitted."""
+    try: return SurrogateModel.from_dict(json.loads(Path(path or SURROGATE_PATH).read_text(encoding="utf-8")))
+    except (OSError, ValueError, KeyError, TypeError): return None
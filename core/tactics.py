@@ -21,6 +21,8 @@ DEFAULT_TEAM_TACTICS = {
 }
 
 def get_team_tactics(env, team_id: int) -> Dict[str, Any]:
+    view = getattr(env, "view", None)
+    if callable(view): return dict(view().tactics(team_id))  # resolved once per turn; hand out a copy
     t = getattr(env, "team_tactics", None) or {}
     base = DEFAULT_TEAM_TACTICS.copy()
     base.update(t.get(int(team_id), {}))
@@ -46,34 +48,11 @@ def _alive(p) -> bool:
 def _dist(a, b) -> int:
     return abs(getattr(a, "tx", 0) - getattr(b, "tx", 0)) + abs(getattr(a, "ty", 0) - getattr(b, "ty", 0))
 
-def _pick_target_by_priority(env, me, priority: List[str]) -> Optional[Any]:
-    enemies = [e for e in env.actors if _alive(e) and getattr(e, "team_id", -1) != getattr(me, "team_id", -2)]
-    if not enemies:
-        return None
-
-    # derive helper metrics lazily
-    def highest_dps_key(p):
-        # cheap proxy: OVR + STR/DEX/INT mods
-        ovr = int(getattr(p, "OVR", 50))
-        strm = _mod(getattr(p, "STR", getattr(p, "str", 10)))
-        dexm = _mod(getattr(p, "DEX", getattr(p, "dex", 10)))
-        intm = _mod(getattr(p, "INT", getattr(p, "int", 10)))
-        return -(ovr + max(strm, dexm, intm)*3)
-
-    for rule in priority:
-        if rule == "lowest_hp":
-            cand = min(enemies, key=lambda e: (int(getattr(e, "hp", 1)) / max(1, int(getattr(e, "max_hp", 1)))), default=None)
-        elif rule == "highest_dps":
-            cand = min(enemies, key=highest_dps_key, default=None)
-        elif rule == "closest":
-            cand = min(enemies, key=lambda e: _dist(me, e), default=None)
-        elif rule == "highest_ovr":
-            cand = max(enemies, key=lambda e: int(getattr(e, "OVR", 50)), default=None)
-        else:
-            cand = None
-        if cand is not None:
-            return cand
-    return enemies[0]
+def _pick_target_by_priority(env, me, priority: List[str], view=None) -> Optional[Any]:
+    if view is None:
+        from engine.world_view import world_view  # late import: engine imports this module
+        view = world_view(env)
+    return view.pick_target(me, priority)
 
 def _has_bonus_hide(me) -> bool:
     cls = str(getattr(me, "class", "")).capitalize()
@@ -91,25 +70,40 @@ def _two_handed_in_use(env, me) -> bool:
     return bool(main.get("versatile")) and not env._has_shield_equipped(me) and env._equipped_off(me) is None
 
 # -------- Public router: returns a list of intents the engine can execute --------
+BOMBARD_SIZE = 1  # blast half-width: a 3x3 template
+
+def _best_blast(env, me, size: int, view=None):
+    from engine.spells import aoe_ally_exemptions, best_aoe_placement  # late import: engine imports this module
+    if view is None:
+        from engine.world_view import world_view
+        view = world_view(env)
+    tid = getattr(me, "team_id", -2)
+    xy = lambda a: (getattr(a, "tx", 0) or 0, getattr(a, "ty", 0) or 0)
+    enemies = [xy(a) for a in view.enemies(tid)]; allies = [xy(a) for a in view.allies(tid)]
+    return best_aoe_placement(enemies, allies, "blast", size, int(getattr(env, "width", 16)), int(getattr(env, "height", 16)),
+                              caster=(getattr(me, "tx", 0) or 0, getattr(me, "ty", 0) or 0),
+                              exempt_allies=aoe_ally_exemptions(getattr(me, "level", 1)))
+
 def choose_intent(env, me) -> List[Dict[str, Any]]:
     if not _alive(me):
         return [{"type": "wait"}]
 
+    from engine.world_view import world_view  # late import: engine imports this module
+    view = world_view(env)  # shared per-turn view (TBCombat.view), or a fresh one for plain envs
     role = str(getattr(me, "role", "")).strip()
     arche = str(getattr(me, "archetype", "")).strip()
-    team_cfg = get_team_tactics(env, getattr(me, "team_id", 0))
+    team_cfg = view.tactics(getattr(me, "team_id", 0))
     prio = list(team_cfg.get("target_priority", DEFAULT_TEAM_TACTICS["target_priority"]))
 
     # Helpers
-    target = _pick_target_by_priority(env, me, prio)
+    target = _pick_target_by_priority(env, me, prio, view)
 
     # ------------- SUPPORT -------------
     if role == "Support":
         if arche == "Healer":
             # Heal nearest ally < threshold; else attack target
             thr = float(team_cfg.get("heal_threshold", 0.40))
-            allies = [a for a in env.actors if _alive(a) and getattr(a, "team_id", -1) == getattr(me, "team_id", -2)]
-            low = [a for a in allies if int(getattr(a, "hp", 0)) / max(1, int(getattr(a, "max_hp", 1))) < thr]
+            low = [a for a in view.allies(getattr(me, "team_id", -2)) if view.hp_frac(a) < thr]
             if low:
                 ally = min(low, key=lambda a: _dist(me, a))
                 return [{"type": "lay_on_hands", "target": ally, "amount": int(getattr(me, "cru_lay_on_hands_current", 0)) // 2 or 1}]
@@ -136,14 +130,12 @@ def choose_intent(env, me) -> List[Dict[str, Any]]:
             return [{"type": "wait"}]
 
         if arche == "Bombarder":
-            # Try an AOE centered near enemies (engine will resolve ally exemptions if Wizard)
+            # Blast the 3x3 spot that catches the most enemies (net of allies the Wizard cannot exempt)
             min_hits = int(team_cfg.get("bombarder_min_enemies_hit", 2))
-            enemies = [e for e in env.actors if _alive(e) and getattr(e, "team_id", -1) != getattr(me, "team_id", -2)]
-            if enemies:
-                # crude: center on the closest enemy
-                center = (getattr(enemies[0], "tx", 0), getattr(enemies[0], "ty", 0))
-                # ask engine to resolve AOE; if few enemies on board, still attempt if >=1
-                return [{"type": "cast", "spell": {"name": "Bombard", "level": 3, "center": center, "dtype": "fire"}}]
+            spot = _best_blast(env, me, BOMBARD_SIZE, view)
+            if spot is not None and spot.enemies_hit >= max(1, min_hits):
+                return [{"type": "cast", "spell": {"name": "Bombard", "level": 3, "center": spot.origin,
+                                                    "shape": "blast", "size": BOMBARD_SIZE, "dtype": "fire"}}]
             if target:
                 return [{"type": "attack", "target": target}]
             return [{"type": "wait"}]
@@ -188,15 +180,14 @@ def choose_intent(env, me) -> List[Dict[str, Any]]:
         if arche == "Hero":
             # Find endangered ally; move adjacent (abstracted) & buff/heal them; then engage their target
             thr = float(team_cfg.get("heal_threshold", 0.40))
-            allies = [a for a in env.actors if _alive(a) and getattr(a, "team_id", -1) == getattr(me, "team_id", -2) and a is not me]
-            low = [a for a in allies if int(getattr(a, "hp", 0)) / max(1, int(getattr(a, "max_hp", 1))) < thr]
+            low = [a for a in view.allies(getattr(me, "team_id", -2)) if a is not me and view.hp_frac(a) < thr]
             if low:
                 ally = min(low, key=lambda a: _dist(me, a))
                 # heal or buff self/adjacent ally
                 if int(getattr(me, "cru_lay_on_hands_current", 0)) > 0:
                     amt = max(1, int(getattr(me, "cru_lay_on_hands_current", 0)) // 2)
                     # then attack the same target that threatens the ally (fallback to selected target)
-                    tgt = _pick_target_by_priority(env, ally, prio) or _pick_target_by_priority(env, me, prio)
+                    tgt = _pick_target_by_priority(env, ally, prio, view) or target
                     intents = [{"type": "lay_on_hands", "target": ally, "amount": amt}]
                     if tgt: intents.append({"type": "attack", "target": tgt})
                     return intents
@@ -1,6 +1,7 @@
 # core/xp.py
 from __future__ import annotations
-from typing import Dict, Any
+import random
+from typing import Any, Dict, Optional
 
 # --- Canonical XP table (per your chart) ---
 XP_TABLE: Dict[int, Dict[str, int]] = {
@@ -66,17 +67,19 @@ def grant_xp(player: Any, amount: int, *, reason: str = "kill", queue_levelups:
         pend = max(0, future_level - current_level)
         player["level_pending"] = pend
 
-def settle_post_match_levels(player: Any) -> None:
+def settle_post_match_levels(player: Any, rng: Optional[random.Random] = None) -> None:
     """
     Apply any queued level increases after a match ends.
-    Uses core.classes.apply_class_level_up for each level gained.
+    Uses core.classes.apply_class_level_up for each level gained; `rng` (e.g. core.rng.actor_stream
+    for the match) drives the spells learned on the way, which otherwise come from the fighter's
+    own stream (core.spell_training.learn_spells_for_level).
     """
     from core.classes import apply_class_level_up  # late import to avoid cycles
     current = int(player.get("level", 1))
     xp_total = int(player.get("xp_total", 0))
     target = level_from_total_xp(xp_total)
     for L in range(current + 1, min(target, _MAX_LEVEL) + 1):
-        apply_class_level_up(player, L)
+        apply_class_level_up(player, L, rng)
     player["level"] = min(target, _MAX_LEVEL)
     # clear pending marker
     if "level_pending" in player:
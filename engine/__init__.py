@@ -5,6 +5,7 @@ Public API for the engine package.
 Tests expect these names to be importable from `engine`:
 - TBCombat
 - Team, Fighter, Weapon, fighter_from_dict
+- CombatActor, actor_from_dict, actor_to_dict
 - layout_teams_tiles
 """
 
@@ -12,7 +13,7 @@ from __future__ import annotations
 
 # Explicit, eager re-exports (simple and robust)
 from .tbcombat import TBCombat
-from .model import Team, Fighter, Weapon, fighter_from_dict
+from .model import Team, Fighter, Weapon, fighter_from_dict, CombatActor, actor_from_dict, actor_to_dict
 from .grid import layout_teams_tiles
 
 __all__ = [
@@ -21,5 +22,8 @@ __all__ = [
     "Fighter",
     "Weapon",
     "fighter_from_dict",
+    "CombatActor",
+    "actor_from_dict",
+    "actor_to_dict",
     "layout_teams_tiles",
 ]
@@ -0,0 +1,204 @@
+# engine/ai/mcts.py
+from __future__ import annotations
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.rng import mix
+from core.tactics import choose_intent
+from engine.events import NullSink
+from engine.team_tactics import BaseController
+from engine.world_view import world_view
+
+# Monte Carlo tree search controller.
+# Each decision snapshots the combat (TBCombat.snapshot), plays the candidate intents forward with
+# `resolve_intents`, runs the rest of the rollout with the greedy tactics router, and restores.
+# The tree is open-loop: a node is a sequence of this team's decisions, keyed (actor pid, action),
+# and dice outcomes are resampled per rollout. After a decision the chosen child becomes the root
+# of the team's next decision, so statistics carry over between consecutive turns.
+#
+# Determinism: rollout RNGs derive from (controller seed, combat seed, turn number) and the
+# candidate's rollout index (so candidates are compared on the same dice), and the
+# combat RNG is restored after searching, so the same seed + `rollouts` always yields the same
+# intents. `time_budget` is a wall-clock cap on top of that and is not reproducible.
+
+ActionKey = Tuple[Any, ...]
+
+def _alive(p) -> bool: return bool(getattr(p, "alive", True)) and int(getattr(p, "hp", 1)) > 0
+def _pid(f) -> str: return str(getattr(f, "pid", getattr(f, "id", getattr(f, "name", id(f)))))
+def _tid(f) -> Any: return getattr(f, "team_id", 0)
+
+
+def candidate_intents(world, me) -> List[Tuple[ActionKey, List[Dict[str, Any]]]]:
+    """Intents worth searching for `me`, as (key, intents) pairs in a stable order."""
+    tid = _tid(me); me_id = _pid(me); view = world_view(world)
+    enemies = view.enemies(tid); allies = view.allies(tid)
+    out: List[Tuple[ActionKey, List[Dict[str, Any]]]] = []
+    for e in enemies:
+        out.append(((me_id, "attack", _pid(e)), [{"type": "attack", "target": e}]))
+    if not getattr(me, "hidden", False):
+        out.append(((me_id, "hide"), [{"type": "hide"}]))
+    if str(getattr(me, "role", "")) == "Tank" or str(getattr(me, "archetype", "")) == "Taunter":
+        for e in enemies:
+            out.append(((me_id, "taunt", _pid(e)), [{"type": "taunt", "target": e}]))
+    pool = int(getattr(me, "cru_lay_on_hands_current", 0) or 0)
+    if pool > 0 and world.profile(me).hooks.action("lay_on_hands") is not None:
+        for a in allies:
+            if int(getattr(a, "hp", 0)) < int(getattr(a, "max_hp", 0)):
+                out.append(((me_id, "lay_on_hands", _pid(a)),
+                            [{"type": "lay_on_hands", "target": a, "amount": max(1, pool // 2)}]))
+    if world.profile(me).cls == "Wizard" or int(getattr(me, "cantrips_known", 0) or 0) > 0:
+        for e in enemies:
+            out.append(((me_id, "cantrip", _pid(e)),
+                        [{"type": "cast", "target": e, "spell": {"name": "Fire Bolt", "level": 0, "attack_roll": True, "dtype": "fire"}}]))
+        slots = getattr(me, "spell_slots_current", None) or []
+        lvl = next((L for L in range(min(len(slots) - 1, 9), 0, -1) if slots[L] > 0), 0)
+        if lvl and enemies:
+            # the engine's AOE resolves against every enemy, so one center is enough
+            center = (getattr(enemies[0], "tx", 0), getattr(enemies[0], "ty", 0))
+            out.append(((me_id, "aoe", lvl),
+                        [{"type": "cast", "spell": {"name": "Bombard", "level": lvl, "center": center, "dtype": "fire"}}]))
+    if not out:
+        out.append(((me_id, "wait"), [{"type": "wait"}]))
+    return out
+
+
+def _policy_first(world, me, cands: List[Tuple[ActionKey, List[Dict[str, Any]]]]) -> List[ActionKey]:
+    """Candidate keys with the default policy's (core.tactics.choose_intent) pick moved to the front,
+    so fresh tree nodes expand the greedy move first instead of an arbitrary one."""
+    keys = [k for k, _ in cands]
+    first = (choose_intent(world, me) or [{}])[0]
+    for k, intents in cands:
+        it = intents[0]
+        if it.get("type") == first.get("type") and it.get("target") is first.get("target"):
+            keys.remove(k); keys.insert(0, k); break
+    return keys
+
+
+class _Node:
+    __slots__ = ("visits", "value", "children")
+    def __init__(self):
+        self.visits = 0; self.value = 0.0
+        self.children: Dict[ActionKey, "_Node"] = {}
+    def mean(self) -> float: return self.value / self.visits if self.visits else 0.0
+
+
+def _select(node: _Node, keys: List[ActionKey], c: float) -> Tuple[ActionKey, bool]:
+    """UCT over the keys available in this sample; unvisited keys first. -> (key, expanded)."""
+    for k in keys:
+        if k not in node.children:
+            node.children[k] = _Node(); return k, True
+    log_n = math.log(max(1, node.visits)); best = keys[0]; best_score = -1.0
+    for k in keys:
+        ch = node.children[k]
+        score = ch.mean() + c * math.sqrt(log_n / max(1, ch.visits))
+        if score > best_score: best, best_score = k, score
+    return best, False
+
+
+def evaluate(world, team_id) -> float:
+    """1 = win, 0 = loss, 0.5 = draw; otherwise 0.5 +/- half the difference in mean HP fraction."""
+    w = world.winner
+    if w is not None:
+        return 0.5 if w == -1 else (1.0 if w == team_id else 0.0)
+    ours = theirs = 0.0; n_ours = n_theirs = 0
+    for a in world.actors:
+        frac = (max(0, int(getattr(a, "hp", 0))) / max(1, int(getattr(a, "max_hp", 1)))) if _alive(a) else 0.0
+        if _tid(a) == team_id: ours += frac; n_ours += 1
+        else: theirs += frac; n_theirs += 1
+    return 0.5 + 0.5 * (ours / max(1, n_ours) - theirs / max(1, n_theirs))
+
+class _TreePolicy:
+    """Controller installed for the searching team during rollouts: walks/expands the tree."""
+    def __init__(self, owner: "MCTSController"):
+        self.owner = owner
+        self.node: Optional[_Node] = None   # None = out of the tree, play the default policy
+        self.path: List[_Node] = []
+
+    def decide(self, world, me) -> List[Dict[str, Any]]:
+        # out of the tree, or at a node too young to branch: core.tactics.choose_intent plays
+        if self.node is None or self.node.visits < self.owner.expand_after: return []
+        cands = candidate_intents(world, me)
+        key, expanded = _select(self.node, _policy_first(world, me, cands), self.owner.c_uct)
+        self.node = self.node.children[key]; self.path.append(self.node)
+        if expanded: self.node = None      # one expansion per rollout
+        return dict(cands)[key]
+
+
+class MCTSController(BaseController):
+    """
+    Searches the candidate intents of the acting fighter with UCT rollouts on a forked combat.
+      rollouts        hard rollout budget per decision (deterministic)
+      time_budget     optional wall-clock cap in seconds (not reproducible)
+      horizon_rounds  rollouts stop this many rounds ahead and are scored by `evaluate`
+      expand_after    visits a node needs before the team's next decision below it is searched
+                      (before that, teammates follow the greedy router, which keeps focus fire intact)
+    `stats` accumulates decisions/rollouts/seconds; see `rollouts_per_second`.
+    """
+    def __init__(self, *, rollouts: int = 64, time_budget: Optional[float] = None, horizon_rounds: int = 2,
+                 c_uct: float = 1.4, expand_after: int = 32, seed: int = 0, reuse_tree: bool = True):
+        self.rollouts = max(1, int(rollouts))
+        self.time_budget = time_budget
+        self.horizon_rounds = max(1, int(horizon_rounds))
+        self.c_uct = float(c_uct)
+        self.expand_after = max(1, int(expand_after))
+        self.seed = int(seed)
+        self.reuse_tree = bool(reuse_tree)
+        self.stats: Dict[str, float] = {"decisions": 0, "rollouts": 0, "seconds": 0.0, "reused_visits": 0}
+        self._roots: Dict[Any, Tuple[int, int, _Node]] = {}   # team -> (id(world), turn_no, next root)
+
+    @property
+    def rollouts_per_second(self) -> float:
+        s = self.stats["seconds"]; return self.stats["rollouts"] / s if s > 0 else 0.0
+
+    def _root_for(self, world, team) -> _Node:
+        saved = self._roots.pop(team, None)
+        if self.reuse_tree and saved and saved[0] == id(world) and saved[1] < world.turn_no:
+            self.stats["reused_visits"] += saved[2].visits
+            return saved[2]
+        return _Node()
+
+    def decide(self, world, actor) -> List[Dict[str, Any]]:
+        cands = candidate_intents(world, actor)
+        if len(cands) == 1: return cands[0][1]
+        team = _tid(actor); root = self._root_for(world, team)
+        by_key = dict(cands)
+        base_seed = mix(self.seed, "mcts", str(getattr(world, "seed", 0)), str(world.turn_no))
+        stop_round = world.round + self.horizon_rounds
+        policy = _TreePolicy(self)
+
+        snap = world.snapshot()
+        keys = _policy_first(world, actor, cands)  # after the snapshot: the router may touch actor state
+        saved = (world.events, world.controllers, world.recorder, world.replay)
+        world.set_event_sink(NullSink()); world.controllers = {team: policy}
+        world.recorder = None; world.replay = None
+        t0 = time.perf_counter(); done = 0
+        try:
+            while done < self.rollouts:
+                if self.time_budget is not None and done and time.perf_counter() - t0 >= self.time_budget: break
+                key, _ = _select(root, keys, self.c_uct)
+                child = root.children[key]
+                # common random numbers: the i-th rollout of every candidate sees the same dice
+                world.reseed(base_seed + child.visits)
+                policy.node = child; policy.path = [root, child]
+                world.resolve_intents(actor, _copy_intents(by_key[key]))
+                while world.winner is None and world.round < stop_round:
+                    world.take_turn()
+                value = evaluate(world, team)
+                for n in policy.path:
+                    n.visits += 1; n.value += value
+                world.restore(snap); done += 1
+        finally:
+            world.restore(snap)
+            world.set_event_sink(saved[0]); world.controllers, world.recorder, world.replay = saved[1:]
+        self.stats["decisions"] += 1; self.stats["rollouts"] += done
+        self.stats["seconds"] += time.perf_counter() - t0
+
+        best = max(keys, key=lambda k: (root.children[k].visits, root.children[k].mean()) if k in root.children else (-1, 0.0))
+        self._roots[team] = (id(world), world.turn_no, root.children.get(best) or _Node())
+        return _copy_intents(by_key[best])
+
+
+def _copy_intents(intents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # the engine rewrites targets of taunted actors in place; keep the candidates pristine
+    return [dict(it) for it in intents]
@@ -1,59 +1,163 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-# Simple, global Opposition Instructions map used by TBCombat.
+from engine.tactics.opposition import CompiledInstruction, OppositionInstruction, compile_instruction, unit_attr
+
+# Opposition Instructions (OI) for TBCombat.
 # Keep it tiny & safe: if nothing set, we just return base score.
+#
+# Each match owns an OIContext (TBCombat(oi=...) / `combat.oi`): the OI map plus an OIBiasTable
+# compiled from its per-target parts (role preferences and OppositionInstructions). A target's bias
+# is cached and only re-evaluated when one of the attributes the instructions read (role, pid,
+# queried stats) changes on that target. Contexts pickle as their map, so they can be shipped to
+# worker processes. set_oi_map/clear_oi only change the default a TBCombat picks up when it is
+# built without `oi`; matches already running keep their own context.
+
+OI_PRIORITY_BIAS = 10.0  # score per priority step of a matching instruction (unless it sets "bias")
+OI_RANK_STEP = 10.0      # score per place in a targeting rule's ranking (engine.world_view.WorldView.oi_pick)
+
+def _instruction(spec: Any) -> OppositionInstruction:
+    if isinstance(spec, OppositionInstruction): return spec
+    return OppositionInstruction(target_kind=spec.get("target_kind", "role"), target_value=str(spec.get("target_value", "")),
+                                 directives=dict(spec.get("directives", {}) or {}), priority=int(spec.get("priority", 1)),
+                                 trigger=spec.get("trigger"))
+
+def instruction_bias(oi: OppositionInstruction) -> float:
+    b = (oi.directives or {}).get("bias")
+    try: return float(b) if b is not None else OI_PRIORITY_BIAS * max(0, int(oi.priority))
+    except (TypeError, ValueError): return 0.0
+
+
+class OIBiasTable:
+    """
+    Per-target score bias from compiled opposition instructions.
+    `build(roster)` evaluates every instruction against the whole roster up front; `bias(target)`
+    is then a dict lookup plus a check of the (few) watched attributes.
+    """
+    def __init__(self, instructions: Iterable[OppositionInstruction] = ()):
+        self.rules: Tuple[CompiledInstruction, ...] = tuple(compile_instruction(oi) for oi in instructions)
+        self.weights: Tuple[float, ...] = tuple(instruction_bias(r.instruction) for r in self.rules)
+        self.watch: Tuple[str, ...] = tuple(dict.fromkeys(a for r in self.rules for a in r.attrs))
+        # id(target) -> (target, watched values, bias); the row keeps its target alive, so the id
+        # cannot be reused by another actor while the row exists
+        self._rows: Dict[int, Tuple[Any, Tuple[Any, ...], float]] = {}
+        self.evaluations = 0
+
+    @classmethod
+    def from_map(cls, oi: Dict[str, Any]) -> "OIBiasTable":
+        rules: List[OppositionInstruction] = []
+        prefs = oi.get("prefer_roles", {})
+        if isinstance(prefs, dict):
+            for role, pts in prefs.items():
+                try: rules.append(OppositionInstruction("role", str(role), {"bias": float(pts)}))
+                except (TypeError, ValueError): pass
+        for spec in oi.get("instructions", ()) or ():
+            try: rules.append(_instruction(spec))
+            except (AttributeError, TypeError, ValueError): pass
+        return cls(rules)
+
+    def __bool__(self) -> bool: return bool(self.rules)
+
+    def _sig(self, target) -> Tuple[Any, ...]: return tuple(unit_attr(target, a) for a in self.watch)
+    def _evaluate(self, target, sig) -> float:
+        self.evaluations += 1
+        b = sum(w for r, w in zip(self.rules, self.weights, strict=True) if r.matches(target))
+        self._rows[id(target)] = (target, sig, b)
+        return b
+
+    def build(self, roster: Iterable[Any]) -> "OIBiasTable":
+        """Evaluate every instruction against `roster` (e.g. the enemy team at match start)."""
+        for u in roster: self._evaluate(u, self._sig(u))
+        return self
+
+    def bias(self, target) -> float:
+        if not self.rules: return 0.0
+        row = self._rows.get(id(target)); sig = self._sig(target)
+        if row is not None and row[1] == sig: return row[2]
+        return self._evaluate(target, sig)
+    def clear(self) -> None: self._rows.clear()
+
+
+class OIContext:
+    """One match's opposition instructions: the OI map and its compiled bias table."""
+    __slots__ = ("oi", "table")
+
+    def __init__(self, oi: Dict[str, Any] | None = None):
+        self.oi: Dict[str, Any] | None = dict(oi) if isinstance(oi, dict) else None
+        self.table: Optional[OIBiasTable] = OIBiasTable.from_map(self.oi) if self.oi is not None else None
+
+    @classmethod
+    def of(cls, oi: Any) -> "OIContext":
+        """Use a context as-is; build one from an OI map (or None)."""
+        return oi if isinstance(oi, OIContext) else cls(oi)
+    @classmethod
+    def for_match(cls, oi: Any) -> "OIContext":
+        """A new context (and bias table) for one match, from a map or another context's map."""
+        return cls(oi.oi if isinstance(oi, OIContext) else oi)
+    def __reduce__(self): return (OIContext, (self.oi,))   # compiled predicates are rebuilt on unpickle
+    def __bool__(self) -> bool: return self.oi is not None
 
-_OI: Dict[str, Any] | None = None
+    def prime(self, roster: Iterable[Any]) -> None:
+        """Batch-evaluate the instructions against `roster` (TBCombat does this at match start)."""
+        if self.table: self.table.build(roster)
+
+    def apply(self, attacker, target, base_score: float) -> float:
+        oi = self.oi
+        if not isinstance(oi, dict):
+            return float(base_score)
+
+        score = float(base_score)
+
+        # Bias: prefer targets with low HP
+        if oi.get("focus_low_hp"):
+            # + up to ~15 pts when target is near 0 HP
+            try:
+                hp = int(getattr(target, "hp", 0))
+                mx = max(1, int(getattr(target, "max_hp", 1)))
+                frac = 1.0 - (hp / mx)
+                score += 15.0 * max(0.0, min(1.0, frac))
+            except Exception:
+                pass
+
+        # Bias: role preferences (e.g., "Healer": +20) and instructions, from the compiled table
+        table = self.table
+        if table:
+            score += table.bias(target)
+
+        return float(score)
+
+
+_DEFAULT = OIContext()  # replaced (never mutated) by set_oi_map, so a captured context stays stable
 
 def set_oi_map(oi: Dict[str, Any] | None) -> None:
     """
+    Set the default OI for matches built from now on without an explicit `oi`.
     oi example:
       {
         "focus_low_hp": True,
-        "prefer_roles": {"Healer": 20, "Bruiser": 10}
+        "prefer_roles": {"Healer": 20, "Bruiser": 10},
+        "instructions": [OppositionInstruction("attribute_query", "DEX>=14 AND role=Healer", {}, 2)]
       }
     """
-    global _OI
-    _OI = dict(oi) if isinstance(oi, dict) else None
+    global _DEFAULT
+    _DEFAULT = OIContext(oi)
 
 def clear_oi() -> None:
-    global _OI
-    _OI = None
+    global _DEFAULT
+    _DEFAULT = OIContext()
+
+def current_oi() -> OIContext:
+    return _DEFAULT
+
+def prime_oi(roster: Iterable[Any]) -> None:
+    """Batch-evaluate the default instructions against `roster` (replacing the rows of earlier rosters)."""
+    if _DEFAULT.table: _DEFAULT.table.clear()
+    _DEFAULT.prime(roster)
 
-def apply_oi_bias(attacker, target, base_score: float) -> float:
+def apply_oi_bias(attacker, target, base_score: float, ctx: Optional[OIContext] = None) -> float:
     """
-    Hook used by engine.tbcombat.TBCombat during target scoring.
-    It receives attacker/target (actors) and a base_score (float).
+    Hook used by engine.tbcombat.TBCombat during target scoring (TBCombat.oi_bias passes its own
+    context). It receives attacker/target (actors) and a base_score (float).
     Return the adjusted score.
     """
-    oi = _OI
-    if not isinstance(oi, dict):
-        return float(base_score)
-
-    score = float(base_score)
-
-    # Bias: prefer targets with low HP
-    if oi.get("focus_low_hp"):
-        # + up to ~15 pts when target is near 0 HP
-        try:
-            hp = int(getattr(target, "hp", 0))
-            mx = max(1, int(getattr(target, "max_hp", 1)))
-            frac = 1.0 - (hp / mx)
-            score += 15.0 * max(0.0, min(1.0, frac))
-        except Exception:
-            pass
-
-    # Bias: role preferences (e.g., "Healer": +20)
-    prefs = oi.get("prefer_roles", {})
-    if isinstance(prefs, dict):
-        role = getattr(target, "role", None)
-        if role is None and isinstance(getattr(target, "__dict__", None), dict):
-            role = target.__dict__.get("role")
-        if role is not None and role in prefs:
-            try:
-                score += float(prefs[role])
-            except Exception:
-                pass
-
-    return float(score)
+    return (ctx if ctx is not None else _DEFAULT).apply(attacker, target, base_score)
@@ -0,0 +1,68 @@
+# engine/analytic.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.rng import CounterRNG
+from engine.profiles import CombatProfile, compile_profile
+
+# Reduced-fidelity match resolution (the "reduced" tier of core.sim).
+# Same rosters and the same to-hit/damage formulas as TBCombat's weapon attacks, but no events, no
+# controllers, no grid and no dice: every attack deals its expected damage against the target's
+# AC (hit chance, crit dice, extra attacks, smite). Each round every living actor, in initiative
+# order, hits the enemy with the least hp left (focus fire) until one side is down. The seed only
+# breaks initiative ties, so results are cheap and stable but carry none of the engine's variance.
+
+@dataclass(frozen=True, slots=True)
+class AnalyticResult:
+    k_home: int           # team 1 fighters downed
+    k_away: int           # team 0 fighters downed
+    winner: Optional[int]  # 0 / 1, -1 = draw (stalemate or round cap)
+    rounds: int
+
+def hit_chance(bonus: int, ac: int) -> float:
+    """P(d20 + bonus >= ac), as TBCombat._attack_roll rolls it (no auto-hit on a 20)."""
+    return max(0.0, min(1.0, (21 + int(bonus) - int(ac)) / 20.0))
+
+def expected_hit_damage(p: CombatProfile, ac: int) -> float:
+    """Expected damage of one main-hand attack by profile `p` against armor class `ac`."""
+    w = p.main; n, s = w.two_handed_dice if (w.two_handed_in_use and w.two_handed_dice) else w.dice
+    bonus = w.atk_mod + p.prof + p.style_bonus(w.is_ranged)
+    ph = hit_chance(bonus, ac); pc = 0.05 if 20 + bonus >= ac else 0.0
+    dice = n * (s + 1) / 2.0
+    per_hit = dice + w.atk_mod + p.prof
+    if p.smite_nd6 and not w.is_ranged: per_hit += p.smite_chance * p.smite_nd6 * 3.5
+    dmg = ph * max(0.0, per_hit) + pc * dice
+    return dmg * (1.0 + p.hooks.extra_attacks * ph)  # follow-ups only after a hit
+
+def _initiative(actors: Sequence[Any], profiles: List[CombatProfile], seed: int) -> List[int]:
+    rng = CounterRNG(seed); ties = [rng.random() for _ in actors]
+    return sorted(range(len(actors)), key=lambda i: (-profiles[i].dex_mod, ties[i]))
+
+def resolve_analytic(actors: Sequence[Any], *, seed: int = 1, max_rounds: int = 100) -> AnalyticResult:
+    """Resolve a roster (team_id 0 vs 1) analytically; the actors themselves are not modified."""
+    profiles = [compile_profile(a) for a in actors]
+    team = [int(getattr(a, "team_id", 0) or 0) for a in actors]
+    hp = [float(getattr(a, "hp", 1) or 0) if getattr(a, "alive", True) else 0.0 for a in actors]
+    ac = [int(getattr(a, "ac", getattr(a, "AC", 10))) for a in actors]
+    start = [sum(1 for i in range(len(actors)) if team[i] == t and hp[i] > 0) for t in (0, 1)]
+    # expected damage per (attacker, defender) pair, computed once
+    dmg: Dict[Tuple[int, int], float] = {}
+    order = _initiative(actors, profiles, seed)
+    rounds = 0; winner: Optional[int] = None
+    while rounds < max_rounds:
+        rounds += 1; dealt = 0.0
+        for i in order:
+            if hp[i] <= 0: continue
+            foes = [j for j in range(len(actors)) if team[j] != team[i] and hp[j] > 0]
+            if not foes: break
+            j = min(foes, key=lambda k: (hp[k], k))
+            d = dmg.get((i, j))
+            if d is None: d = dmg[(i, j)] = expected_hit_damage(profiles[i], ac[j])
+            hp[j] -= d; dealt += d
+        alive = [sum(1 for i in range(len(actors)) if team[i] == t and hp[i] > 0) for t in (0, 1)]
+        if not alive[0] or not alive[1]:
+            winner = 0 if alive[0] else (1 if alive[1] else -1); break
+        if dealt <= 0: break  # nobody can hurt anybody
+    alive = [sum(1 for i in range(len(actors)) if team[i] == t and hp[i] > 0) for t in (0, 1)]
+    return AnalyticResult(start[1] - alive[1], start[0] - alive[0], -1 if winner is None else winner, rounds)
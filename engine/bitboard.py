@@ -0,0 +1,126 @@
+# engine/bitboard.py
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Bitboards for the battle grid.
+# A board is a Python int with bit (y * width + x) set for each occupied tile; a 16x16 grid fits
+# in 256 bits. Region masks (Manhattan balls, squares, lines) are precomputed per grid size, so
+# "who is within r of (x, y)" becomes `team_bits & ball(...)` plus a walk over the set bits.
+
+Cell = Tuple[int, int]
+
+def bit_index(width: int, x: int, y: int) -> int: return y * width + x
+
+def iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+@lru_cache(maxsize=None)
+def ball(width: int, height: int, x: int, y: int, r: int) -> int:
+    """Tiles within Manhattan distance r of (x, y) (the engine's distance metric)."""
+    m = 0
+    for yy in range(max(0, y - r), min(height, y + r + 1)):
+        span = r - abs(yy - y)
+        x0 = max(0, x - span); x1 = min(width - 1, x + span)
+        if x0 <= x1: m |= ((1 << (x1 - x0 + 1)) - 1) << (yy * width + x0)
+    return m
+
+@lru_cache(maxsize=None)
+def square(width: int, height: int, x: int, y: int, r: int) -> int:
+    """Tiles within Chebyshev distance r of (x, y) (a (2r+1)-wide square)."""
+    m = 0
+    x0 = max(0, x - r); x1 = min(width - 1, x + r)
+    if x0 > x1: return 0
+    row = (1 << (x1 - x0 + 1)) - 1
+    for yy in range(max(0, y - r), min(height, y + r + 1)):
+        m |= row << (yy * width + x0)
+    return m
+
+def cells_mask(width: int, height: int, cells) -> int:
+    m = 0
+    for x, y in cells:
+        if 0 <= x < width and 0 <= y < height: m |= 1 << (y * width + x)
+    return m
+
+
+class Occupancy:
+    """
+    Per-team occupancy bitboards of the living actors, kept in sync by TBCombat on every move
+    and death. Actors standing outside the grid are tracked separately and matched by distance.
+    """
+    def __init__(self, width: int, height: int, actors: List[Any] = (), alive=None):
+        self.width = int(width); self.height = int(height)
+        self.version = 0
+        self.teams: Dict[Any, int] = {}
+        self._at: Dict[int, List[Any]] = {}       # bit -> actors on that tile (stacking is allowed)
+        self._offgrid: List[Any] = []
+        for a in actors:
+            if alive is None or alive(a): self.add(a)
+
+    def _index(self, a) -> Optional[int]:
+        x = getattr(a, "tx", 0) or 0; y = getattr(a, "ty", 0) or 0
+        if 0 <= x < self.width and 0 <= y < self.height: return y * self.width + x
+        return None
+
+    def add(self, a) -> None:
+        i = self._index(a); tid = getattr(a, "team_id", 0); self.version += 1
+        self.teams.setdefault(tid, 0)
+        if i is None: self._offgrid.append(a); return
+        self._at.setdefault(i, []).append(a)
+        self.teams[tid] |= 1 << i
+
+    def remove(self, a) -> None:
+        """Call before changing the actor's position (or after it dies)."""
+        i = self._index(a); tid = getattr(a, "team_id", 0); self.version += 1
+        if i is None:
+            self._offgrid = [o for o in self._offgrid if o is not a]
+            return
+        here = self._at.get(i)
+        k = next((k for k, o in enumerate(here or ()) if o is a), None)
+        if k is None: return
+        del here[k]
+        if not any(getattr(o, "team_id", 0) == tid for o in here):
+            self.teams[tid] = self.teams.get(tid, 0) & ~(1 << i)
+        if not here: del self._at[i]
+
+    def mask(self, team=None, *, exclude_team=None) -> int:
+        if team is not None: return self.teams.get(team, 0)
+        m = 0
+        for t, bits in self.teams.items():
+            if exclude_team is None or t != exclude_team: m |= bits
+        return m
+
+    def actors_in(self, region: int, team=None, *, exclude_team=None) -> List[Any]:
+        """Living actors on the tiles of `region` (a mask), optionally filtered by team."""
+        hits = self.mask(team, exclude_team=exclude_team) & region
+        out: List[Any] = []
+        for i in iter_bits(hits):
+            for a in self._at.get(i, ()):
+                tid = getattr(a, "team_id", 0)
+                if (team is None or tid == team) and (exclude_team is None or tid != exclude_team): out.append(a)
+        return out
+
+    def within(self, xy: Cell, r: int, team=None, *, exclude_team=None) -> List[Any]:
+        x, y = xy
+        out = self.actors_in(ball(self.width, self.height, x, y, r), team, exclude_team=exclude_team) if r >= 0 else []
+        for a in self._offgrid:
+            tid = getattr(a, "team_id", 0)
+            if (team is not None and tid != team) or (exclude_team is not None and tid == exclude_team): continue
+            if abs(getattr(a, "tx", 0) - x) + abs(getattr(a, "ty", 0) - y) <= r: out.append(a)
+        return out
+
+    @property
+    def has_offgrid(self) -> bool: return bool(self._offgrid)
+
+    def at(self, xy: Cell) -> List[Any]:
+        x, y = xy
+        if not (0 <= x < self.width and 0 <= y < self.height): return []
+        return list(self._at.get(y * self.width + x, ()))
+
+    def is_occupied(self, xy: Cell, team=None) -> bool:
+        x, y = xy
+        if not (0 <= x < self.width and 0 <= y < self.height): return False
+        return bool(self.mask(team) >> (y * self.width + x) & 1)
@@ -0,0 +1,159 @@
+# engine/class_features.py
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Class-feature hooks for TBCombat.
+# Features register against a class (or "*" for every class) from a minimum level; compile_profile
+# resolves the (class, level) pair once into a FeatureHooks bundle stored on the actor's
+# CombatProfile, so the attack/save paths just run a short prebuilt tuple instead of testing class
+# names inline. Adding a class means registering its hooks here, not another branch per attack.
+#
+# Hook points and their signatures (cmb = the TBCombat, p = the actor's CombatProfile):
+#   on_attack_roll(p, is_ranged) -> int                                extra to-hit; reads only the
+#                                      profile, so engine.lockstep/analytic fold it in per weapon too
+#   on_damage_roll(cmb, attacker, item, p, is_ranged, crit, two_handed) -> Optional[int]
+#                                                                      replaces the weapon roll
+#   on_hit(cmb, attacker, target, p, is_ranged) -> int                 extra damage after a hit
+#   on_save(cmb, target, ability, vs_condition) -> int                 +1 advantage / -1 disadvantage
+#   on_turn_start(cmb, actor) -> None
+#   on_hide(cmb, actor, p) -> int                                      extra to the stealth roll
+#   aura(cmb, actor) -> Optional[Aura]                                 what the actor projects on allies
+# plus `extra_attacks`, a count of follow-up attacks after a hit (register_extra_attack), and
+# class actions: intent types only the class can resolve, `fn(cmb, actor, intent) -> None`
+# (register_action).
+
+HOOK_POINTS: Tuple[str, ...] = ("on_attack_roll", "on_damage_roll", "on_hit", "on_save", "on_turn_start", "on_hide", "aura")
+
+class Aura(NamedTuple):
+    radius: int
+    int_bonus: int = 0
+    no_fear: bool = False
+
+@dataclass(frozen=True, slots=True)
+class FeatureHooks:
+    on_attack_roll: Tuple[Callable, ...] = ()
+    on_damage_roll: Tuple[Callable, ...] = ()
+    on_hit: Tuple[Callable, ...] = ()
+    on_save: Tuple[Callable, ...] = ()
+    on_turn_start: Tuple[Callable, ...] = ()
+    on_hide: Tuple[Callable, ...] = ()
+    aura: Tuple[Callable, ...] = ()
+    extra_attacks: int = 0
+    actions: Tuple[Tuple[str, Callable], ...] = ()   # (intent type, handler)
+
+    def action(self, itype: str) -> Optional[Callable]:
+        """The handler of class action `itype`, or None if this class/level has no such action."""
+        for name, fn in self.actions:
+            if name == itype: return fn
+        return None
+
+NO_HOOKS = FeatureHooks()
+
+# class -> [(min level, hook point, fn or count)], in registration order
+_REGISTRY: Dict[str, List[Tuple[int, str, Any]]] = {}
+
+def _norm(cls: str) -> str: return "*" if cls == "*" else str(cls or "").capitalize()
+
+def register(cls: str, point: str, *, level: int = 1) -> Callable[[Callable], Callable]:
+    """Decorator: run `fn` at `point` for actors of `cls` (or "*") from `level` on."""
+    if point not in HOOK_POINTS: raise ValueError(f"unknown hook point: {point!r} (expected one of {HOOK_POINTS})")
+    def deco(fn: Callable) -> Callable:
+        _REGISTRY.setdefault(_norm(cls), []).append((int(level), point, fn)); _resolve.cache_clear()
+        return fn
+    return deco
+
+def register_extra_attack(cls: str, *, level: int, count: int = 1) -> None:
+    _REGISTRY.setdefault(_norm(cls), []).append((int(level), "extra_attacks", int(count))); _resolve.cache_clear()
+
+def register_action(cls: str, itype: str, *, level: int = 1) -> Callable[[Callable], Callable]:
+    """Decorator: resolve intents of type `itype` with `fn` for actors of `cls` from `level` on."""
+    def deco(fn: Callable) -> Callable:
+        _REGISTRY.setdefault(_norm(cls), []).append((int(level), "actions", (str(itype), fn))); _resolve.cache_clear()
+        return fn
+    return deco
+
+def resolve(cls: str, level: int) -> FeatureHooks:
+    """The hooks an actor of `cls` at `level` runs ("*" hooks first); cached per (class, level)."""
+    return _resolve(_norm(cls), int(level or 1))
+
+@lru_cache(maxsize=None)
+def _resolve(cls: str, level: int) -> FeatureHooks:
+    points: Dict[str, List[Callable]] = {k: [] for k in HOOK_POINTS}; extra = 0
+    actions: Dict[str, Callable] = {}
+    for key in ("*", cls):
+        for min_level, point, fn in _REGISTRY.get(key, ()):
+            if level < min_level: continue
+            if point == "extra_attacks": extra += fn
+            elif point == "actions": actions[fn[0]] = fn[1]   # the class's own handler wins over "*"
+            else: points[point].append(fn)
+    if not extra and not actions and not any(points.values()): return NO_HOOKS
+    return FeatureHooks(extra_attacks=extra, actions=tuple(actions.items()), **{k: tuple(v) for k, v in points.items()})
+
+
+# ---------------- Built-in features ----------------
+def _pname(f) -> str: return getattr(f, "name", getattr(f, "id", "player"))
+
+# Crusader: divine smite on melee hits (chance and Nd6 from core.classes)
+@register("Crusader", "on_hit")
+def _crusader_smite(cmb, attacker, target, p, is_ranged: bool) -> int:
+    if is_ranged: return 0
+    chance = p.smite_chance; nd6 = p.smite_nd6
+    if nd6 <= 0 or not cmb.dice.chance(chance): return 0
+    extra = cmb.dice.sum(nd6, 6)
+    if cmb._ev_level: cmb.events.append({"type":"cru_smite","attacker":_pname(attacker),"defender":_pname(target),"nd6":nd6,"extra":int(extra),"chance":chance})
+    return extra
+
+# Crusader L2: two-handed melee damage rolls twice and keeps the better
+@register("Crusader", "on_damage_roll", level=2)
+def _crusader_great_weapon(cmb, attacker, item, p, is_ranged: bool, crit: bool, two_handed: bool) -> Optional[int]:
+    if not two_handed or is_ranged: return None
+    d1 = cmb._roll_damage_once(attacker, item, is_ranged=is_ranged, crit=crit, versatile_two_handed=True)
+    d2 = cmb._roll_damage_once(attacker, item, is_ranged=is_ranged, crit=crit, versatile_two_handed=True)
+    return max(d1, d2)
+
+# Crusader L5: one extra attack after a hit
+register_extra_attack("Crusader", level=5)
+
+# Crusader auras: INT save bonus and frightened immunity for allies in range
+@register("Crusader", "aura")
+def _crusader_aura(cmb, actor) -> Optional[Aura]:
+    return Aura(int(getattr(actor, "cru_aura_radius", 0)), int(getattr(actor, "cru_aura_int_bonus", 0)),
+                bool(getattr(actor, "cru_aura_no_fear", False)))
+
+# Crusader: lay on hands, healing an ally from the cru_lay_on_hands_current pool
+@register_action("Crusader", "lay_on_hands")
+def _crusader_lay_on_hands(cmb, actor, intent: Dict[str, Any]) -> None:
+    target = intent.get("target", actor)
+    amount = max(0, int(intent.get("amount", 0)))
+    pool = int(getattr(actor, "cru_lay_on_hands_current", 0))
+    if amount <= 0 or pool <= 0:
+        if cmb._ev_level: cmb.events.append({"type":"loh","player":_pname(actor),"target":_pname(target),"healed":0,"reason":"no_pool_or_zero_amount"})
+        return
+    heal = min(amount, pool)
+    before = int(getattr(target, "hp", 0))
+    target.hp = min(int(getattr(target, "max_hp", getattr(target, "hp", 1))), before + heal)
+    if target.hp > before: cmb._last_progress_round = cmb.round; cmb._world_rev += 1
+    actor.cru_lay_on_hands_current = pool - heal
+    if cmb._ev_level: cmb.events.append({"type":"loh","player":_pname(actor),"target":_pname(target),"healed":int(heal),"pool_left":int(actor.cru_lay_on_hands_current)})
+
+# Stalker L2: +2 to hit with ranged attacks
+@register("Stalker", "on_attack_roll", level=2)
+def _stalker_ranged_style(p, is_ranged: bool) -> int:
+    return 2 if is_ranged else 0
+
+# Stalker L10: +10 to hide
+@register("Stalker", "on_hide", level=10)
+def _stalker_hide(cmb, actor, p) -> int:
+    return 10
+
+# Stalker L20: INT mod to every attack
+@register("Stalker", "on_attack_roll", level=20)
+def _stalker_insight(p, is_ranged: bool) -> int:
+    return p.int_mod
+
+# Wizard: advantage on saves against blinded/deafened (flag set by core.classes)
+@register("Wizard", "on_save")
+def _wizard_sense_ward(cmb, target, ability: str, vs_condition: Optional[str]) -> int:
+    return 1 if vs_condition in ("blinded", "deafened") and bool(getattr(target, "wiz_adv_vs_blind_deaf", False)) else 0
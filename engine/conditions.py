@@ -1,13 +1,57 @@
 # engine/conditions.py
 from __future__ import annotations
-from typing import Dict
+import heapq
+from typing import Any, Dict, List, Tuple
+
+# Conditions for TBCombat.
+# An actor's active conditions are one int, `_cond_mask` (bit per condition), so rule checks are
+# bit tests against the masks below. Durations live in the match's ConditionClock
+# (`TBCombat.conditions`): a min-heap of (expiry round, actor index, bit), so the round-start tick
+# pops only what expires instead of walking every actor's timers. Refreshing or clearing a
+# condition leaves the old heap entry behind; it is skipped when popped (its round no longer
+# matches `_until`).
+#
+# A condition added for n rounds during round r expires at the start of round r + n. Outside a
+# match, add_condition also records the duration in the legacy `_conditions` bag
+# ({name: rounds left}); TBCombat adopts those bags when it is built.
 
 CONDITION_PRONE = "prone"
 CONDITION_RESTRAINED = "restrained"
 CONDITION_STUNNED = "stunned"
+# inflicted by catalog spells (engine.spellbook)
+CONDITION_BLINDED = "blinded"
+CONDITION_CHARMED = "charmed"
+CONDITION_FRIGHTENED = "frightened"
+CONDITION_PARALYZED = "paralyzed"
+CONDITION_POISONED = "poisoned"
+
+CONDITIONS: Tuple[str, ...] = (CONDITION_PRONE, CONDITION_RESTRAINED, CONDITION_STUNNED, CONDITION_BLINDED,
+                               CONDITION_CHARMED, CONDITION_FRIGHTENED, CONDITION_PARALYZED, CONDITION_POISONED)
+ALL_CONDITIONS = frozenset(CONDITIONS)
+BIT: Dict[str, int] = {name: 1 << i for i, name in enumerate(CONDITIONS)}
+
+PRONE = BIT[CONDITION_PRONE]; RESTRAINED = BIT[CONDITION_RESTRAINED]; STUNNED = BIT[CONDITION_STUNNED]
+BLINDED = BIT[CONDITION_BLINDED]; CHARMED = BIT[CONDITION_CHARMED]; FRIGHTENED = BIT[CONDITION_FRIGHTENED]
+PARALYZED = BIT[CONDITION_PARALYZED]; POISONED = BIT[CONDITION_POISONED]
+
+# Rule masks (attack and save paths)
+ATTACKS_AT_DISADVANTAGE = BLINDED | FRIGHTENED | POISONED | PRONE | RESTRAINED   # the attacker has one
+ATTACKED_AT_ADVANTAGE = BLINDED | PARALYZED | RESTRAINED | STUNNED               # the defender has one
+INCAPACITATED = PARALYZED | STUNNED
+FAILS_STR_DEX_SAVES = INCAPACITATED
+DEX_SAVE_DISADVANTAGE = RESTRAINED
+
+
+def mask_of(f) -> int: return getattr(f, "_cond_mask", 0) or 0
 
-ALL_CONDITIONS = {CONDITION_PRONE, CONDITION_RESTRAINED, CONDITION_STUNNED}
+def names(mask: int) -> List[str]:
+    return [n for n in CONDITIONS if mask & BIT[n]]
 
+def has_condition(f, name: str) -> bool:
+    return bool(mask_of(f) & BIT.get(name, 0))
+
+
+# ---------------- Outside a match (legacy bag) ----------------
 def ensure_bag(f) -> Dict[str, int]:
     """Ensure a dict bag for conditions exists on fighter."""
     if not hasattr(f, "_conditions") or not isinstance(getattr(f, "_conditions"), dict):
@@ -17,23 +61,22 @@ def ensure_bag(f) -> Dict[str, int]:
             pass
     return getattr(f, "_conditions", {})
 
-def has_condition(f, name: str) -> bool:
-    bag = ensure_bag(f)
-    return int(bag.get(name, 0)) > 0
-
 def add_condition(f, name: str, rounds: int):
+    """Set `name` on `f` for `rounds` rounds before a match (in one, use TBCombat.add_condition)."""
     if name not in ALL_CONDITIONS:
         return
     bag = ensure_bag(f)
     bag[name] = max(int(bag.get(name, 0)), 0) + max(0, int(rounds))
+    f._cond_mask = mask_of(f) | BIT[name]
 
 def clear_condition(f, name: str):
-    bag = ensure_bag(f)
-    if name in bag:
+    bag = getattr(f, "_conditions", None)
+    if bag and name in bag:
         del bag[name]
+    if mask_of(f) & BIT.get(name, 0): f._cond_mask = mask_of(f) & ~BIT[name]
 
 def decrement_all_for_turn(f) -> Dict[str, int]:
-    """Decrement all durations at the start of f's turn. Returns ended {name: old_value}."""
+    """Decrement all bag durations (for actors handled outside TBCombat). Returns ended {name: old_value}."""
     bag = ensure_bag(f)
     ended = {}
     keys = list(bag.keys())
@@ -43,6 +86,68 @@ def decrement_all_for_turn(f) -> Dict[str, int]:
         if v <= 0:
             ended[k] = int(bag.get(k, 0))
             del bag[k]
+            clear_condition(f, k)
         else:
             bag[k] = v
     return ended
+
+
+# ---------------- In a match ----------------
+class ConditionClock:
+    """Expiry rounds for one match's conditions (min-heap, lazily invalidated)."""
+    __slots__ = ("actors", "_index", "_heap", "_until")
+
+    def __init__(self, actors: List[Any]):
+        self.actors = actors
+        self._index = {id(a): i for i, a in enumerate(actors)}
+        self._heap: List[Tuple[int, int, int]] = []          # (expiry round, actor index, bit)
+        self._until: Dict[Tuple[int, int], int] = {}          # (actor index, bit) -> live expiry round
+
+    def adopt(self, now: int) -> None:
+        """Take over the legacy `_conditions` bags set before the match (as if added in round `now`)."""
+        for a in self.actors:
+            bag = getattr(a, "_conditions", None)
+            if not bag: continue
+            for name, rounds in sorted(bag.items()): self.add(a, name, int(rounds), now)
+            bag.clear()
+
+    def add(self, f, name: str, rounds: int, now: int) -> bool:
+        """Set `name` on `f` until the start of round `now + rounds` (an active longer duration is kept)."""
+        bit = BIT.get(name)
+        if bit is None or rounds <= 0: return False
+        key = (self._index[id(f)], bit); until = now + int(rounds)
+        f._cond_mask = mask_of(f) | bit
+        if until > self._until.get(key, 0):
+            self._until[key] = until; heapq.heappush(self._heap, (until, key[0], bit))
+        return True
+
+    def clear(self, f, name: str) -> None:
+        bit = BIT.get(name, 0)
+        if mask_of(f) & bit: f._cond_mask = mask_of(f) & ~bit
+        self._until.pop((self._index.get(id(f), -1), bit), None)
+
+    def remaining(self, f, name: str, now: int) -> int:
+        """Rounds left before `name` expires on `f` (0 when it is not active)."""
+        if not has_condition(f, name): return 0
+        until = self._until.get((self._index[id(f)], BIT[name]))
+        return max(0, until - now) if until is not None else 0
+
+    def expire(self, now: int) -> List[Tuple[Any, str]]:
+        """Drop every condition due by round `now`; -> [(actor, condition)], in expiry order."""
+        heap = self._heap; out = []
+        while heap and heap[0][0] <= now:
+            until, i, bit = heapq.heappop(heap)
+            if self._until.get((i, bit)) != until: continue  # refreshed or cleared since
+            del self._until[(i, bit)]
+            a = self.actors[i]
+            if mask_of(a) & bit:
+                a._cond_mask = mask_of(a) & ~bit; out.append((a, CONDITIONS[bit.bit_length() - 1]))
+        return out
+
+    def __len__(self) -> int: return len(self._until)
+
+    # snapshot support: the heap is small, copies are cheap
+    def get_state(self) -> Tuple[Tuple[Tuple[int, int, int], ...], Tuple[Tuple[Tuple[int, int], int], ...]]:
+        return tuple(self._heap), tuple(self._until.items())
+    def set_state(self, state) -> None:
+        heap, until = state; self._heap = list(heap); self._until = dict(until)
@@ -0,0 +1,184 @@
+# engine/dice.py
+from __future__ import annotations
+import re
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# Dice for TBCombat.
+# Expressions ("1d8", "2d6+3", versatile `two_handed_dice`, smite Nd6 and the cantrip scaling
+# strings of spells_normalized.json like "1d8, 5th level (2d8), 11th level (3d8) ...") are parsed
+# once into Dice / DiceExpr objects and cached by their text.
+#
+# Rolls go through a roller owned by the combat (`TBCombat.dice`):
+#   "randint"   draws from the match RNG with randint/random, in the historical order (default;
+#               seeds replay exactly as they always have)
+#   "buffered"  pulls 32-bit words from a block filled by one `rng.randbytes` call and maps them to
+#               die faces (Lemire's multiply-shift with rejection, so faces stay uniform); d20s are
+#               only drawn twice with advantage/disadvantage. Deterministic per seed within the mode,
+#               but a seed rolls different dice than in "randint" mode.
+
+# ---------------- Expressions ----------------
+@dataclass(frozen=True, slots=True)
+class Dice:
+    count: int
+    sides: int
+    bonus: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.count}d{self.sides}" + (f"{self.bonus:+d}" if self.bonus else "")
+    @property
+    def average(self) -> float: return self.count * (self.sides + 1) / 2 + self.bonus
+
+@dataclass(frozen=True, slots=True)
+class DiceExpr:
+    """Dice that scale with the caster's level: `tiers` are (from level, dice), ascending."""
+    base: Optional[Dice]
+    tiers: Tuple[Tuple[int, Dice], ...] = ()
+
+    def at(self, level: int) -> Optional[Dice]:
+        out = self.base
+        for L, d in self.tiers:
+            if int(level) >= L: out = d
+            else: break
+        return out
+
+_DICE_RE = re.compile(r"(\d*)d(\d+)(?:\s*\(?\s*([+-])\s*(\d+)\s*\)?)?", re.I)
+_TIER_RE = re.compile(r"^\s*(?:and\s+)?(\d+)(?:st|nd|rd|th)?\b(?:\s*level)?", re.I)
+
+@lru_cache(maxsize=None)
+def parse_dice(expr: str) -> Optional[Dice]:
+    """'1d8' -> Dice(1, 8); '2d6+3' -> Dice(2, 6, 3); 'd20' -> Dice(1, 20). None when there is no die."""
+    m = _DICE_RE.search(str(expr or ""))
+    if m is None: return None
+    n, s, sign, bonus = m.groups()
+    b = int(bonus) if bonus else 0
+    return Dice(int(n) if n else 1, int(s), -b if sign == "-" else b)
+
+@lru_cache(maxsize=None)
+def parse_scaling(expr: str) -> DiceExpr:
+    """
+    Cantrip-style scaling strings, e.g. '1d8, 5th level (2d8), 11th level (3d8), and 17th level (4d8)'
+    or '10d8, 17 11d8'. When the text starts at a tier ('5th level (2d8), ...') the base is
+    extrapolated one step down from the first two tiers.
+    """
+    base: Optional[Dice] = None; tiers = []
+    for part in re.split(r",|\band\b(?=\s*\d)", str(expr or "")):
+        d = parse_dice(part) if "d" in part.lower() else None
+        if d is None: continue
+        m = _TIER_RE.match(part)
+        if m and not part.strip().lower().startswith(f"{d.count}d"):
+            tiers.append((int(m.group(1)), d))
+        elif base is None and not tiers:
+            base = d
+    tiers.sort(key=lambda t: t[0])
+    if base is None and tiers:
+        first = tiers[0][1]
+        step = tiers[1][1].count - first.count if len(tiers) > 1 else 1
+        if first.count - step >= 1: base = Dice(first.count - step, first.sides, first.bonus)
+    return DiceExpr(base, tuple(tiers))
+
+
+# ---------------- Rollers ----------------
+class RandintDice:
+    """Rolls straight from the match RNG (randint/random), in the historical consumption order."""
+    mode = "randint"
+    __slots__ = ("rng",)
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def d(self, sides: int) -> int: return self.rng.randint(1, sides)
+    def sum(self, count: int, sides: int) -> int:
+        r = self.rng.randint; return sum(r(1, sides) for _ in range(count))
+    def roll(self, dice: Dice, *, crit: bool = False) -> int:
+        n = dice.count * (2 if crit else 1); return self.sum(n, dice.sides) + dice.bonus
+    def chance(self, p: float) -> bool: return self.rng.random() < p
+    def d20(self, adv: int = 0) -> Tuple[Tuple[int, int, int], int]:
+        """-> ((a, b, kept), kept). Always draws both dice, as the engine always has."""
+        r = self.rng.randint; a = r(1, 20); b = r(1, 20)
+        if   adv > 0: k = max(a, b)
+        elif adv < 0: k = min(a, b)
+        else:         k = a
+        return (a, b, k), k
+
+    # nothing beyond the RNG itself
+    def reset(self) -> None: pass
+    def get_state(self) -> Any: return None
+    def set_state(self, state: Any) -> None: pass
+
+
+class BufferedDice:
+    """Rolls from a block of 32-bit words drawn from the match RNG `block` at a time."""
+    mode = "buffered"
+    BLOCK = 512
+    __slots__ = ("rng", "block", "_fmt", "_buf", "_pos", "refills")
+
+    def __init__(self, rng, block: int = BLOCK):
+        self.rng = rng; self.block = max(1, int(block))
+        self._fmt = f"<{self.block}I"
+        self._buf: Tuple[int, ...] = (); self._pos = 0
+        self.refills = 0
+
+    def _refill(self) -> None:
+        # a fresh tuple per block, so snapshots can hold on to the old one
+        self._buf = struct.unpack(self._fmt, self.rng.randbytes(4 * self.block)); self._pos = 0
+        self.refills += 1
+
+    def _word(self) -> int:
+        if self._pos >= len(self._buf): self._refill()
+        w = self._buf[self._pos]; self._pos += 1
+        return w
+
+    def d(self, sides: int) -> int:
+        pos = self._pos; buf = self._buf
+        if pos >= len(buf): self._refill(); pos = 0; buf = self._buf
+        m = buf[pos] * sides; self._pos = pos + 1
+        if (m & 0xFFFFFFFF) < sides:  # rare: reject the biased low values
+            t = (0x100000000 - sides) % sides
+            while (m & 0xFFFFFFFF) < t: m = self._word() * sides
+        return (m >> 32) + 1
+
+    def sum(self, count: int, sides: int) -> int:
+        pos = self._pos; buf = self._buf; n = len(buf); total = count
+        for _ in range(count):
+            if pos >= n:
+                self._refill(); pos = 0; buf = self._buf; n = len(buf)
+            m = buf[pos] * sides; pos += 1
+            if (m & 0xFFFFFFFF) < sides:
+                self._pos = pos; t = (0x100000000 - sides) % sides
+                while (m & 0xFFFFFFFF) < t: m = self._word() * sides
+                pos = self._pos; buf = self._buf; n = len(buf)
+            total += m >> 32
+        self._pos = pos
+        return total
+
+    def roll(self, dice: Dice, *, crit: bool = False) -> int:
+        n = dice.count * (2 if crit else 1); return self.sum(n, dice.sides) + dice.bonus
+    def chance(self, p: float) -> bool: return self._word() < p * 0x100000000
+    def d20(self, adv: int = 0) -> Tuple[Tuple[int, int, int], int]:
+        if not adv:
+            a = self.d(20); return (a, a, a), a  # straight roll: a single die
+        pos = self._pos; buf = self._buf
+        if pos + 1 < len(buf):
+            ma = buf[pos] * 20; mb = buf[pos + 1] * 20
+            if (ma & 0xFFFFFFFF) >= 20 and (mb & 0xFFFFFFFF) >= 20:  # same words d() would take
+                self._pos = pos + 2; a = (ma >> 32) + 1; b = (mb >> 32) + 1
+                k = (a if a > b else b) if adv > 0 else (a if a < b else b)
+                return (a, b, k), k
+        a = self.d(20); b = self.d(20); k = max(a, b) if adv > 0 else min(a, b)
+        return (a, b, k), k
+
+    def reset(self) -> None:
+        """Drop the buffered words (call after reseeding the RNG)."""
+        self._buf = (); self._pos = 0
+    def get_state(self) -> Tuple[Tuple[int, ...], int]: return (self._buf, self._pos)
+    def set_state(self, state) -> None: self._buf, self._pos = state
+
+
+DICE_MODES: Dict[str, Any] = {"randint": RandintDice, "buffered": BufferedDice}
+
+def make_dice(mode: str, rng):
+    try: return DICE_MODES[str(mode)](rng)
+    except KeyError: raise ValueError(f"unknown dice mode: {mode!r} (expected one of {sorted(DICE_MODES)})") from None
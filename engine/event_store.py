@@ -0,0 +1,227 @@
+# engine/event_store.py
+from __future__ import annotations
+import copy
+import json
+import struct
+from array import array
+from itertools import compress
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from engine.events import EVENT_LEVEL_ALL, EventSink
+
+# Columnar event store for TBCombat.
+# Each event is decomposed into typed parallel arrays (kind, actor, target, d20, total, amount,
+# three small per-kind ints, flags, round, aux string) and only turned back into a dict when
+# indexed, so `ui/state_match._format_event_line` and `core.adapters.as_event_dict` keep working.
+# Keys an event carries beyond its type's spec go to a per-row overflow dict, so a producer adding
+# a field loses nothing. Actors are interned by name (the engine logs names); `names[actor]` maps back.
+
+_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("kind", "B"), ("actor", "h"), ("target", "h"), ("d20", "b"), ("total", "h"), ("amount", "i"),
+    ("x", "h"), ("y", "h"), ("z", "h"), ("flags", "H"), ("round", "H"), ("aux", "h"),
+)
+_COL_NAMES = tuple(c for c, _ in _COLUMNS)
+
+# event type -> [(dict key, column)] ; column "F" is a flag bit, "S" a string interned into aux.
+# A trailing "?" marks a key that is only present on some events of that type.
+_SPECS: Dict[str, List[Tuple[str, str]]] = {
+    "attack_roll":    [("attacker", "actor"), ("defender", "target"), ("d20", "d20"), ("ability_mod", "x"),
+                       ("prof_to_hit", "y"), ("style_bonus", "z"), ("total", "total"), ("ac", "amount"),
+                       ("hit", "F"), ("crit", "F")],
+    "saving_throw":   [("target", "target"), ("ability", "S"), ("d20?", "d20"), ("total?", "total"),
+                       ("dc", "amount"), ("success?", "F"), ("auto?", "S")],
+    "hide_attempt":   [("player", "actor"), ("d20", "d20"), ("dex_mod", "x"), ("bonus10", "y"),
+                       ("stealth", "total"), ("dc", "amount"), ("success", "F")],
+    "detect_hidden":  [("detector", "actor"), ("target", "target"), ("d20", "d20"), ("int_mod", "x"),
+                       ("total", "total"), ("threshold", "amount"), ("success", "F")],
+    "damage":         [("attacker", "actor"), ("defender", "target"), ("amount", "amount"), ("crit", "F"),
+                       ("extra_attack?", "F"), ("opportunity?", "F")],
+    "damage_ignored": [("target", "target"), ("dtype", "S"), ("amount", "amount")],
+    "down":           [("name", "target"), ("team_id", "x"), ("round", "round")],
+    "end":            [("winner", "x"), ("round", "round")],
+    "initiative":     [("actor", "actor"), ("roll", "total")],
+    "round_start":    [("round", "round")],
+    "condition_ended":[("target", "target"), ("condition", "S")],
+    "cru_smite":      [("attacker", "actor"), ("defender", "target"), ("nd6", "x"), ("extra", "amount"),
+                       ("chance", "S")],
+    "taunt":          [("taunter", "actor"), ("target", "target"), ("atk_d20", "d20"), ("def_d20", "x"),
+                       ("atk_total", "total"), ("def_total", "amount"), ("success", "F")],
+    "loh":            [("player", "actor"), ("target", "target"), ("healed", "amount"), ("pool_left?", "x"),
+                       ("reason?", "S")],
+    # cantrips log `tier` / `saved`; catalog casts (TBCombat._cast_plan) log `hit` or `saved`
+    "spell_hit":      [("name", "S"), ("attacker", "actor"), ("defender", "target"), ("dmg", "amount"),
+                       ("tier?", "x"), ("hit?", "F"), ("saved?", "F")],
+    "spell_aoe":      [("name", "S"), ("attacker", "actor"), ("defender", "target"), ("dmg", "amount"),
+                       ("saved?", "F"), ("hit?", "F")],
+    "spell_control":  [("name", "S"), ("attacker", "actor"), ("defender", "target"), ("applied", "F")],
+}
+
+KIND_OTHER = 0
+EVENT_KINDS: Tuple[str, ...] = ("",) + tuple(_SPECS)          # kind code -> type name
+_KIND_CODE: Dict[str, int] = {t: i for i, t in enumerate(EVENT_KINDS) if t}
+
+def _compile_spec(fields: List[Tuple[str, str]]):
+    """-> [(key, column, flag_bit or -1, presence_bit or -1)]; strings share the aux column."""
+    out = []; bit = 0; n_str = 0
+    for key, col in fields:
+        optional = key.endswith("?"); key = key.rstrip("?")
+        fbit = -1; pbit = -1
+        if col == "F": fbit = bit; bit += 1
+        if optional: pbit = bit; bit += 1
+        if col == "S":
+            col = "aux" if n_str == 0 else "z"  # a second string (saving_throw 'auto') uses z
+            n_str += 1
+        out.append((key, col, fbit, pbit))
+    return out
+
+_COMPILED = {t: _compile_spec(f) for t, f in _SPECS.items()}
+_STR_KEYS = {t: {k.rstrip("?") for k, c in f if c == "S"} for t, f in _SPECS.items()}
+_SPEC_KEYS = {t: frozenset(("type",)) | {k.rstrip("?") for k, _ in f} for t, f in _SPECS.items()}
+_ACTOR_COLS = ("actor", "target")
+
+
+class ColumnarEventStore(EventSink):
+    """
+    Event sink backed by `array` columns. Iterating/indexing materializes dicts on demand;
+    aggregation helpers scan the columns directly. Events of unknown types are kept verbatim.
+    """
+    def __init__(self, level: int = EVENT_LEVEL_ALL):
+        self.level = int(level)
+        self.cols: Dict[str, array] = {name: array(code) for name, code in _COLUMNS}
+        self.names: List[str] = []            # actor index -> name
+        self._name_idx: Dict[str, int] = {}
+        self.strings: List[str] = []          # aux index -> interned string
+        self._str_idx: Dict[str, int] = {}
+        self.other: List[Dict[str, Any]] = []  # verbatim unknown events (aux -> index)
+        self.extra: Dict[int, Dict[str, Any]] = {}  # row -> keys outside its type's spec
+
+    # ---- interning ----
+    def actor_index(self, name: Any) -> int:
+        key = str(name); i = self._name_idx.get(key)
+        if i is None:
+            i = self._name_idx[key] = len(self.names); self.names.append(key)
+        return i
+    def _intern(self, s: Any) -> int:
+        key = repr(s) if isinstance(s, float) else str(s); i = self._str_idx.get(key)
+        if i is None:
+            i = self._str_idx[key] = len(self.strings); self.strings.append(key)
+        return i
+
+    # ---- sink API ----
+    def append(self, ev: Dict[str, Any]) -> None:
+        t = ev.get("type"); spec = _COMPILED.get(t)
+        if spec is not None and not any(k not in ev for k, _, _, p in spec if p < 0):
+            row = dict.fromkeys(_COL_NAMES, 0); row["actor"] = row["target"] = row["aux"] = -1
+            done: List[str] = []
+            try:
+                row["kind"] = _KIND_CODE[t]; row["flags"] = self._encode(ev, t, spec, row)
+                for name in _COL_NAMES:
+                    self.cols[name].append(row[name]); done.append(name)
+                if ev.keys() - _SPEC_KEYS[t]:
+                    self.extra[len(self) - 1] = {k: v for k, v in ev.items() if k not in _SPEC_KEYS[t]}
+                return
+            except (TypeError, ValueError, OverflowError):
+                for name in done: self.cols[name].pop()
+        # unknown type, or a value that does not fit its column: keep the dict verbatim
+        row = dict.fromkeys(_COL_NAMES, 0); row["actor"] = row["target"] = -1
+        row["aux"] = len(self.other); self.other.append(dict(ev))
+        for name in _COL_NAMES:
+            self.cols[name].append(row[name])
+
+    def _encode(self, ev: Dict[str, Any], t: str, spec, row: Dict[str, int]) -> int:
+        flags = 0; strs = _STR_KEYS[t]
+        for key, col, fbit, pbit in spec:
+            if key not in ev: continue
+            if pbit >= 0: flags |= 1 << pbit
+            v = ev[key]
+            if fbit >= 0:
+                if v: flags |= 1 << fbit
+            elif key in strs: row[col] = self._intern(v)
+            elif col in _ACTOR_COLS: row[col] = self.actor_index(v)
+            else: row[col] = int(v)
+        return flags
+
+    def __len__(self) -> int: return len(self.cols["kind"])
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)): yield self._materialize(i)
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._materialize(i) for i in range(*idx.indices(len(self)))]
+        n = len(self); i = idx + n if idx < 0 else idx
+        if not 0 <= i < n: raise IndexError("event index out of range")
+        return self._materialize(i)
+
+    def _materialize(self, i: int) -> Dict[str, Any]:
+        c = self.cols; kind = c["kind"][i]
+        if kind == KIND_OTHER: return dict(self.other[c["aux"][i]])
+        t = EVENT_KINDS[kind]; flags = c["flags"][i]; strs = _STR_KEYS[t]
+        out: Dict[str, Any] = {"type": t}
+        for key, col, fbit, pbit in _COMPILED[t]:
+            if pbit >= 0 and not flags & (1 << pbit): continue
+            if fbit >= 0: out[key] = bool(flags & (1 << fbit)); continue
+            v = c[col][i]
+            if key in strs:
+                s = self.strings[v]; out[key] = float(s) if key == "chance" else s
+            elif col in _ACTOR_COLS: out[key] = self.names[v]
+            else: out[key] = v
+        if i in self.extra: out.update(copy.deepcopy(self.extra[i]))
+        return out
+
+    # ---- aggregation (column scans, no dict materialization) ----
+    def kind_mask(self, event_type: str) -> List[bool]:
+        code = _KIND_CODE.get(event_type, -1)
+        return [k == code for k in self.cols["kind"]]
+    def count(self, event_type: str) -> int:
+        return self.cols["kind"].count(_KIND_CODE.get(event_type, -1))
+    def total_damage_by_actor(self) -> Dict[str, int]:
+        """Damage dealt per attacker name (weapon damage + spell damage)."""
+        out: Dict[str, int] = {}
+        for t in ("damage", "spell_hit", "spell_aoe"):
+            mask = self.kind_mask(t)
+            for a, amt in zip(compress(self.cols["actor"], mask), compress(self.cols["amount"], mask), strict=True):
+                if a >= 0:
+                    nm = self.names[a]; out[nm] = out.get(nm, 0) + amt
+        return out
+    def crit_rate(self, actor: Optional[str] = None) -> float:
+        """Crits / attack rolls, optionally for one attacker name."""
+        mask = self.kind_mask("attack_roll")
+        if actor is not None:
+            ai = self._name_idx.get(str(actor), -2)
+            mask = [m and a == ai for m, a in zip(mask, self.cols["actor"], strict=True)]
+        crit_bit = 1 << next(f for k, _, f, _ in _COMPILED["attack_roll"] if k == "crit")
+        flags = list(compress(self.cols["flags"], mask))
+        return (sum(1 for f in flags if f & crit_bit) / len(flags)) if flags else 0.0
+
+    # ---- compact binary dump/load ----
+    _MAGIC = b"D20EV1"
+
+    def dumps(self) -> bytes:
+        meta = json.dumps({"names": self.names, "strings": self.strings, "other": self.other,
+                           "extra": {str(i): d for i, d in self.extra.items()}, "n": len(self), "level": self.level}, separators=(",", ":")).encode("utf-8")
+        parts = [self._MAGIC, struct.pack("<I", len(meta)), meta]
+        for name, _ in _COLUMNS:
+            parts.append(self.cols[name].tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def loads(cls, blob: bytes) -> "ColumnarEventStore":
+        if not blob.startswith(cls._MAGIC): raise ValueError("not a columnar event dump")
+        pos = len(cls._MAGIC); (mlen,) = struct.unpack_from("<I", blob, pos); pos += 4
+        meta = json.loads(blob[pos:pos + mlen].decode("utf-8")); pos += mlen
+        st = cls(level=int(meta.get("level", EVENT_LEVEL_ALL))); n = int(meta["n"])
+        for name, code in _COLUMNS:
+            arr = array(code); size = arr.itemsize * n
+            arr.frombytes(blob[pos:pos + size]); pos += size
+            st.cols[name] = arr
+        st.names = list(meta["names"]); st._name_idx = {s: i for i, s in enumerate(st.names)}
+        st.strings = list(meta["strings"]); st._str_idx = {s: i for i, s in enumerate(st.strings)}
+        st.other = list(meta["other"])
+        st.extra = {int(i): d for i, d in meta.get("extra", {}).items()}
+        return st
+
+    def dump(self, path: str) -> None:
+        with open(path, "wb") as fh: fh.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: str) -> "ColumnarEventStore":
+        with open(path, "rb") as fh: return cls.loads(fh.read())
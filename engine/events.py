@@ -0,0 +1,95 @@
+# engine/events.py
+from __future__ import annotations
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Event sinks for TBCombat.
+# The engine only builds an event dict when the active sink's level asks for it, so headless
+# sims that just need the result can run with a NullSink and allocate no event dicts at all.
+
+EVENT_LEVEL_NONE = 0      # nothing is recorded
+EVENT_LEVEL_OUTCOME = 1   # damage, down, end, spells, heals, taunts... (no roll breakdowns)
+EVENT_LEVEL_ALL = 2       # everything, including attack rolls, saves, hide/detect checks
+
+# Roll breakdown events; every other event type is an outcome.
+ROLL_EVENT_TYPES = frozenset({"attack_roll", "saving_throw", "hide_attempt", "detect_hidden"})
+
+def event_level(ev: Dict[str, Any]) -> int:
+    return EVENT_LEVEL_ALL if ev.get("type") in ROLL_EVENT_TYPES else EVENT_LEVEL_OUTCOME
+
+
+class EventSink:
+    """Base sink: list-like read API (iterate, len, index/slice) plus append/extend."""
+    level: int = EVENT_LEVEL_ALL
+
+    def append(self, ev: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def extend(self, evs) -> None:
+        for ev in evs:
+            self.append(ev)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]: return iter(())
+    def __len__(self) -> int: return 0
+    def __bool__(self) -> bool: return len(self) > 0
+    def __getitem__(self, idx):
+        return list(self)[idx]
+
+
+class ListSink(list, EventSink):
+    """Unbounded list of every event (the default; same behaviour as the old `events` list)."""
+    def __init__(self, level: int = EVENT_LEVEL_ALL):
+        super().__init__()
+        self.level = int(level)
+
+
+class NullSink(EventSink):
+    """Records nothing; for headless/scored sims."""
+    level = EVENT_LEVEL_NONE
+
+    def append(self, ev: Dict[str, Any]) -> None:
+        pass
+
+
+class RingSink(EventSink):
+    """Keeps only the last `maxlen` events (e.g. the MatchState log window)."""
+    def __init__(self, maxlen: int, level: int = EVENT_LEVEL_ALL):
+        self.level = int(level)
+        self._buf: deque = deque(maxlen=max(1, int(maxlen)))
+        self.total = 0  # events seen, including the ones that fell off the ring
+
+    def append(self, ev: Dict[str, Any]) -> None:
+        self._buf.append(ev); self.total += 1
+    def clear(self) -> None: self._buf.clear()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]: return iter(self._buf)
+    def __len__(self) -> int: return len(self._buf)
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self._buf))
+            return list(islice(self._buf, start, stop, step))
+        return self._buf[idx]
+
+
+class CallbackSink(EventSink):
+    """Streams each event to `fn` without keeping it."""
+    def __init__(self, fn: Callable[[Dict[str, Any]], Any], level: int = EVENT_LEVEL_ALL):
+        self.fn = fn
+        self.level = int(level)
+
+    def append(self, ev: Dict[str, Any]) -> None:
+        self.fn(ev)
+
+
+def make_sink(kind: Optional[str] = None, *, level: int = EVENT_LEVEL_ALL, maxlen: int = 18,
+              fn: Optional[Callable[[Dict[str, Any]], Any]] = None) -> EventSink:
+    """'list' (default) | 'null' | 'ring' | 'callback'."""
+    kind = (kind or "list").lower()
+    if kind == "null": return NullSink()
+    if kind == "ring": return RingSink(maxlen, level=level)
+    if kind == "callback":
+        if fn is None: raise ValueError("callback sink needs fn")
+        return CallbackSink(fn, level=level)
+    return ListSink(level=level)
+
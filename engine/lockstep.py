@@ -0,0 +1,187 @@
+# engine/lockstep.py
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: only this engine needs it (pip install numpy)
+    np = None
+
+from engine.profiles import compile_profile
+
+# Lockstep Monte Carlo: N independent replicas of one matchup, stepped together with NumPy.
+# The roster is compiled once into structure-of-arrays (per actor: team, hp, AC, to-hit, damage
+# dice and bonus, class-feature numbers); match state is (replicas, actors) arrays for hp and alive
+# masks plus per-replica initiative order, round and progress counters. Every turn slot rolls the
+# d20s and damage dice of all replicas whose actor in that slot is still standing in one draw.
+#
+# Rules are TBCombat's default headless path (no controllers, no role/archetype set, no spells):
+#   - initiative: d20 + DEX mod once, ties to higher DEX then roster order; the dead take no turns
+#   - target: the living enemy with the lowest hp fraction, roster order on ties (WorldView
+#     "lowest_hp", the first rule of DEFAULT_TEAM_TACTICS)
+#   - main-hand attack: d20 + mod + prof + style bonuses >= AC, natural 20 doubles the dice;
+#     damage dice + mod + prof (min 0), Crusader smite (melee, on_hit) and great weapon rerolls
+#     (L2, keep the better), extra attacks after a hit while the target stands
+#   - the match ends on the decisive kill; `stalemate_rounds` rounds without damage, or the round
+#     cap, end it as a draw (-1)
+# Results agree with TBCombat in distribution, not per seed (tools/bench_lockstep validates them).
+
+HAVE_NUMPY = np is not None
+UNDECIDED = -2
+
+def _require_numpy() -> None:
+    if np is None: raise ImportError("engine.lockstep needs numpy (pip install numpy)")
+
+@dataclass(frozen=True)
+class LockstepRoster:
+    """One matchup as per-actor arrays (index = roster position)."""
+    names: Tuple[str, ...]
+    team: Any          # (A,) 0 / 1
+    hp: Any            # (A,) starting hp
+    max_hp: Any        # (A,) >= 1
+    alive: Any         # (A,) bool
+    ac: Any
+    dex: Any           # DEX mod (initiative)
+    to_hit: Any        # mod + prof + style bonuses
+    dmg_bonus: Any     # mod + prof
+    dice_n: Any        # damage dice in use (two-handed dice when wielded so)
+    dice_s: Any
+    reroll: Any        # bool: roll damage twice, keep the better (Crusader L2, two-handed melee)
+    smite_p: Any       # melee smite chance / Nd6
+    smite_nd6: Any
+    extra: Any         # follow-up attacks after a hit
+
+    def __len__(self) -> int: return len(self.names)
+
+def compile_roster(actors: Sequence[Any]) -> LockstepRoster:
+    """Compile actors (team_id 0 vs 1) with the same CombatProfiles TBCombat uses."""
+    _require_numpy()
+    rows = []
+    for a in actors:
+        p = compile_profile(a); w = p.main
+        atk = w.atk_mod if w.item else (p.dex_mod if w.is_ranged else p.str_mod)
+        n, s = w.two_handed_dice if (w.two_handed_in_use and w.two_handed_dice) else w.dice
+        hp = int(getattr(a, "hp", 1) or 0)
+        rows.append((int(getattr(a, "team_id", 0) or 0), hp, max(1, int(getattr(a, "max_hp", hp) or 1)),
+                     bool(getattr(a, "alive", True)) and hp > 0, int(getattr(a, "ac", getattr(a, "AC", 10))), p.dex_mod,
+                     atk + p.prof + p.style_bonus(w.is_ranged), atk + p.prof,
+                     max(0, n), max(1, s), bool(p.hooks.on_damage_roll) and p.crusader_l2 and w.two_handed_in_use and not w.is_ranged,
+                     0.0 if w.is_ranged else p.smite_chance, 0 if w.is_ranged else p.smite_nd6, p.hooks.extra_attacks))
+    cols = list(zip(*rows, strict=True)) if rows else [()] * 14
+    i32 = lambda c: np.asarray(c, dtype=np.int32)
+    return LockstepRoster(tuple(str(getattr(a, "name", i)) for i, a in enumerate(actors)),
+                          i32(cols[0]), i32(cols[1]), i32(cols[2]), np.asarray(cols[3], dtype=bool), i32(cols[4]),
+                          i32(cols[5]), i32(cols[6]), i32(cols[7]), i32(cols[8]), i32(cols[9]),
+                          np.asarray(cols[10], dtype=bool), np.asarray(cols[11], dtype=float), i32(cols[12]), i32(cols[13]))
+
+@dataclass(frozen=True)
+class LockstepResult:
+    winner: Any        # (N,) 0 / 1, -1 = draw (stalemate or round cap)
+    k_home: Any        # (N,) team 1 fighters downed
+    k_away: Any        # (N,) team 0 fighters downed
+    rounds: Any        # (N,) round the match ended in
+    turns: Any         # (N,) turns taken (the dead take none)
+    elapsed: float     # seconds
+
+    @property
+    def replicas(self) -> int: return int(len(self.winner))
+    @property
+    def replicas_per_sec(self) -> float: return self.replicas / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def win_rate(self, team: int = 0, z: float = 1.96) -> Tuple[float, float, float]:
+        """Share of replicas `team` won, with its Wilson score interval: (p, lo, hi)."""
+        return wilson(int((self.winner == team).sum()), self.replicas, z)
+
+def wilson(wins: int, n: int, z: float = 1.96) -> Tuple[float, float, float]:
+    if n <= 0: return 0.0, 0.0, 1.0
+    p = wins / n; d = 1 + z * z / n
+    c = (p + z * z / (2 * n)) / d; h = z * ((p * (1 - p) / n + z * z / (4 * n * n)) ** 0.5) / d
+    return p, max(0.0, c - h), min(1.0, c + h)
+
+
+# ---------------- Dice ----------------
+def _dice(gen, n, s):
+    """Sum of n[i] dice with s[i] sides per row (rows may differ)."""
+    k = int(n.max()) if len(n) else 0
+    if k <= 0: return np.zeros(len(n), dtype=np.int32)
+    rolls = gen.integers(1, s[:, None] + 1, size=(len(n), k), dtype=np.int32)
+    return np.where(np.arange(k)[None, :] < n[:, None], rolls, 0).sum(axis=1, dtype=np.int32)
+
+def _weapon_damage(gen, R: LockstepRoster, a, crit):
+    n = R.dice_n[a] * np.where(crit, 2, 1); s = R.dice_s[a]; bonus = R.dmg_bonus[a]
+    dmg = np.maximum(0, _dice(gen, n, s) + bonus)
+    rr = R.reroll[a]
+    if rr.any(): dmg = np.where(rr, np.maximum(dmg, np.maximum(0, _dice(gen, n, s) + bonus)), dmg)
+    sp = R.smite_p[a]
+    if (sp > 0).any():
+        smite = (gen.random(len(a)) < sp) & (R.smite_nd6[a] > 0)
+        dmg = dmg + np.where(smite, _dice(gen, R.smite_nd6[a], np.full(len(a), 6, dtype=np.int32)), 0)
+    return dmg
+
+
+# ---------------- Engine ----------------
+def run_lockstep(actors: Sequence[Any], replicas: int, *, seed: int = 1, max_rounds: int = 200,
+                 stalemate_rounds: int = 25, initiative: bool = True,
+                 roster: Optional[LockstepRoster] = None) -> LockstepResult:
+    """Play `replicas` independent copies of the matchup `actors` (which are not modified)."""
+    _require_numpy()
+    R = roster if roster is not None else compile_roster(actors)
+    gen = np.random.default_rng(seed); t0 = time.perf_counter()
+    N = int(replicas); A = len(R); rows = np.arange(N)
+    hp = np.broadcast_to(R.hp, (N, A)).copy(); alive = np.broadcast_to(R.alive, (N, A)).copy()
+    maxhp = R.max_hp.astype(float)
+    enemy_of = (R.team[:, None] != R.team[None, :])          # (A, A): [actor, other]
+    home, away = (R.team == 0), (R.team == 1)
+    start = (int((R.alive & home).sum()), int((R.alive & away).sum()))
+    winner = np.full(N, UNDECIDED, dtype=np.int8)
+    rnd = np.ones(N, dtype=np.int32); last = np.ones(N, dtype=np.int32); turns = np.zeros(N, dtype=np.int32)
+    if not start[0] or not start[1]: winner[:] = 0 if start[0] else (1 if start[1] else -1)
+
+    # initiative once per replica: d20 + DEX, ties to higher DEX then roster order; the dead go last
+    idx = np.broadcast_to(np.arange(A), (N, A))
+    if initiative:
+        total = np.where(alive, gen.integers(1, 21, size=(N, A), dtype=np.int32) + R.dex[None, :], np.iinfo(np.int32).min)
+        order = np.lexsort((idx, np.broadcast_to(-R.dex, (N, A)), -total.astype(np.int64)), axis=1)
+    else:
+        order = idx.copy()
+
+    def strike(r, a, t):
+        d20 = gen.integers(1, 21, size=len(r), dtype=np.int32)
+        hit = d20 + R.to_hit[a] >= R.ac[t]
+        if not hit.any(): return hit
+        r2, a2, t2 = r[hit], a[hit], t[hit]
+        dmg = _weapon_damage(gen, R, a2, d20[hit] == 20)
+        prev = hp[r2, t2]; new = np.maximum(0, prev - dmg); hp[r2, t2] = new
+        last[r2[new < prev]] = rnd[r2[new < prev]]
+        alive[r2, t2] = new > 0
+        return hit
+
+    while True:
+        live = winner == UNDECIDED
+        if not live.any(): break
+        for k in range(A):
+            act = order[:, k]
+            on = (winner == UNDECIDED) & alive[rows, act]
+            if not on.any(): continue
+            r = rows[on]; a = act[on]; turns[r] += 1
+            frac = np.where(alive[r] & enemy_of[a], hp[r] / maxhp[None, :], np.inf)
+            t = frac.argmin(axis=1)
+            hit = strike(r, a, t)
+            for e in range(int(R.extra[a].max())):       # follow-ups after a hit, while the target stands
+                go = hit & (R.extra[a] > e) & alive[r, t]
+                if not go.any(): break
+                strike(r[go], a[go], t[go])
+            # decisive kills
+            h_left = (alive[r] & home).any(axis=1); a_left = (alive[r] & away).any(axis=1)
+            ended = ~(h_left & a_left)
+            if ended.any(): winner[r[ended]] = np.where(h_left[ended], 0, np.where(a_left[ended], 1, -1))
+        live = winner == UNDECIDED
+        rnd[live] += 1
+        capped = live & (rnd > max_rounds)
+        stale = (live & ((rnd - last) > stalemate_rounds)) if stalemate_rounds else capped
+        winner[stale | capped] = -1; rnd[capped] = max_rounds
+
+    k_home = start[1] - (alive & away).sum(axis=1); k_away = start[0] - (alive & home).sum(axis=1)
+    return LockstepResult(winner, k_home.astype(np.int32), k_away.astype(np.int32), rnd, turns, time.perf_counter() - t0)
@@ -116,6 +116,105 @@ class Fighter:
         }
 
 
+# ----------------------
+# CombatActor (TBCombat's actor shape)
+# ----------------------
+# Every attribute the engine, the tactics router and the XP helpers read or write on an actor.
+# They are slots: no per-instance dict for them, and a missing one raises AttributeError, so the
+# `getattr(f, "x", default)` calls of the hot path behave exactly as on dict-backed actors.
+ACTOR_FIELDS: Tuple[str, ...] = (
+    # identity / roster
+    "pid", "id", "name", "team_id", "class", "level", "race", "role", "archetype", "OVR",
+    # abilities
+    "STR", "DEX", "CON", "INT", "WIS", "CHA",
+    # vitals / position / gear
+    "hp", "max_hp", "ac", "speed", "alive", "tx", "ty", "weapon", "inventory", "equipped", "poison_immune",
+    # class features and spells (core.classes / core.spell_training)
+    "cru_lay_on_hands_current", "cru_aura_radius", "cru_aura_int_bonus", "cru_aura_no_fear", "cru_smite_chance", "cru_smite_nd6",
+    "wiz_cantrip_tier", "wiz_adv_vs_blind_deaf", "fighter_archery_bonus", "fighter_duelist_offhand_prof",
+    "spell_save_dc", "spell_slots_current", "cantrips_known",
+    # progression (core.xp)
+    "xp_total", "xp_gain_last", "level_pending", "kills", "assists",
+    # match state (see engine.snapshot.MUTABLE_ACTOR_FIELDS)
+    "hidden", "_hide_roll", "_taunted_by", "_taunt_rounds", "_controlled", "_tac_last_action",
+    "_dodging", "_adv_pending", "_reaction_round", "_dmg_from", "_conditions", "_cond_mask",
+)
+_ACTOR_FIELD_SET = frozenset(ACTOR_FIELDS)
+# roster spellings the engine also reads (`getattr(f, "ac", getattr(f, "AC", 10))`, ...) -> the declared field
+_ACTOR_ALIASES = {"cls": "class", "AC": "ac", "ovr": "OVR", "XP": "xp_total", "str": "STR", "dex": "DEX", "int": "INT"}
+# containers the engine mutates in place: copied on the way in so a match never edits career data
+_ACTOR_COPY_FIELDS = ("spell_slots_current", "_conditions", "_dmg_from")
+
+
+class CombatActor:
+    """
+    Slotted combat actor that reads both ways: `a.hp` / `getattr(a, "hp", 0)` and `a["hp"]` /
+    `a.get("hp", 0)` (what core.xp and the XP split use). Only the declared ACTOR_FIELDS exist:
+    there is no per-instance dict, and setting anything else raises AttributeError.
+    A field that was never set is missing (AttributeError / KeyError), like an absent dict key.
+    """
+    __slots__ = ACTOR_FIELDS
+
+    def __init__(self, **fields: Any):
+        for k, v in fields.items(): setattr(self, k, v)
+
+    # ---- mapping access ----
+    def __getitem__(self, k: str) -> Any:
+        if k in _ACTOR_FIELD_SET:
+            try: return getattr(self, k)
+            except AttributeError: pass
+        raise KeyError(k)
+    def __setitem__(self, k: str, v: Any) -> None: setattr(self, k, v)
+    def __delitem__(self, k: str) -> None:
+        if k not in self: raise KeyError(k)
+        delattr(self, k)
+    def __contains__(self, k: object) -> bool:
+        return k in _ACTOR_FIELD_SET and hasattr(self, k)  # type: ignore[arg-type]
+    def get(self, k: str, default: Any = None) -> Any:
+        return getattr(self, k, default) if k in _ACTOR_FIELD_SET else default
+    def setdefault(self, k: str, default: Any = None) -> Any:
+        if k not in self: setattr(self, k, default)
+        return self[k]
+    def pop(self, k: str, *default: Any) -> Any:
+        if k in self:
+            v = self[k]; delattr(self, k); return v
+        if default: return default[0]
+        raise KeyError(k)
+    def keys(self) -> List[str]:
+        return [k for k in ACTOR_FIELDS if hasattr(self, k)]
+    def items(self) -> List[Tuple[str, Any]]: return [(k, self[k]) for k in self.keys()]
+    def __iter__(self): return iter(self.keys())
+    def __len__(self) -> int: return len(self.keys())
+    def __repr__(self) -> str:
+        return f"CombatActor(name={self.get('name')!r}, team_id={self.get('team_id')!r}, hp={self.get('hp')!r})"
+
+
+def actor_from_dict(d: Dict[str, Any], **overrides: Any) -> CombatActor:
+    """
+    Build a CombatActor from a career fighter dict (or any object with a __dict__). Accepts the
+    same aliases as core.sim's rosters: 'pid' falls back to 'id', 'class' to 'cls', 'max_hp' to
+    'hp' (and see _ACTOR_ALIASES). Keys that are not ACTOR_FIELDS (portraits, traits, ...) are
+    left on the roster entry. Engine-mutated containers are copied; everything else is shared.
+    """
+    src = {**(d if isinstance(d, dict) else getattr(d, "__dict__", {})), **overrides}
+    for alias, k in _ACTOR_ALIASES.items():
+        if alias in src and k not in src: src[k] = src[alias]
+    a = CombatActor(**{k: v for k, v in src.items() if k in _ACTOR_FIELD_SET})
+    if "pid" not in a and "id" in a: a.pid = a.id
+    if "max_hp" not in a and "hp" in a: a.max_hp = a.hp
+    if "alive" not in a: a.alive = int(a.get("hp", 1) or 0) > 0
+    for k in _ACTOR_COPY_FIELDS:
+        v = a.get(k)
+        if v is not None: setattr(a, k, v.copy())
+    return a
+
+
+def actor_to_dict(a: Any) -> Dict[str, Any]:
+    """Plain dict of everything set on `a` (declared fields first), e.g. to write back into a career roster."""
+    if isinstance(a, CombatActor): return dict(a.items())
+    return dict(a) if isinstance(a, dict) else dict(getattr(a, "__dict__", {}))
+
+
 @dataclass
 class Team:
     id: int
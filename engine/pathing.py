@@ -0,0 +1,154 @@
+# engine/pathing.py
+from __future__ import annotations
+import heapq
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# Grid pathfinding for TBCombat movement intents.
+# Movement is 4-connected (the engine measures distance as Manhattan). A mover may pass through
+# allies but not enemies, and may not end its move on an occupied tile. Paths are read off cached
+# distance fields: one reverse search from a goal tile, shared by every mover of the same team
+# heading there, and rebuilt only when that team's enemies move or die (see PathPlanner.bump).
+#
+# With avoid_oa, leaving the reach of an adjacent enemy costs OA_PENALTY extra steps, so routes
+# that provoke opportunity attacks are only taken when there is no reasonable alternative.
+
+Cell = Tuple[int, int]
+OA_PENALTY = 4
+UNREACHABLE = 1 << 30
+
+def manhattan(a: Cell, b: Cell) -> int: return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class TeamView:
+    """Obstacles for one moving team: enemy tiles (impassable) and per-tile threat masks."""
+    __slots__ = ("width", "height", "blocked", "threat")
+
+    def __init__(self, width: int, height: int, enemies: List[Tuple[Cell, int]]):
+        # enemies: [((x, y), melee reach or 0 if the enemy cannot make opportunity attacks)]
+        self.width = width; self.height = height
+        n = width * height
+        self.blocked = bytearray(n)
+        self.threat = [0] * n
+        for bit, ((ex, ey), reach) in enumerate(enemies):
+            if 0 <= ex < width and 0 <= ey < height: self.blocked[ey * width + ex] = 1
+            if reach <= 0: continue
+            m = 1 << bit
+            for y in range(max(0, ey - reach), min(height, ey + reach + 1)):
+                span = reach - abs(y - ey)
+                for x in range(max(0, ex - span), min(width, ex + span + 1)):
+                    self.threat[y * width + x] |= m
+
+
+def build_field(view: TeamView, goal: Cell, *, avoid_oa: bool = False) -> List[int]:
+    """
+    Cost-to-goal for every tile (reverse search from `goal`). The goal tile itself may be occupied
+    (it is usually the target). Enemy tiles get a cost but are never expanded.
+    """
+    w, h = view.width, view.height; blocked = view.blocked; threat = view.threat
+    dist = [UNREACHABLE] * (w * h)
+    gx, gy = goal
+    if not (0 <= gx < w and 0 <= gy < h): return dist
+    g = gy * w + gx; dist[g] = 0
+    if not avoid_oa:
+        q = deque([g])
+        while q:
+            v = q.popleft(); d = dist[v] + 1; vx = v % w
+            for u in (v - w if v >= w else -1, v + w if v + w < w * h else -1,
+                      v - 1 if vx > 0 else -1, v + 1 if vx < w - 1 else -1):
+                if u >= 0 and dist[u] == UNREACHABLE:
+                    dist[u] = d
+                    if not blocked[u]: q.append(u)
+        return dist
+    heap = [(0, g)]
+    while heap:
+        dv, v = heapq.heappop(heap)
+        if dv != dist[v] or (blocked[v] and v != g): continue
+        vx = v % w; tv = threat[v]
+        for u in (v - w if v >= w else -1, v + w if v + w < w * h else -1,
+                  v - 1 if vx > 0 else -1, v + 1 if vx < w - 1 else -1):
+            if u < 0: continue
+            # the mover steps u -> v: leaving an enemy's reach provokes
+            d = dv + 1 + (OA_PENALTY if threat[u] & ~tv else 0)
+            if d < dist[u]:
+                dist[u] = d; heapq.heappush(heap, (d, u))
+    return dist
+
+
+class PathPlanner:
+    """
+    Per-combat cache of TeamViews and distance fields.
+    Fields are keyed by (team, goal, avoid_oa) and stay valid until an enemy of that team moves
+    or dies; TBCombat calls `bump(team_id)` whenever one of its actors changes tile or goes down.
+    """
+    MAX_FIELDS = 128
+
+    def __init__(self, combat):
+        self.cmb = combat
+        self._versions: Dict[Any, int] = {}   # team -> stamp of its last move/death
+        self._clock = 0                       # stamps are never reused, so restored state stays valid
+        self._views: Dict[Any, Tuple[Tuple, TeamView]] = {}
+        self._fields: Dict[Tuple, List[int]] = {}
+        self.stats = {"fields_built": 0, "field_hits": 0}
+
+    def bump(self, team_id) -> None:
+        self._clock += 1; self._versions[team_id] = self._clock
+
+    # snapshot support: positions restored together with their stamps keep cached fields valid
+    def get_state(self) -> Tuple[Tuple[Any, int], ...]: return tuple(self._versions.items())
+    def set_state(self, state: Tuple[Tuple[Any, int], ...]) -> None: self._versions = dict(state)
+
+    def _sig(self, team) -> Tuple:
+        return tuple(sorted(((repr(t), v) for t, v in self._versions.items() if t != team)))
+
+    def view(self, team) -> TeamView:
+        sig = self._sig(team); hit = self._views.get(team)
+        if hit is not None and hit[0] == sig: return hit[1]
+        cmb = self.cmb; enemies = []
+        for e in cmb.actors:
+            if getattr(e, "team_id", 0) == team or not cmb.is_alive(e): continue
+            enemies.append(((getattr(e, "tx", 0), getattr(e, "ty", 0)), cmb.threat_reach(e)))
+        v = TeamView(cmb.width, cmb.height, enemies)
+        self._views[team] = (sig, v)
+        return v
+
+    def field(self, team, goal: Cell, avoid_oa: bool = False) -> List[int]:
+        key = (team, goal, bool(avoid_oa), self._sig(team))
+        f = self._fields.get(key)
+        if f is not None:
+            self.stats["field_hits"] += 1; return f
+        if len(self._fields) >= self.MAX_FIELDS: self._fields.clear()
+        f = self._fields[key] = build_field(self.view(team), goal, avoid_oa=avoid_oa)
+        self.stats["fields_built"] += 1
+        return f
+
+    def path(self, actor, goal: Cell, *, max_steps: int, stop_within: int = 1, avoid_oa: bool = False,
+             start: Optional[Cell] = None) -> List[Cell]:
+        """
+        Up to `max_steps` tiles walking downhill on the goal's field, stopping once within
+        `stop_within` (Manhattan) of the goal. The returned path never ends on an occupied tile.
+        """
+        cmb = self.cmb; w = cmb.width; h = cmb.height
+        team = getattr(actor, "team_id", 0)
+        f = self.field(team, goal, avoid_oa); view = self.view(team)
+        blocked = view.blocked; threat = view.threat if avoid_oa else None
+        x, y = start if start is not None else (getattr(actor, "tx", 0), getattr(actor, "ty", 0))
+        out: List[Cell] = []
+        for _ in range(max(0, int(max_steps))):
+            if manhattan((x, y), goal) <= stop_within or not (0 <= x < w and 0 <= y < h): break
+            here = y * w + x; best = None; best_d = UNREACHABLE
+            for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+                if not (0 <= nx < w and 0 <= ny < h): continue
+                i = ny * w + nx
+                if blocked[i] or f[i] >= f[here]: continue  # only strictly downhill steps
+                d = f[i] + (OA_PENALTY if threat is not None and threat[here] & ~threat[i] else 0)
+                if d < best_d: best, best_d = (nx, ny), d
+            if best is None: break
+            out.append(best); x, y = best
+        board = cmb.board
+        while out and board.is_occupied(out[-1]): out.pop()  # passed through allies, but cannot stop on them
+        return out
+
+    def step(self, actor, goal: Cell, *, avoid_oa: bool = False, stop_within: int = 1) -> Optional[Cell]:
+        p = self.path(actor, goal, max_steps=1, stop_within=stop_within, avoid_oa=avoid_oa)
+        return p[0] if p else None
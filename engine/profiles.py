@@ -0,0 +1,137 @@
+# engine/profiles.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from engine.class_features import FeatureHooks, NO_HOOKS, resolve as _resolve_hooks
+from engine.dice import parse_dice as _parse_dice
+
+# Per-match, per-actor combat profiles.
+# TBCombat compiles one CombatProfile per actor the first time it needs it and reuses it for
+# every attack; call TBCombat.invalidate_profile(actor) after changing equipment or stats.
+# The profile also carries the actor's class-feature hooks (engine.class_features), resolved once.
+
+def _mod(val: int) -> int: return (int(val) - 10) // 2
+def _stat(f, key: str) -> int:
+    v = getattr(f, key, 10); return 10 if v is None else int(v)
+def _prof_for_level(level: int) -> int:
+    L = max(1, int(level)); return min(6, 2 + (L - 1) // 4)
+
+def parse_dice(expr: Any, default: Tuple[int, int] = (1, 4)) -> Tuple[int, int]:
+    """'1d8' -> (1, 8). Anything unparseable falls back to `default`."""
+    d = _parse_dice(str(expr))
+    return (d.count, d.sides) if d is not None else default
+
+@dataclass(frozen=True, slots=True)
+class WeaponProfile:
+    item: Optional[Dict[str, Any]]
+    dice: Tuple[int, int]
+    two_handed_dice: Optional[Tuple[int, int]]
+    ability: str                    # ability actually used for to-hit/damage (DEX for ranged/finesse)
+    atk_mod: int
+    is_ranged: bool
+    reach: int
+    finesse: bool
+    versatile: bool
+    two_handed_in_use: bool         # two-handed, or versatile with nothing in the other hand
+    range_limits: Tuple[int, int]
+
+@dataclass(frozen=True, slots=True)
+class CombatProfile:
+    cls: str
+    level: int
+    prof: int
+    main: WeaponProfile
+    off: Optional[WeaponProfile]
+    reach: int
+    has_shield: bool
+    # ability mods
+    str_mod: int
+    dex_mod: int
+    int_mod: int
+    cha_mod: int
+    # to-hit bonuses
+    offhand_prof: bool              # Duelist style / Stalker L2
+    ranged_style_bonus: int         # archery style (+2); class style bonuses are on_attack_roll hooks
+    # class feature flags
+    stalker_l2: bool
+    stalker_l18: bool
+    stalker_l20: bool
+    crusader_l2: bool
+    crusader_l5: bool
+    smite_chance: float
+    smite_nd6: int
+    hooks: FeatureHooks = NO_HOOKS  # class-feature hooks for (cls, level)
+
+    def style_bonus(self, is_ranged: bool) -> int:
+        """To-hit on top of ability mod and proficiency: archery style plus on_attack_roll hooks."""
+        b = self.ranged_style_bonus if is_ranged else 0
+        for h in self.hooks.on_attack_roll: b += h(self, is_ranged)
+        return b
+
+def _equipped(f) -> Dict[str, Any]: return getattr(f, "equipped", {}) or {}
+
+def _find_weapon(f, slot: str) -> Optional[Dict[str, Any]]:
+    inv = getattr(f, "inventory", {}) or {}
+    wid = _equipped(f).get(slot)
+    for w in inv.get("weapons", []):
+        if w.get("id") == wid: return w
+    return None
+
+def compile_weapon(f, item: Optional[Dict[str, Any]], *, stalker_l18: bool = False,
+                   free_other_hand: bool = True) -> Optional[WeaponProfile]:
+    if item is None: return None
+    is_ranged = bool(item.get("ranged", False)); finesse = bool(item.get("finesse", False))
+    ability = "DEX" if (is_ranged or finesse) else str(item.get("ability", "STR"))
+    versatile = bool(item.get("versatile", False))
+    thd = str(item.get("two_handed_dice", ""))
+    if not is_ranged: limits = (1, 1)
+    elif stalker_l18: limits = (10**9, 10**9)
+    else:
+        base = item.get("range", (8, 16)); limits = (int(base[0]), int(base[1]))
+    return WeaponProfile(
+        item=item,
+        dice=parse_dice(item.get("dice", "1d6"), (1, 6)),
+        two_handed_dice=parse_dice(thd, (1, 6)) if thd else None,
+        ability=ability,
+        atk_mod=_mod(_stat(f, ability)),
+        is_ranged=is_ranged,
+        reach=int(item.get("reach", 1)),
+        finesse=finesse,
+        versatile=versatile,
+        two_handed_in_use=bool(item.get("two_handed", False)) or (versatile and free_other_hand),
+        range_limits=limits,
+    )
+
+def compile_profile(f) -> CombatProfile:
+    cls = str(getattr(f, "class", "")).capitalize(); lvl = int(getattr(f, "level", 1) or 1)
+    stalker = cls == "Stalker"; crusader = cls == "Crusader"
+    has_shield = bool(_equipped(f).get("shield_id"))
+    main_item = _find_weapon(f, "main_hand_id")
+    if main_item is None:
+        w = getattr(f, "weapon", None); main_item = w if isinstance(w, dict) else None
+    off_item = _find_weapon(f, "off_hand_id")
+    free = (not has_shield) and off_item is None
+    # no weapon at all resolves like an empty item (1d6 STR, reach 1), matching the attack path
+    main = compile_weapon(f, main_item if main_item is not None else {}, stalker_l18=stalker and lvl >= 18, free_other_hand=free)
+    off = compile_weapon(f, off_item, stalker_l18=stalker and lvl >= 18, free_other_hand=False)
+
+    reach = main.reach
+    if off: reach = max(reach, off.reach)
+    if stalker and lvl >= 18 and not main.is_ranged: reach += 1
+
+    int_mod = _mod(_stat(f, "INT"))
+    ranged_style = 2 if int(getattr(f, "fighter_archery_bonus", 0) or 0) > 0 else 0
+    return CombatProfile(
+        cls=cls, level=lvl, prof=_prof_for_level(lvl),
+        main=main, off=off, reach=reach, has_shield=has_shield,
+        str_mod=_mod(_stat(f, "STR")), dex_mod=_mod(_stat(f, "DEX")),
+        int_mod=int_mod, cha_mod=_mod(_stat(f, "CHA")),
+        offhand_prof=bool(getattr(f, "fighter_duelist_offhand_prof", False)) or (stalker and lvl >= 2),
+        ranged_style_bonus=ranged_style,
+        stalker_l2=stalker and lvl >= 2, stalker_l18=stalker and lvl >= 18, stalker_l20=stalker and lvl >= 20,
+        crusader_l2=crusader and lvl >= 2, crusader_l5=crusader and lvl >= 5,
+        smite_chance=float(getattr(f, "cru_smite_chance", 0.0) or 0.0) if crusader else 0.0,
+        smite_nd6=int(getattr(f, "cru_smite_nd6", 0) or 0) if crusader else 0,
+        hooks=_resolve_hooks(cls, lvl),
+    )
@@ -0,0 +1,227 @@
+# engine/replay.py
+from __future__ import annotations
+import copy
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from engine.events import RingSink
+
+# Deterministic match replay.
+# A MatchRecord holds only the seed (or initial RNG state), the actors as they were at kick-off,
+# the match setup (teams, tactics, opposition instructions) and the intents executed on every turn
+# (after the taunt rewrite, TBCombat._apply_taunt). Replaying those intents through a fresh TBCombat
+# with the same RNG reproduces the match exactly, so a save only needs the record, not the event log.
+#
+#   rec = MatchRecorder(combat)          # right after constructing the TBCombat
+#   ... play ...
+#   rp = Replayer(rec.record)            # later / elsewhere: a new TBCombat over copies of the actors
+#   cmb = rp.seek(120)                   # TBCombat positioned at turn 120
+#
+#   rp = Replayer(rec.record, combat=combat)   # at kick-off: scrub the live match in place, so the
+#                                              # caller's fighters, controllers and sink stay in use
+
+_ACTOR_REF = "$actor"
+
+
+class ActorState(dict):
+    """Dict with attribute access; default actor shape when a record is rebuilt from plain data."""
+    def __getattr__(self, k):
+        try: return self[k]
+        except KeyError: raise AttributeError(k) from None
+    def __setattr__(self, k, v): self[k] = v
+    def __delattr__(self, k):
+        try: del self[k]
+        except KeyError: raise AttributeError(k) from None
+
+
+def _actor_data(a: Any) -> Dict[str, Any]:
+    from engine.model import actor_to_dict  # late import: engine.model pulls in the tactics modules
+    return copy.deepcopy(actor_to_dict(a))  # CombatActor fields, dicts as-is, vars() of other objects
+
+# Team metadata as TBCombat got it: engine.model.Team (saved without its fighters, which are the
+# record's actors), or a plain value such as a team id.
+def _team_to_json(t: Any) -> Any:
+    from engine.model import Team  # late import: engine.model pulls in the tactics modules
+    if isinstance(t, Team): return {"id": t.id, "name": t.name, "color": list(t.color) if t.color else None}
+    return copy.deepcopy(t)
+
+def _team_from_json(d: Any) -> Any:
+    if isinstance(d, dict) and {"id", "name"} <= d.keys():
+        from engine.model import Team
+        return Team(d["id"], d["name"], tuple(d["color"]) if d.get("color") else None)
+    return d
+
+def _oi_to_json(oi: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if oi is None: return None
+    out = copy.deepcopy(oi)
+    if out.get("instructions"):   # OppositionInstruction dataclasses -> the spec dicts weights._instruction reads
+        out["instructions"] = [asdict(i) if is_dataclass(i) else i for i in out["instructions"]]
+    return out
+
+
+# ---- intent (de)serialization: actor references become {"$actor": index} ----
+def encode_intents(intents: List[Dict[str, Any]], index_of: Dict[int, int]) -> List[Dict[str, Any]]:
+    def enc(v):
+        i = index_of.get(id(v))
+        if i is not None: return {_ACTOR_REF: i}
+        if isinstance(v, dict): return {k: enc(x) for k, x in v.items()}
+        if isinstance(v, (list, tuple)): return [enc(x) for x in v]
+        return v
+    return [enc(it) for it in intents]
+
+def decode_intents(data: List[Dict[str, Any]], actors: List[Any]) -> List[Dict[str, Any]]:
+    def dec(v):
+        if isinstance(v, dict):
+            if len(v) == 1 and _ACTOR_REF in v: return actors[int(v[_ACTOR_REF])]
+            return {k: dec(x) for k, x in v.items()}
+        if isinstance(v, list): return [dec(x) for x in v]
+        return v
+    out = []
+    for it in data:
+        d = dec(it)
+        if isinstance(d.get("spell"), dict) and isinstance(d["spell"].get("center"), list):
+            d["spell"]["center"] = tuple(d["spell"]["center"])
+        out.append(d)
+    return out
+
+
+@dataclass
+class MatchRecord:
+    seed: Optional[int]
+    rng_state: Optional[Any]                      # only kept when the match had no int seed
+    width: int
+    height: int
+    stalemate_rounds: int
+    actors: List[Any]                             # deep copies taken at kick-off
+    team_tactics: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    dice: str = "randint"                         # TBCombat dice mode (engine.dice)
+    rng_kind: str = "mt"                          # TBCombat RNG ("mt" or "counter", core.rng)
+    initiative: bool = True                       # False: roster turn order
+    oi: Optional[Dict[str, Any]] = None           # the match's OI map (TBCombat.oi); None = no instructions
+    teams: Tuple[Any, Any] = (None, None)         # TBCombat team_a / team_b
+    turns: List[Optional[List[Dict[str, Any]]]] = field(default_factory=list)  # None = skipped turn
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "rng_state": _state_to_json(self.rng_state),
+            "width": self.width, "height": self.height, "stalemate_rounds": self.stalemate_rounds,
+            "actors": [_actor_data(a) for a in self.actors],
+            "team_tactics": {str(k): v for k, v in self.team_tactics.items()},
+            "dice": self.dice, "rng_kind": self.rng_kind, "initiative": self.initiative,
+            "oi": _oi_to_json(self.oi), "teams": [_team_to_json(t) for t in self.teams],
+            "turns": self.turns,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], actor_factory=ActorState) -> "MatchRecord":
+        return cls(
+            seed=d.get("seed"),
+            rng_state=_state_from_json(d.get("rng_state")),
+            width=int(d.get("width", 16)), height=int(d.get("height", 16)),
+            stalemate_rounds=int(d.get("stalemate_rounds", 25)),
+            actors=[actor_factory(a) for a in d.get("actors", [])],
+            team_tactics={int(k): v for k, v in (d.get("team_tactics") or {}).items()},
+            dice=str(d.get("dice", "randint")), rng_kind=str(d.get("rng_kind", "mt")),
+            initiative=bool(d.get("initiative", True)),
+            oi=d.get("oi"), teams=tuple(_team_from_json(t) for t in (d.get("teams") or (None, None))),
+            turns=list(d.get("turns", [])),
+        )
+
+def _state_to_json(st):
+    if st is None: return None
+    if st[0] == "counter": return list(st)   # core.rng.CounterRNG: ("counter", key, n)
+    version, internal, gauss = st
+    return [version, list(internal), gauss]
+
+def _state_from_json(st):
+    if st is None: return None
+    if st[0] == "counter": return ("counter", int(st[1]), int(st[2]))
+    version, internal, gauss = st
+    return (int(version), tuple(int(x) for x in internal), gauss)
+
+
+class MatchRecorder:
+    """Attach to a fresh TBCombat (before its first turn) to record a replayable MatchRecord."""
+    def __init__(self, combat, record: Optional[MatchRecord] = None):
+        self._index_of = {id(a): i for i, a in enumerate(combat.actors)}
+        if record is None:
+            seed = combat.seed if isinstance(combat.seed, int) else None
+            record = MatchRecord(
+                seed=seed, rng_state=None if seed is not None else combat.rng.getstate(),
+                width=combat.width, height=combat.height, stalemate_rounds=combat.stalemate_rounds,
+                actors=[copy.deepcopy(a) for a in combat.actors],
+                team_tactics=copy.deepcopy(dict(getattr(combat, "team_tactics", {}) or {})),
+                dice=combat.dice.mode, rng_kind=combat.rng_kind, initiative=combat.initiative,
+                oi=copy.deepcopy(combat.oi.oi), teams=(copy.copy(combat.team_a), copy.copy(combat.team_b)),
+            )
+        self.record = record
+        combat.recorder = self
+
+    def on_turn(self, combat, intents: List[Dict[str, Any]]) -> None:
+        turns = self.record.turns; n = combat.turn_no
+        if n < len(turns) and turns[n] is not None: return  # replayed turn, already recorded
+        while len(turns) < n: turns.append(None)
+        enc = encode_intents(intents, self._index_of)
+        if n < len(turns): turns[n] = enc
+        else: turns.append(enc)
+
+
+class _ReplaySource:
+    def __init__(self, record: MatchRecord):
+        self.record = record
+    def intents_for(self, combat, player) -> Optional[List[Dict[str, Any]]]:
+        turns = self.record.turns; n = combat.turn_no
+        if n >= len(turns) or turns[n] is None: return None  # past the recording: decide live
+        return decode_intents(turns[n], combat.actors)
+
+
+class Replayer:
+    """
+    Rebuilds a recorded match. `seek(n)` returns a TBCombat positioned just before turn `n`;
+    snapshots every `checkpoint_every` turns keep a seek O(distance to the nearest checkpoint).
+
+    By default the match is rebuilt on a new TBCombat over deep copies of the recorded actors: the
+    objects the original match was played with are not updated by it. Pass the live `combat`
+    (before its first turn) to scrub that match in place instead: seek restores snapshots on the
+    same actor objects, and turns past the end of the record are decided by its controllers.
+    """
+    def __init__(self, record: MatchRecord, *, checkpoint_every: int = 20, events=None, combat=None):
+        self.record = record
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.events = events
+        self.checkpoints: Dict[int, Any] = {}
+        self.combat = self._fresh() if combat is None else self._attach(combat)
+
+    def _fresh(self):
+        from engine.tbcombat import TBCombat  # late import: tbcombat does not depend on replay
+        r = self.record
+        team_a, team_b = r.teams
+        cmb = TBCombat(copy.copy(team_a), copy.copy(team_b), [copy.deepcopy(a) for a in r.actors], r.width, r.height,
+                       seed=r.seed if r.seed is not None else 0, stalemate_rounds=r.stalemate_rounds,
+                       events=self.events, dice=r.dice, rng_kind=r.rng_kind,
+                       initiative=r.initiative, oi=copy.deepcopy(r.oi) if r.oi is not None else {})
+        if r.rng_state is not None: cmb.rng.setstate(r.rng_state)
+        cmb.team_tactics = copy.deepcopy(r.team_tactics)
+        return self._attach(cmb)
+
+    def _attach(self, cmb):
+        if cmb.turn_no != 0: raise ValueError("Replayer can only attach to a match before its first turn")
+        cmb.replay = _ReplaySource(self.record)
+        self.checkpoints[0] = cmb.snapshot()
+        return cmb
+
+    def seek(self, turn: int):
+        turn = max(0, int(turn)); cmb = self.combat
+        if cmb.turn_no > turn:
+            base = max(k for k in self.checkpoints if k <= turn)
+            cmb.restore(self.checkpoints[base])
+            if isinstance(cmb.events, RingSink): cmb.events.clear()  # restore trims list sinks; a ring restarts
+        while cmb.turn_no < turn and cmb.winner is None:
+            cmb.take_turn()
+            if cmb.turn_no % self.checkpoint_every == 0 and cmb.turn_no not in self.checkpoints:
+                self.checkpoints[cmb.turn_no] = cmb.snapshot()
+        return cmb
+
+    def run_to_end(self, guard: int = 10_000):
+        return self.seek(min(guard, max(len(self.record.turns), 1)))
+
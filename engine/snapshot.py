@@ -0,0 +1,108 @@
+# engine/snapshot.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Cheap snapshot/restore of the mutable part of a TBCombat.
+# Only the fields a match can change are captured (per-actor combat state listed below, the turn /
+# round / winner bookkeeping and the RNG and dice state); stats, equipment and names are shared, not copied.
+# Per actor only the fields that are actually set are stored; container values (damage ledger,
+# condition bag, spell slots) are flat, so a shallow copy suffices.
+#
+#   snap = combat.snapshot()
+#   ... try something ...
+#   combat.restore(snap)
+
+# Actor attributes TBCombat (and the XP/tactics helpers it calls) may write during a match.
+# Scalars are captured as-is; containers are flat and get a shallow copy.
+# Kill credit (TBCombat._distribute_xp_for_death -> core.xp.grant_xp): kills, assists, xp_total,
+# xp_gain_last, level_pending, and the victim's _dmg_from ledger.
+_SCALAR_FIELDS: Tuple[str, ...] = (
+    "hp", "alive", "hidden", "_hide_roll", "_taunted_by", "_taunt_rounds", "_controlled",
+    "cru_lay_on_hands_current", "kills", "assists", "xp_total", "xp_gain_last", "level_pending",
+    "_tac_last_action", "tx", "ty", "_dodging", "_adv_pending", "_reaction_round", "_cond_mask",
+)
+_CONTAINER_FIELDS: Tuple[str, ...] = ("_dmg_from", "_conditions", "spell_slots_current")
+MUTABLE_ACTOR_FIELDS: Tuple[str, ...] = _SCALAR_FIELDS + _CONTAINER_FIELDS
+# TBCombat attributes that change from turn to turn.
+# `_in_turn`/`_forced_target_id` let a snapshot taken mid-turn (inside a controller's decide) resume.
+# `_live` (the turn order) is an immutable tuple, replaced rather than edited when an actor drops.
+COMBAT_FIELDS: Tuple[str, ...] = ("turn_idx", "turn_no", "round", "winner", "_last_progress_round",
+                                  "_in_turn", "_forced_target_id", "_moves_left", "_disengaged", "_moved",
+                                  "_live", "_round_started", "_cur_removed")
+
+_FIELD_SET = frozenset(MUTABLE_ACTOR_FIELDS)
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class CombatSnapshot:
+    rng: Any
+    dice: Any                                  # roller state (buffered words), None for randint dice
+    combat: Tuple[Any, ...]                    # values for COMBAT_FIELDS
+    alive_by_team: Tuple[Tuple[Any, int], ...]
+    paths: Tuple[Tuple[Any, int], ...]         # PathPlanner stamps, so cached distance fields stay valid
+    conditions: Any                            # ConditionClock expiry heap
+    actors: Tuple[Dict[str, Any], ...]         # per actor, the MUTABLE_ACTOR_FIELDS it had set
+    n_events: int
+
+
+def _state(a: Any) -> Optional[Dict[str, Any]]:
+    # dict-like actors and plain objects both keep their state in a dict; slotted ones
+    # (engine.model.CombatActor) go field by field
+    if isinstance(a, dict): return a
+    if hasattr(type(a), "__slots__"): return None
+    return getattr(a, "__dict__", None)
+
+def _copy_containers(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    for k in _CONTAINER_FIELDS:
+        v = src.get(k)
+        if v is not None: dst[k] = v.copy()
+
+def _actor_values(a: Any) -> Dict[str, Any]:
+    d = _state(a)
+    if d is None:  # __slots__ actor
+        out = {k: v for k in MUTABLE_ACTOR_FIELDS if (v := getattr(a, k, _MISSING)) is not _MISSING}
+    else:
+        out = {k: d[k] for k in d.keys() & _FIELD_SET}  # sparse: only the fields that are set
+    _copy_containers(out, out)
+    return out
+
+def _restore_actor(a: Any, saved: Dict[str, Any]) -> None:
+    d = _state(a)
+    if d is None:  # __slots__ actor
+        for k in MUTABLE_ACTOR_FIELDS:
+            if k in saved: setattr(a, k, saved[k].copy() if k in _CONTAINER_FIELDS and saved[k] is not None else saved[k])
+            elif hasattr(a, k): delattr(a, k)
+        return
+    present = d.keys() & _FIELD_SET
+    if len(present) != len(saved):
+        for k in present - saved.keys(): del d[k]  # set after the snapshot was taken
+    d.update(saved)
+    _copy_containers(d, saved)  # fresh copies so the snapshot stays reusable
+
+
+def take_snapshot(cmb) -> CombatSnapshot:
+    return CombatSnapshot(
+        rng=cmb.rng.getstate(),
+        dice=cmb.dice.get_state(),
+        combat=tuple(getattr(cmb, k) for k in COMBAT_FIELDS),
+        alive_by_team=tuple(cmb._alive_by_team.items()),
+        paths=cmb.paths.get_state(),
+        conditions=cmb.conditions.get_state(),
+        actors=tuple(_actor_values(a) for a in cmb.actors),
+        n_events=len(cmb.events),
+    )
+
+def restore_snapshot(cmb, snap: CombatSnapshot) -> None:
+    """Restore in place: actor objects keep their identity, so intents/controllers stay valid."""
+    if len(snap.actors) != len(cmb.actors): raise ValueError("snapshot taken from a different roster")
+    for a, values in zip(cmb.actors, snap.actors, strict=True): _restore_actor(a, values)
+    cmb.rng.setstate(snap.rng); cmb.dice.set_state(snap.dice)
+    for k, v in zip(COMBAT_FIELDS, snap.combat, strict=True): setattr(cmb, k, v)
+    cmb._alive_by_team = dict(snap.alive_by_team)
+    cmb.paths.set_state(snap.paths)
+    cmb.conditions.set_state(snap.conditions)
+    cmb._rebuild_board()
+    ev = cmb.events
+    if isinstance(ev, list) and len(ev) > snap.n_events: del ev[snap.n_events:]  # ListSink: drop undone events
@@ -0,0 +1,165 @@
+# engine/spellbook.py
+from __future__ import annotations
+import importlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from engine.dice import Dice, DiceExpr, parse_scaling
+
+# Spell plans for TBCombat.
+# Each catalog row (core.spell_catalog.SPELLS, else spells_normalized.json) is compiled once, at
+# load time, into a SpellPlan: the damage/heal dice per caster level, how it lands (spell attack,
+# saving throw or automatic), the save ability and what a success keeps, the area template, the
+# damage type and the conditions it inflicts. The free-text columns are normalized here, so the cast path only
+# reads fields. Ad-hoc spells (no catalog row) keep the inline rules in TBCombat.
+#
+# Kinds:
+#   "attack"   spell attack roll against the target; dice doubled on a crit
+#   "save"     target(s) save vs the caster's DC; `save_mult` of the damage on a success,
+#              conditions only land on a failure
+#   "heal"     restores hit points to allies (the target, or the area)
+#   "effect"   no roll (buffs, utility) on allies
+# Harmful plans inflict their conditions; for heals and buffs the catalog lists what they protect
+# from ("Calm": frightened), so those are cleared instead.
+
+ROOT = Path(__file__).resolve().parent.parent
+CATALOG_JSON = ROOT / "spells_normalized.json"
+
+KINDS: Tuple[str, ...] = ("attack", "save", "heal", "effect")
+
+# area size per template (the catalog has no size column; lines run the spell's range)
+AOE_SIZES: Dict[str, int] = {"blast": 1, "cone": 3}
+MAX_LINE = 12
+CONDITION_ROUNDS = 1   # catalog conditions last until the next round starts
+
+_ABILITIES = {"STR": "STR", "STRENGTH": "STR", "DEX": "DEX", "DEXTERITY": "DEX", "CON": "CON",
+              "CONSTITUTION": "CON", "INT": "INT", "INTELLIGENCE": "INT", "WIS": "WIS", "WISDOM": "WIS",
+              "CHA": "CHA", "CHARISMA": "CHA"}
+_DTYPES = {"radient": "radiant", "electric": "lightning", "electricity": "lightning", "heat": "fire"}
+_ATTACK_RE = re.compile(r"\bATT?A+CK\b")
+_FLAT_HP_RE = re.compile(r"^\s*(\d+)\s*HP\b", re.I)
+
+
+@dataclass(frozen=True, slots=True)
+class SpellPlan:
+    name: str
+    cls: str
+    slot: int                          # 0 = cantrip
+    learn_at: int
+    kind: str                          # one of KINDS
+    dice: DiceExpr
+    dtype: str = "physical"
+    save: Optional[str] = None         # ability for "save" plans
+    save_mult: float = 0.5             # damage kept on a successful save
+    range: int = 1
+    shape: Optional[str] = None        # engine.spells template ("blast", "line", "cone") or None
+    size: int = 0
+    targets: int = 1                   # single-target spells that hit several ("Can hit any two")
+    conditions: Tuple[str, ...] = ()
+    tags: Tuple[str, ...] = ()
+
+    def dice_at(self, level: int) -> Optional[Dice]:
+        """The dice a caster of `level` rolls (None: the spell rolls nothing)."""
+        return self.dice.at(level)
+    @property
+    def is_area(self) -> bool: return self.shape is not None
+    @property
+    def harmful(self) -> bool: return self.kind in ("attack", "save")
+
+
+# ---------------- Compiling ----------------
+def _save_ability(text: str) -> Optional[str]:
+    for tok in re.findall(r"[A-Z]+", text):
+        if tok in _ABILITIES: return _ABILITIES[tok]
+    return None
+
+def _save_mult(text: str, default: Any) -> float:
+    if "NOTHING" in text or "NONE" in text or "NO DAMAGE" in text: return 0.0
+    if "HALF" in text: return 0.5
+    try: return max(0.0, min(1.0, float(default)))
+    except (TypeError, ValueError): return 0.5
+
+def _dtype(text: str) -> str:
+    t = str(text or "").strip().lower()
+    if not t or t == "na" or "melee" in t: return "physical"
+    return _DTYPES.get(t, t)
+
+def _shape(text: str, range_tiles: int) -> Tuple[Optional[str], int, int]:
+    """-> (template, size, targets)"""
+    t = str(text or "").strip().lower()
+    if "cone" in t: return "cone", AOE_SIZES["cone"], 1
+    if "line" in t: return "line", max(1, min(MAX_LINE, range_tiles)), 1
+    if "square" in t or t.startswith("rect"): return "blast", AOE_SIZES["blast"], 1
+    m = re.search(r"any (\w+)", t)
+    if m: return None, 0, {"two": 2, "three": 3}.get(m.group(1), 1)
+    return None, 0, 1
+
+def _dice(text: str) -> DiceExpr:
+    m = _FLAT_HP_RE.match(str(text or ""))
+    if m: return DiceExpr(Dice(0, 1, int(m.group(1))))  # flat amount ("70 HP")
+    return parse_scaling(str(text or ""))
+
+def compile_spell(row: Dict[str, Any]) -> Optional[SpellPlan]:
+    """One catalog row -> SpellPlan (None for rows without a name)."""
+    name = str(row.get("spell", "") or "").strip()
+    if not name: return None
+    save_text = str(row.get("save_attr", "") or "").upper()
+    dtype = _dtype(row.get("damage_type", ""))
+    try: rng = max(1, int(float(row.get("range_tiles", 1) or 1)))
+    except (TypeError, ValueError): rng = 1
+    shape, size, targets = _shape(row.get("aoe_shape", ""), rng)
+    save = None
+    if dtype == "healing": kind = "heal"
+    elif _ATTACK_RE.search(save_text): kind = "attack"
+    else:
+        save = _save_ability(save_text)
+        kind = "save" if save else "effect"
+    return SpellPlan(
+        name=name, cls=str(row.get("class", "") or ""), slot=int(row.get("slot_type", 0) or 0),
+        learn_at=int(row.get("learn_at_level", 1) or 1), kind=kind, dice=_dice(row.get("die", "")),
+        dtype=dtype, save=save, save_mult=_save_mult(save_text, row.get("save_success_multiplier", 0.5)),
+        range=rng, shape=shape, size=size, targets=targets,
+        conditions=tuple(str(c).strip().lower() for c in (row.get("conditions") or ()) if str(c).strip()),
+        tags=tuple(t.strip().lower() for t in str(row.get("tags", "") or "").split(",") if t.strip()))
+
+
+class SpellBook:
+    """Compiled plans by (class, name); `get(name)` without a class returns the first row of that name."""
+    def __init__(self, plans: Iterable[SpellPlan] = ()):
+        self._by_class: Dict[Tuple[str, str], SpellPlan] = {}
+        self._by_name: Dict[str, SpellPlan] = {}
+        for p in plans:
+            key = p.name.lower()
+            self._by_class.setdefault((p.cls.lower(), key), p); self._by_name.setdefault(key, p)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "SpellBook":
+        return cls(p for p in map(compile_spell, rows) if p is not None)
+
+    def get(self, name: str, cls: Optional[str] = None) -> Optional[SpellPlan]:
+        key = str(name or "").lower()
+        if cls:
+            p = self._by_class.get((str(cls).lower(), key))
+            if p is not None: return p
+        return self._by_name.get(key)
+    def for_class(self, cls: str) -> List[SpellPlan]:
+        c = str(cls or "").lower(); return [p for (k, _), p in self._by_class.items() if k == c]
+    def __contains__(self, name: str) -> bool: return str(name or "").lower() in self._by_name
+    def __iter__(self) -> Iterator[SpellPlan]: return iter(self._by_class.values())
+    def __len__(self) -> int: return len(self._by_class)
+
+
+def _catalog_rows() -> List[Dict[str, Any]]:
+    try: return list(importlib.import_module("core.spell_catalog").SPELLS)
+    except (ImportError, AttributeError): pass
+    try: return json.loads(CATALOG_JSON.read_text(encoding="utf-8"))
+    except (OSError, ValueError): return []
+
+@lru_cache(maxsize=1)
+def load_spellbook() -> SpellBook:
+    """The catalog, compiled once per process (empty when no catalog is available)."""
+    return SpellBook.from_rows(_catalog_rows())
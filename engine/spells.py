@@ -1,26 +1,171 @@
 # engine/spells.py
 from __future__ import annotations
-from typing import Iterable, List, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from engine.bitboard import cells_mask
 
 # Cardinal line (no diagonals), from (sx,sy) stepping toward (tx,ty), up to length tiles.
 # If dx and dy are both non-zero, we choose the dominant axis (whichever delta is larger).
 def line_aoe_cells(sx: int, sy: int, tx: int, ty: int, length: int, cols: int, rows: int) -> List[Tuple[int,int]]:
-    length = max(1, int(length))
-    dx = tx - sx
-    dy = ty - sy
-    # choose cardinal axis by dominant delta; break ties preferring X
-    if abs(dx) >= abs(dy):
-        step_x = 1 if dx > 0 else -1 if dx < 0 else 0
-        step_y = 0
-    else:
-        step_x = 0
-        step_y = 1 if dy > 0 else -1 if dy < 0 else 0
+    ux, uy = cardinal_direction(sx, sy, tx, ty)
     out: List[Tuple[int,int]] = []
-    cx, cy = sx, sy
-    for _ in range(length):
-        cx += step_x; cy += step_y
-        if 0 <= cx < cols and 0 <= cy < rows:
-            out.append((cx, cy))
-        else:
-            break
+    for dx, dy in aoe_template("line", max(1, int(length)), (ux, uy)):
+        cx, cy = sx + dx, sy + dy
+        if 0 <= cx < cols and 0 <= cy < rows: out.append((cx, cy))
+        else: break  # the line stops at the grid edge
     return out
+
+
+# ---------------- AOE templates ----------------
+# Templates are tuples of (dx, dy) offsets, cached per (shape, size, direction):
+#   "line"   `size` tiles stepping away from the origin (the caster), cardinal direction
+#   "cone"   `size` tiles deep from the caster; row k (1-based) is 2*(k//2)+1 tiles wide
+#   "circle" Euclidean radius `size` around a center
+#   "blast"  (2*size+1) square around a center ("square" is an alias)
+# Directions are unit steps: (1,0) east, (-1,0) west, (0,1) south, (0,-1) north.
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIRECTIONAL_SHAPES = frozenset({"line", "cone"})
+_SHAPE_ALIASES = {"square": "blast", "sphere": "circle", "radius": "circle"}
+
+def normalize_shape(shape: str) -> str:
+    s = str(shape or "").strip().lower()
+    return _SHAPE_ALIASES.get(s, s)
+
+def cardinal_direction(sx: int, sy: int, tx: int, ty: int) -> Tuple[int, int]:
+    """Dominant axis from (sx,sy) toward (tx,ty); ties prefer X (same rule as line_aoe_cells)."""
+    dx = tx - sx; dy = ty - sy
+    if abs(dx) >= abs(dy): return (1 if dx > 0 else -1 if dx < 0 else 0, 0)
+    return (0, 1 if dy > 0 else -1 if dy < 0 else 0)
+
+def aoe_template(shape: str, size: int, direction: Tuple[int, int] = (1, 0)) -> Tuple[Tuple[int, int], ...]:
+    return _template(normalize_shape(shape), max(0, int(size)), tuple(direction))
+
+@lru_cache(maxsize=None)
+def _template(shape: str, n: int, direction: Tuple[int, int]) -> Tuple[Tuple[int, int], ...]:
+    ux, uy = direction
+    if shape == "line":
+        return tuple((ux * k, uy * k) for k in range(1, max(1, n) + 1))
+    if shape == "cone":
+        out = []
+        for k in range(1, max(1, n) + 1):
+            half = k // 2
+            for j in range(-half, half + 1):
+                out.append((ux * k - uy * j, uy * k + ux * j))  # j runs across the axis
+        return tuple(out)
+    if shape == "circle":
+        return tuple((dx, dy) for dy in range(-n, n + 1) for dx in range(-n, n + 1) if dx * dx + dy * dy <= n * n)
+    if shape == "blast":
+        return tuple((dx, dy) for dy in range(-n, n + 1) for dx in range(-n, n + 1))
+    raise ValueError(f"unknown AOE shape: {shape!r}")
+
+def template_cells(shape: str, size: int, origin: Tuple[int, int], cols: int, rows: int,
+                   direction: Tuple[int, int] = (1, 0)) -> List[Tuple[int, int]]:
+    ox, oy = origin
+    return [(ox + dx, oy + dy) for dx, dy in aoe_template(shape, size, direction)
+            if 0 <= ox + dx < cols and 0 <= oy + dy < rows]
+
+@lru_cache(maxsize=65536)
+def template_mask(shape: str, size: int, origin: Tuple[int, int], cols: int, rows: int,
+                  direction: Tuple[int, int] = (1, 0)) -> int:
+    """Bitboard (bit y*cols+x) of the template placed at `origin`, clipped to the grid."""
+    return cells_mask(cols, rows, template_cells(shape, size, origin, cols, rows, direction))
+
+def aoe_ally_exemptions(level: int) -> int:
+    """How many allies (closest to the blast first) a caster of `level` can leave unharmed."""
+    L = int(level)
+    return 3 if L >= 17 else 2 if L >= 10 else 1 if L >= 3 else 0
+
+
+# ---------------- Placement search ----------------
+@dataclass(frozen=True)
+class AoePlacement:
+    origin: Tuple[int, int]            # center for centered shapes, the caster for line/cone
+    direction: Tuple[int, int]
+    enemies_hit: int
+    allies_hit: int
+    score: int
+
+class _Counts:
+    """Actors per tile as a bitboard plus the extra heads on stacked tiles."""
+    __slots__ = ("mask", "extra")
+    def __init__(self, cells, cols: int, rows: int):
+        seen: Dict[int, int] = {}
+        for x, y in cells:
+            if 0 <= x < cols and 0 <= y < rows: b = y * cols + x; seen[b] = seen.get(b, 0) + 1
+        self.mask = 0
+        for b in seen: self.mask |= 1 << b
+        self.extra = [(b, k - 1) for b, k in seen.items() if k > 1]
+    def count(self, region: int) -> int:
+        n = (self.mask & region).bit_count()
+        for b, k in self.extra:
+            if region >> b & 1: n += k
+        return n
+
+def _count_grid(cells: Iterable[Tuple[int, int]], cols: int, rows: int) -> List[List[int]]:
+    g = [[0] * cols for _ in range(rows)]
+    for x, y in cells:
+        if 0 <= x < cols and 0 <= y < rows: g[y][x] += 1
+    return g
+
+def _prefix(g: List[List[int]]) -> List[List[int]]:
+    rows = len(g); cols = len(g[0]) if rows else 0
+    P = [[0] * (cols + 1) for _ in range(rows + 1)]
+    for y in range(rows):
+        acc = 0; row = g[y]; above = P[y]; cur = P[y + 1]
+        for x in range(cols):
+            acc += row[x]; cur[x + 1] = above[x + 1] + acc
+    return P
+
+def _rect_sum(P: List[List[int]], x0: int, y0: int, x1: int, y1: int) -> int:
+    return P[y1 + 1][x1 + 1] - P[y0][x1 + 1] - P[y1 + 1][x0] + P[y0][x0]
+
+def best_aoe_placement(enemies: Iterable[Tuple[int, int]], allies: Iterable[Tuple[int, int]], shape: str, size: int,
+                       cols: int, rows: int, *, caster: Optional[Tuple[int, int]] = None,
+                       max_range: Optional[int] = None, exempt_allies: int = 0,
+                       ally_weight: int = 1) -> Optional[AoePlacement]:
+    """
+    Placement maximizing enemies hit - ally_weight * (allies hit beyond `exempt_allies`).
+    Blasts are scored with 2D prefix sums (O(1) per center); other shapes by popcount of the
+    cached template mask against the enemy/ally bitboards. Centers must be within `max_range`
+    (Manhattan) of `caster` when both are given. Ties: more enemies, then nearer the caster.
+    """
+    shape = normalize_shape(shape); size = max(0, int(size))
+    enemies = list(enemies); allies = list(allies)
+    if not enemies: return None
+    best: Optional[AoePlacement] = None; best_key = None
+
+    def consider(origin, direction, e, a):
+        nonlocal best, best_key
+        score = e - ally_weight * max(0, a - exempt_allies)
+        near = -(abs(origin[0] - caster[0]) + abs(origin[1] - caster[1])) if caster else 0
+        key = (score, e, near, -origin[1], -origin[0])
+        if best_key is None or key > best_key:
+            best_key = key; best = AoePlacement(origin, direction, e, a, score)
+
+    if shape in DIRECTIONAL_SHAPES:
+        if caster is None: raise ValueError("line/cone placement needs the caster position")
+        E = _Counts(enemies, cols, rows); A = _Counts(allies, cols, rows)
+        for d in DIRECTIONS:
+            m = template_mask(shape, size, caster, cols, rows, d)
+            e = E.count(m)
+            if e: consider(caster, d, e, A.count(m))
+        return best
+
+    centers = [(x, y) for y in range(rows) for x in range(cols)]
+    if caster is not None and max_range is not None:
+        centers = [c for c in centers if abs(c[0] - caster[0]) + abs(c[1] - caster[1]) <= max_range]
+    if shape == "blast":
+        PE = _prefix(_count_grid(enemies, cols, rows)); PA = _prefix(_count_grid(allies, cols, rows))
+        for cx, cy in centers:
+            x0 = max(0, cx - size); y0 = max(0, cy - size); x1 = min(cols - 1, cx + size); y1 = min(rows - 1, cy + size)
+            e = _rect_sum(PE, x0, y0, x1, y1)
+            if e: consider((cx, cy), (0, 0), e, _rect_sum(PA, x0, y0, x1, y1))
+        return best
+    E = _Counts(enemies, cols, rows); A = _Counts(allies, cols, rows)
+    for c in centers:
+        m = template_mask(shape, size, c, cols, rows)
+        e = E.count(m)
+        if e: consider(c, (0, 0), e, A.count(m))
+    return best
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, Literal, Callable, List
+from functools import lru_cache
+from typing import Dict, Any, Optional, Literal, Callable, Tuple
 
 TargetKind = Literal["role", "player_id", "attribute_query"]
 
@@ -13,42 +15,82 @@ class OppositionInstruction:
     priority: int = 1                      # 1..3; higher = stronger bias
     trigger: Optional[str] = None          # optional: "losing", "round>=5", ...
 
+# ---------------- Compiled predicates ----------------
+# Attribute queries are parsed once per distinct string (compile_query is cached) into AttrQuery
+# objects; instructions compile into predicates that also list the unit attributes they read, so
+# callers can tell when a cached match result may have gone stale.
+
+_AND_RE = re.compile(r"\bAND\b", re.IGNORECASE)
+_CLAUSE_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|>|<|==|=|!=)\s*([A-Za-z0-9_]+)$")
+
+def unit_attr(unit: Any, attr: str) -> Any:
+    """`unit[attr]` for dict-like units, `unit.attr` otherwise (None when missing)."""
+    if isinstance(unit, dict): return unit.get(attr)
+    return getattr(unit, attr, None)
+
+@dataclass(frozen=True)
+class AttrTest:
+    attr: str
+    op: Optional[str]                      # None: the clause did not parse and never matches
+    value: Any = None
+
+    def __call__(self, unit: Any) -> bool:
+        op = self.op; v = self.value
+        if op is None: return False
+        x = unit_attr(unit, self.attr)
+        if isinstance(x, (int, float)) and isinstance(v, (int, float)):
+            if op == ">=": return x >= v
+            if op == "<=": return x <= v
+            if op == ">":  return x > v
+            if op == "<":  return x < v
+            if op in ("==", "="): return x == v
+            if op == "!=": return x != v
+        else:
+            if op in ("==", "="): return str(x) == str(v)
+            if op == "!=": return str(x) != str(v)
+        return False
+
+@dataclass(frozen=True)
+class AttrQuery:
+    """'DEX>=14 AND role=Healer' as a conjunction of AttrTests; call it with a unit."""
+    text: str
+    tests: Tuple[AttrTest, ...]
+
+    @property
+    def attrs(self) -> Tuple[str, ...]: return tuple(dict.fromkeys(t.attr for t in self.tests if t.op))
+    def __call__(self, unit: Any) -> bool: return all(t(unit) for t in self.tests)
+
+def _compile_clause(part: str) -> AttrTest:
+    m = _CLAUSE_RE.match(part)
+    if not m: return AttrTest(part, None)
+    attr, op, value = m.groups()
+    return AttrTest(attr, op, int(value) if value.isdigit() else value)
+
+@lru_cache(maxsize=None)
+def compile_query(q: str) -> AttrQuery:
+    return AttrQuery(q, tuple(_compile_clause(t.strip()) for t in _AND_RE.split(q)))
+
 def _parse_attr_query(q: str) -> Callable[[Dict[str, Any]], bool]:
-    """Return predicate(player_dict)->bool for 'DEX>=14 AND role=Healer'."""
-    import re
-    tokens = [t.strip() for t in re.split(r"\bAND\b", q, flags=re.IGNORECASE)]
-    tests: List[Callable[[Dict[str, Any]], bool]] = []
-
-    def make_test(part: str):
-        m = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|>|<|==|=|!=)\s*([A-Za-z0-9_]+)$", part)
-        if not m:
-            def bad(_): return False
-            return bad
-        attr, op, value = m.groups()
-        v = int(value) if value.isdigit() else value
-
-        def test(d: Dict[str, Any]) -> bool:
-            x = d.get(attr)
-            if isinstance(x, (int, float)) and isinstance(v, (int, float)):
-                if op == ">=": return x >= v
-                if op == "<=": return x <= v
-                if op == ">":  return x > v
-                if op == "<":  return x < v
-                if op in ("==", "="): return x == v
-                if op == "!=": return x != v
-            else:
-                if op in ("==", "="): return str(x) == str(v)
-                if op == "!=": return str(x) != str(v)
-            return False
-        return test
-
-    for part in tokens:
-        tests.append(make_test(part))
-
-    def predicate(d: Dict[str, Any]) -> bool:
-        return all(t(d) for t in tests)
-
-    return predicate
+    """Return predicate(player_dict)->bool for 'DEX>=14 AND role=Healer' (compiled once per string)."""
+    return compile_query(q)
+
+@dataclass(frozen=True)
+class CompiledInstruction:
+    instruction: OppositionInstruction
+    attrs: Tuple[str, ...]                 # unit attributes the predicate reads
+    matches: Callable[[Any], bool]
+
+def compile_instruction(oi: OppositionInstruction) -> CompiledInstruction:
+    kind = oi.target_kind; value = str(oi.target_value)
+    if kind == "player_id":
+        def matches(u) -> bool:
+            pid = unit_attr(u, "pid"); return str(pid) == value or f"pid:{pid}" == value
+        return CompiledInstruction(oi, ("pid",), matches)
+    if kind == "role":
+        return CompiledInstruction(oi, ("role",), lambda u: str(unit_attr(u, "role")) == value)
+    if kind == "attribute_query":
+        q = compile_query(value); return CompiledInstruction(oi, q.attrs, q)
+    return CompiledInstruction(oi, (), lambda u: False)
 
 def instruction_applies_to(oi: OppositionInstruction, unit: Dict[str, Any]) -> bool:
     kind = oi.target_kind
@@ -57,6 +99,5 @@ def instruction_applies_to(oi: OppositionInstruction, unit: Dict[str, Any]) -> b
     if kind == "role":
         return str(unit.get("role")) == oi.target_value
     if kind == "attribute_query":
-        pred = _parse_attr_query(oi.target_value)
-        return pred(unit)
+        return compile_query(oi.target_value)(unit)
     return False
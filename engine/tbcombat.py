@@ -1,10 +1,22 @@
 # engine/tbcombat.py
 from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
-import random
 
+from core.rng import make_rng
 from core.xp import xp_for_kill, grant_xp
-from core.tactics import choose_intent, get_team_tactics  # NEW: tactics integration
+from core.tactics import choose_intent  # NEW: tactics integration
+from engine.profiles import CombatProfile, WeaponProfile, compile_profile, compile_weapon
+from engine.conditions import (ATTACKED_AT_ADVANTAGE, ATTACKS_AT_DISADVANTAGE, DEX_SAVE_DISADVANTAGE, FAILS_STR_DEX_SAVES,
+                               PRONE, BIT, ConditionClock, mask_of)
+from engine.dice import make_dice
+from engine.events import EVENT_LEVEL_ALL, EventSink, ListSink
+from engine.snapshot import CombatSnapshot, restore_snapshot, take_snapshot
+from engine.pathing import PathPlanner, manhattan
+from engine.bitboard import Occupancy, ball
+from engine.spellbook import CONDITION_ROUNDS, SpellPlan, load_spellbook
+from engine.spells import DIRECTIONAL_SHAPES, aoe_ally_exemptions, cardinal_direction, normalize_shape, template_mask
+from engine.world_view import WorldView
+from engine.ai.weights import OIContext, current_oi
 
 def _mod(val: int) -> int: return (int(val) - 10) // 2
 def _alive(f) -> bool: return bool(getattr(f, "alive", True)) and int(getattr(f, "hp", 1)) > 0
@@ -13,30 +25,313 @@ def _pid(f) -> str: return str(getattr(f, "pid", getattr(f, "id", getattr(f, "na
 def _prof_for_level(level: int) -> int:
     L = max(1, int(level)); return min(6, 2 + (L - 1) // 4)
 
-def _roll_d20(rng: random.Random, adv_ctx: int = 0) -> Tuple[Tuple[int,int,int], int]:
-    a = rng.randint(1, 20); b = rng.randint(1, 20)
-    if   adv_ctx > 0: return (a, b, max(a, b)), max(a, b)
-    elif adv_ctx < 0: return (a, b, min(a, b)), min(a, b)
-    else:             return (a, b, a), a
-
 class TBCombat:
     """
     Turn-based combat with:
     - INT-only detection/saves, Stalker/Crusader/Wizard features
     - Proportional XP on death (killer = top damager)
     - NEW: Tactics router fallback + Taunt action and forced targeting for 1 round
+    - Compiled per-actor CombatProfiles (weapons, dice, mods, class flags) reused by every attack
+    - Pluggable event sink (`events`): ListSink by default, NullSink/RingSink/CallbackSink and
+      outcome-only levels for headless sims; event dicts are only built when the sink wants them
+    - snapshot()/restore(): cheap in-place rollback of all mutable match state (for lookahead)
+    - Per-team occupancy bitboards (`board`): aura, reach and blast queries are mask lookups
+    - Movement: move/dash/disengage/dodge intents on the grid with opportunity attacks, and the
+      path_step/path_towards/distance/speed queries TacticsController plans with (engine.pathing)
+    - Dice (engine.dice): `dice="randint"` rolls straight from the RNG as always; `dice="buffered"`
+      rolls from blocks of pre-drawn words (faster, deterministic per seed within the mode)
+    - RNG: `rng_kind="mt"` (random.Random) or `"counter"` (core.rng.CounterRNG, a SplitMix64 stream
+      whose state is a (key, counter) pair; seed it with core.rng.derive(career seed, week, ...))
+    - Replay hooks: `recorder` logs each turn's intents, `replay` feeds recorded ones back (engine.replay)
+    - Initiative: turn order is rolled once at the start of round 1 (`initiative=False` keeps roster
+      order) and kept as a compact array of living actors, so the dead cost no turns; each round
+      opens with a `round_start` event, expiring conditions and one hidden check per team
+    - Conditions (engine.conditions): a bitmask per actor read by the attack/save rules, durations
+      in a per-match expiry heap (`conditions`); add_condition/clear_condition/has_condition
+    - Opposition instructions (`oi`, engine.ai.weights): a per-match OIContext, so concurrent
+      matches (threads, worker processes, the UI's exhibition picker) never share OI state
+    - World view (engine.world_view): `view()` hands the tactics router and controllers one shared,
+      read-only picture of the match (rosters, HP fractions, ranked targets, team tactics), rebuilt
+      once per turn or when `_world_rev` says hp/positions/stealth changed
+    - Catalog spells (engine.spellbook): a cast naming a catalog spell runs its precompiled SpellPlan
+      (dice by caster level, save, area template, damage type, conditions); ad-hoc spells keep the
+      inline cantrip/blast/control rules
+    - Per-team alive counts: `winner` is set on the decisive kill (-1 = draw), and
+      `stalemate_rounds` rounds without damage/healing end the match as a draw
     """
-    def __init__(self, team_a, team_b, actors: List[Any], width: int, height: int, *, seed: int = 1):
+    def __init__(self, team_a, team_b, actors: List[Any], width: int, height: int, *, seed: int = 1,
+                 stalemate_rounds: int = 25, events: Optional[EventSink] = None, dice: str = "randint",
+                 rng_kind: str = "mt", initiative: bool = True, oi: Any = None):
         self.team_a = team_a; self.team_b = team_b
         self.actors = actors[:]
         self.width = int(width); self.height = int(height)
-        self.rng = random.Random(seed)
-        self.turn_idx = 0
+        self.rng_kind = rng_kind
+        self.rng = make_rng(rng_kind, seed)  # "counter": O(1) state, streams from core.rng.derive
+        self.seed = seed
+        self.dice = make_dice(dice, self.rng)  # every roll of the match goes through this (engine.dice)
+        self.turn_idx = 0      # position in the live turn order (`_live`)
+        self.turn_no = 0  # take_turn calls so far (dead-actor skips included); replay/scrub index
+        self.round = 1
         self.winner: Optional[int] = None
-        self.events: List[Dict[str, Any]] = []
+        self.events: EventSink = ListSink()
+        self._ev_level = EVENT_LEVEL_ALL
+        if events is not None: self.set_event_sink(events)
         self.controllers: Dict[int, Any] = {}
         # Team tactics store (UI can set this on the env)
         self.team_tactics: Dict[int, Dict[str, Any]] = {}
+        # Opposition instructions owned by this match (an OI map or OIContext; None = the
+        # engine.ai.weights default at construction time). The bias table is always this match's
+        # own, so its rows go away with the match.
+        self.oi: OIContext = OIContext.for_match(oi if oi is not None else current_oi())
+        # Win / stalemate bookkeeping (0 disables stalemate detection)
+        self.stalemate_rounds = max(0, int(stalemate_rounds))
+        self._last_progress_round = 1
+        self._in_turn = False
+        # Turn order: actor indices (initiative order, living only), rolled at the start of round 1
+        self.initiative = bool(initiative)
+        self._live: Optional[Tuple[int, ...]] = None
+        self._round_started = 0       # last round whose start-of-round work ran
+        self._cur_removed = False     # the acting actor went down during its own turn
+        self._forced_target_id = None  # taunter pid forcing the current turn's attacks
+        self._alive_by_team: Dict[Any, int] = {}
+        # id(actor) -> compiled CombatProfile (see invalidate_profile)
+        self._profiles: Dict[int, CombatProfile] = {}
+        # Movement: cached distance fields + this turn's movement budget / disengage flag
+        self.paths = PathPlanner(self)
+        self.board = Occupancy(self.width, self.height, self.actors, alive=_alive)
+        self._reach_cap = 1                                  # largest reach of any compiled profile
+        self._aura_cache: Dict[Any, Tuple[int, List[Tuple[int, int]], int]] = {}
+        self._moves_left = 0
+        self._disengaged = False
+        self._moved = False
+        # Shared world view: rebuilt when the turn or `_world_rev` changes (never restored, only bumped)
+        self._world_rev = 0
+        self._view: Optional[WorldView] = None
+        # Replay (engine.replay): recorder logs each turn's intents, replay feeds them back
+        self.recorder = None
+        self.replay = None
+        self._order = {id(f): i for i, f in enumerate(self.actors)}
+        self.conditions = ConditionClock(self.actors)
+        self.conditions.adopt(self.round - 1)  # bags set before the match tick from round 1
+        for f in self.actors:
+            tid = getattr(f, "team_id", 0)
+            self._alive_by_team[tid] = self._alive_by_team.get(tid, 0) + (1 if _alive(f) else 0)
+            self.profile(f)  # compile up front so _reach_cap bounds every reach query
+        # OI bias rows for each side's enemies (every actor some other team can target), read per target afterwards
+        sides = set(self._alive_by_team)
+        self.oi.prime(f for f in self.actors if sides - {getattr(f, "team_id", 0)})
+
+    @property
+    def fighters(self) -> List[Any]: return self.actors
+    @property
+    def finished(self) -> bool: return self.winner is not None
+    def alive_count(self, team_id) -> int: return int(self._alive_by_team.get(team_id, 0))
+    def set_event_sink(self, sink: EventSink) -> None:
+        self.events = sink; self._ev_level = int(getattr(sink, "level", EVENT_LEVEL_ALL))
+
+    # ---- Match end ----
+    def _end_match(self, winner: int) -> None:
+        if self.winner is not None: return
+        self.winner = int(winner)
+        # inside a turn the 'end' event waits until the turn's own events are logged
+        if not self._in_turn: self._log_end()
+    def _log_end(self) -> None:
+        if self._ev_level: self.events.append({"type": "end", "winner": self.winner, "round": self.round})
+    def _on_down(self, target) -> None:
+        tid = getattr(target, "team_id", 0)
+        self._alive_by_team[tid] = max(0, self._alive_by_team.get(tid, 0) - 1)
+        if self._ev_level: self.events.append({"type": "down", "name": _pname(target), "team_id": tid, "round": self.round})
+        self.paths.bump(tid); self.board.remove(target); self._drop_from_order(target)
+        standing = [t for t, n in self._alive_by_team.items() if n > 0]
+        if len(standing) <= 1:
+            self._end_match(standing[0] if standing else -1)
+    def _advance_turn(self) -> None:
+        self.turn_no += 1
+        if self._cur_removed: self._cur_removed = False   # the next actor already slid into this slot
+        else: self.turn_idx += 1
+        if self.turn_idx < len(self._live or ()): return
+        self.turn_idx = 0; self.round += 1
+        if self.stalemate_rounds and self.round - self._last_progress_round > self.stalemate_rounds:
+            self._end_match(-1)
+
+    # ---- Turn order (initiative) ----
+    def _roll_initiative(self) -> None:
+        """d20 + DEX mod once per match; ties go to the higher DEX, then roster order."""
+        rolls = []
+        for i, f in enumerate(self.actors):
+            if not _alive(f): continue
+            dex = _mod(getattr(f, "DEX", 10) or 10)
+            total = self.dice.d20(0)[1] + dex if self.initiative else 0
+            rolls.append((-total, -dex if self.initiative else 0, i))
+        rolls.sort()
+        self._live = tuple(i for _, _, i in rolls)
+        if self._ev_level >= EVENT_LEVEL_ALL and self.initiative:
+            for t, _, i in rolls: self.events.append({"type": "initiative", "actor": _pname(self.actors[i]), "roll": -t})
+    def _drop_from_order(self, target) -> None:
+        live = self._live
+        if live is None: return
+        i = self._order.get(id(target))
+        if i not in live: return
+        pos = live.index(i)
+        self._live = live[:pos] + live[pos + 1:]   # new tuple: snapshots keep the old one
+        if pos < self.turn_idx: self.turn_idx -= 1
+        elif pos == self.turn_idx and self._in_turn: self._cur_removed = True
+    @property
+    def current_actor(self) -> Optional[Any]:
+        """Whose turn is next (None before initiative is rolled or once nobody is left)."""
+        live = self._live
+        if live is None or self.turn_idx >= len(live): return None
+        return self.actors[live[self.turn_idx]]
+    @property
+    def turn_order(self) -> List[Any]: return [self.actors[i] for i in (self._live or ())]
+    def _start_round(self) -> None:
+        """Once per round, before its first turn: round marker, condition timers, hidden detection."""
+        self._round_started = self.round
+        if self._live is None: self._roll_initiative()
+        if self._ev_level >= EVENT_LEVEL_ALL: self.events.append({"type": "round_start", "round": self.round})
+        ended = self.conditions.expire(self.round)
+        if ended and self._ev_level >= EVENT_LEVEL_ALL:
+            for f, k in ended: self.events.append({"type": "condition_ended", "target": _pname(f), "condition": k})
+        detections = self._round_detect_hidden()
+        if detections: self.events.extend(detections)
+
+    # ---- Movement (engine.pathing) ----
+    def is_alive(self, f) -> bool: return _alive(f)
+    def distance(self, a, b) -> int: return self._dist(a, b)
+    def distance_xy(self, a, xy: Tuple[int, int]) -> int: return self._dist_to_xy(a, xy)
+    def speed(self, f) -> int:
+        """Tiles per turn: `speed` in tiles, or in feet (>= 15, 5 ft per tile); default 6."""
+        v = getattr(f, "speed", None)
+        if v is None: return 6
+        v = int(v); return v // 5 if v >= 15 else max(0, v)
+    def threat_reach(self, f) -> int:
+        """Melee reach used for opportunity attacks (0 when wielding a ranged weapon)."""
+        p = self.profile(f); return 0 if p.main.is_ranged else p.reach
+    def _threatened_in_melee(self, f) -> bool:
+        near = self.board.within(self._xy(f), self._reach_cap, exclude_team=getattr(f, "team_id", 0))
+        return any(self._dist(f, e) <= self.threat_reach(e) for e in near)
+    def _xy(self, f) -> Tuple[int, int]: return (getattr(f, "tx", 0) or 0, getattr(f, "ty", 0) or 0)
+    def path_towards(self, actor, goal, *, max_steps: Optional[int] = None, stop_within: int = 1,
+                     avoid_oa: bool = False, start: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+        """Tiles to walk towards `goal` (an actor or (x, y)); see PathPlanner.path."""
+        xy = goal if isinstance(goal, tuple) else self._xy(goal)
+        steps = self.speed(actor) if max_steps is None else max_steps
+        return self.paths.path(actor, xy, max_steps=steps, stop_within=stop_within, avoid_oa=avoid_oa, start=start)
+    def path_step(self, actor, target, avoid_oa: bool = False) -> Optional[Tuple[int, int]]:
+        return self.paths.step(actor, self._xy(target), avoid_oa=avoid_oa, stop_within=1)
+    def path_step_towards(self, actor, xy: Tuple[int, int], avoid_oa: bool = False) -> Optional[Tuple[int, int]]:
+        return self.paths.step(actor, (int(xy[0]), int(xy[1])), avoid_oa=avoid_oa, stop_within=0)
+    def invalidate_positions(self) -> None:
+        """Rebuild the occupancy bitboards and forget cached distance fields
+        (call after repositioning actors outside of move intents)."""
+        self.paths = PathPlanner(self); self._rebuild_board()
+    def _rebuild_board(self) -> None:
+        self.board = Occupancy(self.width, self.height, self.actors, alive=_alive); self._aura_cache.clear()
+        self._world_rev += 1
+
+    def oi_bias(self, attacker, target, base_score: float) -> float:
+        """Target score adjusted by this match's opposition instructions (engine.ai.weights)."""
+        return self.oi.apply(attacker, target, base_score)
+
+    # ---- Shared world view (engine.world_view) ----
+    def view(self) -> WorldView:
+        """The read-only world view for this turn (cached until hp, positions or stealth change)."""
+        key = (self.turn_no, self._world_rev); v = self._view
+        if v is None or v.key != key: v = self._view = WorldView(self, key)
+        return v
+
+    def _move_one(self, f, to: Tuple[int, int]) -> bool:
+        frm = self._xy(f)
+        if self._moves_left <= 0 or manhattan(frm, to) != 1: return False
+        if not (0 <= to[0] < self.width and 0 <= to[1] < self.height): return False
+        tid = getattr(f, "team_id", 0)
+        if self.board.mask(exclude_team=tid) >> (to[1] * self.width + to[0]) & 1: return False  # enemy tile
+        if not self._disengaged: self._opportunity_attacks(f, frm, to)
+        if not _alive(f): return False
+        self.board.remove(f); f.tx, f.ty = to; self.board.add(f)
+        self._moves_left -= 1; self._moved = True
+        self.paths.bump(tid); self._world_rev += 1
+        return True
+    def _settle_position(self, f) -> None:
+        # allies can be passed through but not shared: step back along the way we came
+        if not _alive(f): return
+        here = self._xy(f); tid = getattr(f, "team_id", 0)
+        if len(self.board.at(here)) < 2: return
+        for r in range(1, max(self.width, self.height)):
+            for dx in range(-r, r + 1):
+                for dy in (r - abs(dx), abs(dx) - r):
+                    c = (here[0] + dx, here[1] + dy)
+                    if 0 <= c[0] < self.width and 0 <= c[1] < self.height and not self.board.is_occupied(c):
+                        self.board.remove(f); f.tx, f.ty = c; self.board.add(f)
+                        self.paths.bump(tid); self._world_rev += 1; return
+    def _opportunity_attacks(self, mover, frm: Tuple[int, int], to: Tuple[int, int]) -> None:
+        near = self.board.within(frm, self._reach_cap, exclude_team=getattr(mover, "team_id", 0))
+        for e in sorted(near, key=lambda a: self._order.get(id(a), 0)):
+            if not _alive(mover): return
+            if not _alive(e) or getattr(e, "_reaction_round", 0) == self.round: continue
+            r = self.threat_reach(e); ex = self._xy(e)
+            if r <= 0 or manhattan(frm, ex) > r or manhattan(to, ex) <= r: continue
+            e._reaction_round = self.round
+            main = self.profile(e).main.item
+            hit, crit, _ = self._attack_roll(e, mover, item=main, adv_ctx=self._attack_adv(e, mover), is_ranged=False, offhand=False)
+            if hit:
+                dmg = self._weapon_damage_roll(e, main, is_ranged=False, crit=crit)
+                dealt = self._apply_damage(mover, dmg, dtype="physical", attacker=e)
+                if self._ev_level: self.events.append({"type":"damage","attacker":_pname(e),"defender":_pname(mover),"amount":int(dealt),"crit":bool(crit),"opportunity":True})
+
+    # ---- One-shot advantage (attack intents' "adv", from RoleSpec attack_advantage/disadvantage) and Dodge ----
+    def grant_advantage(self, f, n: int = 1) -> None:
+        f._adv_pending = int(getattr(f, "_adv_pending", 0) or 0) + max(0, int(n))
+    def grant_disadvantage(self, f, n: int = 1) -> None:
+        f._adv_pending = int(getattr(f, "_adv_pending", 0) or 0) - max(0, int(n))
+    def _attack_adv(self, attacker, defender, is_ranged: bool = False) -> int:
+        adv = 0
+        pending = getattr(attacker, "_adv_pending", 0)
+        if pending:
+            adv = 1 if pending > 0 else -1; attacker._adv_pending = 0
+        if getattr(defender, "_dodging", False): adv -= 1
+        am = mask_of(attacker); dm = mask_of(defender)
+        if am or dm:
+            if am & ATTACKS_AT_DISADVANTAGE: adv -= 1
+            if dm & ATTACKED_AT_ADVANTAGE: adv += 1
+            if dm & PRONE: adv += -1 if is_ranged else 1
+        return max(-1, min(1, adv))
+
+    # ---- Conditions (engine.conditions) ----
+    def add_condition(self, f, name: str, rounds: int) -> bool:
+        """Apply `name` to `f` for `rounds` rounds (it expires at the start of round `round + rounds`)."""
+        return self.conditions.add(f, name, rounds, self.round)
+    def clear_condition(self, f, name: str) -> None: self.conditions.clear(f, name)
+    def has_condition(self, f, name: str) -> bool: return bool(mask_of(f) & BIT.get(name, 0))
+
+    # ---- Snapshot / restore (engine.snapshot) ----
+    def snapshot(self) -> CombatSnapshot:
+        """Capture actor combat state, turn/round/winner bookkeeping and the RNG state."""
+        return take_snapshot(self)
+    def restore(self, snap: CombatSnapshot) -> None:
+        """Roll back to `snap` in place (the same snapshot can be restored any number of times)."""
+        restore_snapshot(self, snap)
+    def reseed(self, seed: int) -> None:
+        """Reseed the match RNG (and drop any dice it had already buffered)."""
+        self.rng.seed(seed); self.dice.reset()
+
+    # ---- Compiled combat profiles ----
+    def profile(self, f) -> CombatProfile:
+        p = self._profiles.get(id(f))
+        if p is None:
+            p = self._profiles[id(f)] = compile_profile(f)
+            if p.reach > self._reach_cap: self._reach_cap = p.reach
+        return p
+    def invalidate_profile(self, f=None) -> None:
+        """Drop the compiled profile of `f` (or of every actor) after equipment/stat changes."""
+        if f is None: self._profiles.clear()
+        else: self._profiles.pop(id(f), None)
+    def _weapon(self, f, item: Optional[Dict[str, Any]]) -> WeaponProfile:
+        p = self.profile(f)
+        if item is None or item is p.main.item: return p.main
+        if p.off is not None and item is p.off.item: return p.off
+        return compile_weapon(f, item, stalker_l18=p.stalker_l18,
+                              free_other_hand=(not p.has_shield) and p.off is None)
 
     # ---- Equipment helpers ----
     def _equipped(self, f) -> Dict[str, Any]: return getattr(f, "equipped", {}) or {}
@@ -71,24 +366,10 @@ class TBCombat:
         return abs(getattr(a, "tx", 0) - getattr(b, "tx", 0)) + abs(getattr(a, "ty", 0) - getattr(b, "ty", 0))
     def _dist_to_xy(self, a, xy: Tuple[int,int]) -> int:
         x, y = xy; return abs(getattr(a, "tx", 0) - x) + abs(getattr(a, "ty", 0) - y)
-    def reach(self, f) -> int:
-        main = self._equipped_main(f)
-        dice, ability, is_ranged, reach, finesse, versatile, two_handed_dice = self._weapon_profile_from_item(main)
-        r = reach
-        off = self._equipped_off(f)
-        if off:
-            _, _, _, r2, *_ = self._weapon_profile_from_item(off)
-            r = max(r, r2)
-        cls = str(getattr(f, "class", "")).capitalize(); lvl = int(getattr(f, "level", 1))
-        if cls == "Stalker" and lvl >= 18 and not (main and main.get("ranged")):
-            r += 1
-        return r
+    def reach(self, f) -> int: return self.profile(f).reach
     def ranged_limits(self, f, item) -> Tuple[int, int]:
-        if not item or not item.get("ranged"): return (1, 1)
-        base = item.get("range", (8, 16))
-        cls = str(getattr(f, "class", "")).capitalize(); lvl = int(getattr(f, "level", 1))
-        if cls == "Stalker" and lvl >= 18: return (10**9, 10**9)
-        return (int(base[0]), int(base[1]))
+        if not item: return (1, 1)
+        return self._weapon(f, item).range_limits
 
     # ---- Stealth / detection ----
     def _highest_enemy_passive_perception(self, f) -> int:
@@ -96,55 +377,95 @@ class TBCombat:
         if not enemies: return 10
         return max(10 + _mod(getattr(e, "INT", getattr(e, "int", 10))) for e in enemies)
     def _attempt_hide(self, player) -> Dict[str, Any]:
-        raw, eff = _roll_d20(self.rng, 0)
+        raw, eff = self.dice.d20(0)
         dex_mod = _mod(getattr(player, "DEX", 10))
-        bonus10 = 10 if (str(getattr(player, "class","")).capitalize() == "Stalker" and int(getattr(player, "level",1)) >= 10) else 0
+        pr = self.profile(player)
+        bonus10 = sum(h(self, player, pr) for h in pr.hooks.on_hide)  # Stalker L10: +10
         stealth_total = eff + dex_mod + bonus10
         dc = self._highest_enemy_passive_perception(player)
         success = stealth_total >= dc
         setattr(player, "hidden", bool(success)); setattr(player, "_hide_roll", int(stealth_total if success else 0))
+        self._world_rev += 1
         return {"type": "hide_attempt", "player": _pname(player), "d20": eff, "dex_mod": dex_mod, "bonus10": bonus10, "stealth": stealth_total, "dc": dc, "success": success}
-    def _start_of_turn_detect_hidden(self, detector):
+    def _round_detect_hidden(self) -> List[Dict[str, Any]]:
+        """Each opposing team gets one check per hidden actor per round, by its sharpest (INT) member."""
         out = []
-        for e in self.actors:
-            if not _alive(e) or getattr(e, "team_id", -1) == getattr(detector, "team_id", -2) or not bool(getattr(e, "hidden", False)):
-                continue
-            raw, eff = _roll_d20(self.rng, 0)
-            total = eff + _mod(getattr(detector, "INT", 10))
-            thr = int(getattr(e, "_hide_roll", 0) or 0)
-            success = (thr > 0) and (total >= thr)
-            out.append({"type": "detect_hidden", "detector": _pname(detector), "target": _pname(e), "d20": eff, "int_mod": _mod(getattr(detector, "INT", 10)), "total": total, "threshold": thr, "success": success})
-            if success:
-                setattr(e, "hidden", False); setattr(e, "_hide_roll", 0)
+        for i in self._live or ():
+            e = self.actors[i]
+            if not _alive(e) or not bool(getattr(e, "hidden", False)): continue
+            seekers: Dict[Any, Any] = {}
+            for j in self._live:
+                d = self.actors[j]; tid = getattr(d, "team_id", -1)
+                if tid == getattr(e, "team_id", -2) or not _alive(d): continue
+                best = seekers.get(tid)
+                if best is None or _mod(getattr(d, "INT", 10)) > _mod(getattr(best, "INT", 10)): seekers[tid] = d
+            for detector in seekers.values():
+                _, eff = self.dice.d20(0)
+                total = eff + _mod(getattr(detector, "INT", 10))
+                thr = int(getattr(e, "_hide_roll", 0) or 0)
+                success = (thr > 0) and (total >= thr)
+                if self._ev_level >= EVENT_LEVEL_ALL: out.append({"type": "detect_hidden", "detector": _pname(detector), "target": _pname(e), "d20": eff, "int_mod": _mod(getattr(detector, "INT", 10)), "total": total, "threshold": thr, "success": success})
+                if success:
+                    setattr(e, "hidden", False); setattr(e, "_hide_roll", 0); self._world_rev += 1; break
         return out
 
     # ---- Crusader aura / saves ----
+    def _crusader_auras(self, tid) -> Tuple[List[Tuple[int, int]], int]:
+        """-> ([(INT bonus, aura mask)] best first, no-fear mask) for team `tid`, cached per board version."""
+        hit = self._aura_cache.get(tid)
+        if hit is not None and hit[0] == self.board.version: return hit[1], hit[2]
+        int_auras: List[Tuple[int, int]] = []; no_fear = 0
+        for p, aura in self._auras(tid):
+            x, y = self._xy(p); m = ball(self.width, self.height, x, y, aura.radius)
+            if aura.radius: int_auras.append((aura.int_bonus, m))
+            if aura.no_fear: no_fear |= m
+        int_auras.sort(key=lambda t: -t[0])
+        self._aura_cache[tid] = (self.board.version, int_auras, no_fear)
+        return int_auras, no_fear
     def _crusader_int_aura_bonus(self, target) -> int:
-        tid = getattr(target, "team_id", -1); best = 0
-        for p in self.actors:
-            if not _alive(p) or str(getattr(p, "class","")).capitalize() != "Crusader" or getattr(p, "team_id", -2) != tid: continue
-            radius = int(getattr(p, "cru_aura_radius", 0))
-            if radius and self._dist(p, target) <= radius:
-                best = max(best, int(getattr(p, "cru_aura_int_bonus", 0)))
-        return best
+        tid = getattr(target, "team_id", -1)
+        if self.board.has_offgrid: return self._crusader_int_aura_bonus_scan(target)
+        x, y = self._xy(target); i = y * self.width + x
+        for bonus, m in self._crusader_auras(tid)[0]:
+            if m >> i & 1: return max(0, bonus)
+        return 0
     def _crusader_no_fear_active(self, target) -> bool:
         tid = getattr(target, "team_id", -1)
+        if self.board.has_offgrid: return self._crusader_no_fear_active_scan(target)
+        x, y = self._xy(target)
+        return bool(self._crusader_auras(tid)[1] >> (y * self.width + x) & 1)
+    # distance scans, used when an actor stands outside the grid
+    def _crusader_int_aura_bonus_scan(self, target) -> int:
+        best = 0
+        for p, aura in self._auras(getattr(target, "team_id", -1)):
+            if aura.radius and self._dist(p, target) <= aura.radius: best = max(best, aura.int_bonus)
+        return best
+    def _crusader_no_fear_active_scan(self, target) -> bool:
+        return any(aura.no_fear and self._dist(p, target) <= aura.radius for p, aura in self._auras(getattr(target, "team_id", -1)))
+    def _auras(self, tid) -> List[Tuple[Any, Any]]:
+        """(actor, Aura) for the living members of team `tid` with aura-providing class features."""
+        out = []
         for p in self.actors:
-            if not _alive(p) or str(getattr(p, "class","")).capitalize() != "Crusader" or getattr(p, "team_id", -2) != tid: continue
-            if bool(getattr(p, "cru_aura_no_fear", False)) and self._dist(p, target) <= int(getattr(p, "cru_aura_radius", 0)):
-                return True
-        return False
+            if getattr(p, "team_id", -2) != tid or not _alive(p): continue
+            for h in self.profile(p).hooks.aura:
+                a = h(self, p)
+                if a is not None: out.append((p, a))
+        return out
     def _saving_throw(self, target, ability: str, dc: int, *, vs_condition: Optional[str] = None) -> bool:
         if vs_condition == "frightened" and self._crusader_no_fear_active(target):
-            self.events.append({"type":"saving_throw","target":_pname(target),"ability":ability,"dc":dc,"auto":"crusader_no_fear"}); return True
-        adv = 0
-        if vs_condition in ("blinded", "deafened") and bool(getattr(target, "wiz_adv_vs_blind_deaf", False)):
-            adv = 1
-        _, eff = _roll_d20(self.rng, adv)
+            if self._ev_level >= EVENT_LEVEL_ALL: self.events.append({"type":"saving_throw","target":_pname(target),"ability":ability,"dc":dc,"auto":"crusader_no_fear"})
+            return True
+        m = mask_of(target); ab = ability.upper()
+        if m & FAILS_STR_DEX_SAVES and ab in ("STR", "DEX"):
+            if self._ev_level >= EVENT_LEVEL_ALL: self.events.append({"type":"saving_throw","target":_pname(target),"ability":ability,"dc":dc,"auto":"incapacitated","success":False})
+            return False
+        adv = -1 if m & DEX_SAVE_DISADVANTAGE and ab == "DEX" else 0
+        for h in self.profile(target).hooks.on_save: adv += h(self, target, ability, vs_condition)
+        _, eff = self.dice.d20(max(-1, min(1, adv)))
         total = eff + _mod(getattr(target, ability.upper(), 10))
         if ability.upper() == "INT":
             total += self._crusader_int_aura_bonus(target)
-        self.events.append({"type":"saving_throw","target":_pname(target),"ability":ability,"d20":eff,"total":total,"dc":dc,"success":(total>=dc)})
+        if self._ev_level >= EVENT_LEVEL_ALL: self.events.append({"type":"saving_throw","target":_pname(target),"ability":ability,"d20":eff,"total":total,"dc":dc,"success":(total>=dc)})
         return total >= dc
 
     # ---- Damage, contributions, XP ----
@@ -177,70 +498,132 @@ class TBCombat:
         if hasattr(target, "_dmg_from"): delattr(target, "_dmg_from")
     def _apply_damage(self, target, amount: int, *, dtype: str = "physical", attacker=None) -> int:
         if dtype == "poison" and bool(getattr(target, "poison_immune", False)):
-            self.events.append({"type":"damage_ignored","target":_pname(target),"dtype":"poison","amount":int(amount)}); return 0
+            if self._ev_level: self.events.append({"type":"damage_ignored","target":_pname(target),"dtype":"poison","amount":int(amount)}); return 0
         prev = int(getattr(target, "hp", 0)); new_hp = max(0, prev - int(amount))
         target.hp = new_hp; dealt = max(0, prev - new_hp)
-        if dealt > 0 and attacker is not None: self._record_contribution(target, attacker, dealt)
+        if dealt > 0:
+            self._last_progress_round = self.round; self._world_rev += 1
+            if attacker is not None: self._record_contribution(target, attacker, dealt)
         if prev > 0 and new_hp == 0:
-            setattr(target, "alive", False); self._distribute_xp_for_death(target)
+            setattr(target, "alive", False); self._distribute_xp_for_death(target); self._on_down(target)
         return dealt
 
     # ---- Rolls and damage ----
     def _attack_roll(self, attacker, defender, *, item: Optional[Dict[str, Any]] = None,
                      adv_ctx: int = 0, is_ranged: bool = False, offhand: bool = False) -> Tuple[bool, bool, int]:
-        raw, eff = _roll_d20(self.rng, max(-1, min(1, adv_ctx)))
-        finesse = bool(item.get("finesse")) if item else False
-        ability = "DEX" if (is_ranged or finesse) else (item.get("ability", "STR") if item else "STR")
-        atk_mod = _mod(getattr(attacker, ability, 10))
-        prof = _prof_for_level(getattr(attacker, "level", 1))
-        prof_to_hit = prof
-        if offhand:
-            prof_to_hit = 0
-            if getattr(attacker, "fighter_duelist_offhand_prof", False): prof_to_hit = prof
-            if str(getattr(attacker, "class","")).capitalize() == "Stalker" and int(getattr(attacker, "level", 1)) >= 2: prof_to_hit = prof
-        style_bonus = 0
-        if is_ranged and int(getattr(attacker, "fighter_archery_bonus", 0)) > 0: style_bonus += 2
-        if is_ranged and str(getattr(attacker, "class","")).capitalize() == "Stalker" and int(getattr(attacker, "level", 1)) >= 2: style_bonus += 2
-        if str(getattr(attacker, "class","")).capitalize() == "Stalker" and int(getattr(attacker, "level", 1)) >= 20:
-            style_bonus += _mod(getattr(attacker, "INT", 10))
+        raw, eff = self.dice.d20(max(-1, min(1, adv_ctx)))
+        p = self.profile(attacker)
+        if item:
+            w = self._weapon(attacker, item)
+            atk_mod = p.dex_mod if (is_ranged and not w.is_ranged and not w.finesse) else w.atk_mod
+        else:
+            atk_mod = p.dex_mod if is_ranged else p.str_mod
+        prof_to_hit = p.prof
+        if offhand and not p.offhand_prof: prof_to_hit = 0
+        style_bonus = p.style_bonus(is_ranged)
         total = eff + atk_mod + prof_to_hit + style_bonus
         ac = int(getattr(defender, "ac", getattr(defender, "AC", 10)))
         hit = (total >= ac); crit = (eff == 20)
-        self.events.append({"type": "attack_roll","attacker": _pname(attacker), "defender": _pname(defender),
+        if self._ev_level >= EVENT_LEVEL_ALL: self.events.append({"type": "attack_roll","attacker": _pname(attacker), "defender": _pname(defender),
                             "d20": eff, "ability_mod": atk_mod, "prof_to_hit": prof_to_hit, "style_bonus": style_bonus,
                             "total": total, "ac": ac, "hit": hit, "crit": crit})
         return hit, crit, eff
     def _is_two_handed_in_use(self, attacker, item: Dict[str, Any]) -> bool:
         if not item: return False
-        if item.get("two_handed", False): return True
-        if item.get("versatile", False) and (not self._has_shield_equipped(attacker)) and (self._equipped_off(attacker) is None):
-            return True
-        return False
+        return self._weapon(attacker, item).two_handed_in_use
     def _roll_damage_once(self, attacker, item: Dict[str, Any], *, is_ranged: bool, crit: bool, versatile_two_handed: bool) -> int:
-        dice = str(item.get("dice", "1d6"))
-        two_handed_dice = str(item.get("two_handed_dice", "")) if versatile_two_handed else ""
-        if two_handed_dice: dice = two_handed_dice
-        n, s = map(int, str(dice).lower().split("d"))
-        dmg = sum(self.rng.randint(1, s) for _ in range(n))
-        if crit: dmg += sum(self.rng.randint(1, s) for _ in range(n))
-        finesse = bool(item.get("finesse")); ability = "DEX" if (is_ranged or finesse) else item.get("ability", "STR")
-        dmg += _mod(getattr(attacker, ability, 10))
-        dmg += _prof_for_level(getattr(attacker, "level", 1))
+        w = self._weapon(attacker, item)
+        n, s = w.two_handed_dice if (versatile_two_handed and w.two_handed_dice) else w.dice
+        dmg = self.dice.sum(n, s)
+        if crit: dmg += self.dice.sum(n, s)
+        p = self.profile(attacker)
+        dmg += p.dex_mod if (is_ranged and not w.is_ranged and not w.finesse) else w.atk_mod
+        dmg += p.prof
         return max(0, dmg)
     def _weapon_damage_roll(self, attacker, item: Dict[str, Any], *, is_ranged: bool, crit: bool) -> int:
         versatile_two_handed = self._is_two_handed_in_use(attacker, item)
-        if str(getattr(attacker, "class","")).capitalize() == "Crusader" and int(getattr(attacker, "level", 1)) >= 2 and versatile_two_handed and not is_ranged:
-            d1 = self._roll_damage_once(attacker, item, is_ranged=is_ranged, crit=crit, versatile_two_handed=True)
-            d2 = self._roll_damage_once(attacker, item, is_ranged=is_ranged, crit=crit, versatile_two_handed=True)
-            return max(d1, d2)
+        p = self.profile(attacker)
+        for h in p.hooks.on_damage_roll:  # e.g. Crusader L2 great weapon rerolls
+            r = h(self, attacker, item, p, is_ranged, crit, versatile_two_handed)
+            if r is not None: return r
         return self._roll_damage_once(attacker, item, is_ranged=is_ranged, crit=crit, versatile_two_handed=versatile_two_handed)
 
+    def _weapon_hit(self, attacker, target, prof: CombatProfile, item, is_ranged: bool, crit: bool, *, extra: bool) -> int:
+        """Damage of a weapon hit: the roll, then on_hit features (smite), then the damage event."""
+        dmg = self._weapon_damage_roll(attacker, item, is_ranged=is_ranged, crit=crit)
+        for h in prof.hooks.on_hit: dmg += h(self, attacker, target, prof, is_ranged)
+        dealt = self._apply_damage(target, dmg, dtype="physical", attacker=attacker)
+        if self._ev_level:
+            ev = {"type":"damage","attacker":_pname(attacker),"defender":_pname(target),"amount":int(dealt),"crit":bool(crit)}
+            if extra: ev["extra_attack"] = True
+            self.events.append(ev)
+        return dealt
+
+    # ---- Catalog spells (engine.spellbook) ----
+    def spell_plan(self, caster, name: str) -> Optional[SpellPlan]:
+        """The compiled catalog plan `caster` casts as `name` (class row first), or None for ad-hoc spells."""
+        return load_spellbook().get(name, self.profile(caster).cls)
+
+    def _template_targets(self, caster, shape: str, size: int, center: Tuple[int, int], direction=None) -> List[Any]:
+        """Actors on a cached AOE template (line/cone run from the caster toward `center`), roster order."""
+        shape = normalize_shape(shape); cx, cy = center
+        origin = self._xy(caster) if shape in DIRECTIONAL_SHAPES else (cx, cy)
+        direction = tuple(direction or cardinal_direction(*self._xy(caster), cx, cy))
+        region = template_mask(shape, size, origin, self.width, self.height, direction)
+        return sorted(self.board.actors_in(region), key=lambda a: self._order.get(id(a), 0))
+
+    def _cast_plan(self, caster, plan: SpellPlan, spell: Dict[str, Any], target) -> None:
+        tid = getattr(caster, "team_id", -2)
+        if plan.is_area:
+            center = spell.get("center") or (self._xy(target) if target is not None else None)
+            if center is None: return
+            center = (int(center[0]), int(center[1]))
+            hit = self._template_targets(caster, plan.shape, plan.size, center, spell.get("direction"))
+            if plan.harmful:
+                targets = [t for t in self._apply_aoe_ally_exemptions(caster, hit, center) if getattr(t, "team_id", -1) != tid]
+            else:
+                targets = [t for t in hit if getattr(t, "team_id", -1) == tid]
+        else:
+            if target is None and not plan.harmful: target = caster
+            if target is None: return
+            targets = [target] + [t for t in spell.get("extra_targets", ()) if t is not target][:plan.targets - 1]
+        dice = plan.dice_at(int(getattr(caster, "level", 1) or 1))
+        dc = int(spell.get("dc_override", getattr(caster, "spell_save_dc", 10)))
+        ev_type = "spell_aoe" if plan.is_area else "spell_hit"
+        for t in targets:
+            if not _alive(t): continue
+            if not plan.harmful:  # heals and buffs: restore hp, clear the listed conditions
+                before = int(getattr(t, "hp", 0))
+                if plan.kind == "heal" and dice is not None:
+                    t.hp = min(int(getattr(t, "max_hp", before)), before + max(0, self.dice.roll(dice)))
+                    if t.hp > before: self._last_progress_round = self.round; self._world_rev += 1
+                for c in plan.conditions: self.clear_condition(t, c)
+                if self._ev_level: self.events.append({"type":"spell_buff" if plan.kind == "effect" else "spell_heal","name":plan.name,"caster":_pname(caster),"target":_pname(t),"healed":int(t.hp - before)})
+                continue
+            landed = True; dealt = 0; saved = False
+            if plan.kind == "attack":
+                landed, crit, _ = self._attack_roll(caster, t, item=None, adv_ctx=0, is_ranged=plan.range > 1, offhand=False)
+                if landed and dice is not None:
+                    dealt = self._apply_damage(t, self.dice.roll(dice, crit=crit), dtype=plan.dtype, attacker=caster)
+            elif plan.kind == "save":
+                saved = self._saving_throw(t, plan.save, dc, vs_condition=plan.conditions[0] if plan.conditions else None)
+                landed = not saved
+                if dice is not None:
+                    dmg = self.dice.roll(dice)
+                    if saved: dmg = int(dmg * plan.save_mult)
+                    if dmg > 0: dealt = self._apply_damage(t, dmg, dtype=plan.dtype, attacker=caster)
+            if landed and _alive(t):
+                for c in plan.conditions: self.add_condition(t, c, CONDITION_ROUNDS)
+            if self._ev_level:
+                ev = {"type":ev_type,"name":plan.name,"attacker":_pname(caster),"defender":_pname(t),"dmg":int(dealt)}
+                if plan.kind == "save": ev["saved"] = bool(saved)
+                elif plan.kind == "attack": ev["hit"] = bool(landed)
+                if landed and plan.conditions: ev["conditions"] = list(plan.conditions)
+                self.events.append(ev)
+
     # ---- AOE ally exemptions (Wizard) ----
     def _apply_aoe_ally_exemptions(self, caster, candidates: List[Any], center_xy: Tuple[int,int]) -> List[Any]:
-        L = int(getattr(caster, "level", 1))
-        n_exempt = 1 if L >= 3 else 0
-        if L >= 10: n_exempt = 2
-        if L >= 17: n_exempt = 3
+        n_exempt = aoe_ally_exemptions(getattr(caster, "level", 1))
         allies = [a for a in candidates if getattr(a, "team_id", -1) == getattr(caster, "team_id", -2)]
         allies = sorted(allies, key=lambda a: self._dist_to_xy(a, center_xy))[:n_exempt]
         return [c for c in candidates if c not in allies]
@@ -248,8 +631,8 @@ class TBCombat:
     # ---- Taunt (new) ----
     def _attempt_taunt(self, taunter, target) -> Dict[str, Any]:
         # Contested roll: (d20 + CHA mod + prof) vs (d20 + INT mod (+ Crusader INT aura))
-        (_, aroll), a_mod = _roll_d20(self.rng, 0)
-        (_, droll), d_mod = _roll_d20(self.rng, 0)
+        _, a_mod = self.dice.d20(0)
+        _, d_mod = self.dice.d20(0)
         atk_total = a_mod + _mod(getattr(taunter, "CHA", 10)) + _prof_for_level(getattr(taunter, "level", 1))
         def_total = d_mod + _mod(getattr(target, "INT", 10)) + self._crusader_int_aura_bonus(target)
         success = (atk_total >= def_total)
@@ -266,13 +649,16 @@ class TBCombat:
 
     def take_turn(self) -> None:
         if self.winner is not None: return
-        if self.turn_idx >= len(self.actors): self.turn_idx = 0
-        player = self.actors[self.turn_idx]
-        if not _alive(player):
-            self.turn_idx += 1; return
+        if self._round_started != self.round: self._start_round()
+        player = self.current_actor
+        if player is None: return                       # nobody left to act
+        self._in_turn = True
+        self._moves_left = self.speed(player); self._disengaged = False; self._moved = False
+        if getattr(player, "_dodging", False): player._dodging = False  # Dodge lasts until your next turn
+        for h in self.profile(player).hooks.on_turn_start: h(self, player)
 
         # Forced targeting due to Taunt: mark the preferred target id if active
-        forced_target_id = getattr(player, "_taunted_by", None)
+        forced_target_id = self._forced_target_id = getattr(player, "_taunted_by", None)
         if forced_target_id is not None:
             # will be consumed this turn; decrement duration
             rounds = int(getattr(player, "_taunt_rounds", 0))
@@ -281,52 +667,71 @@ class TBCombat:
             else:
                 player._taunt_rounds = rounds - 1
 
-        # Detection step
-        self.events.extend(self._start_of_turn_detect_hidden(player))
-
         intents: List[Dict[str, Any]] = []
-        ctrl = self.controllers.get(getattr(player, "team_id", 0))
-        if ctrl and hasattr(ctrl, "decide"):
-            try:
-                intents = ctrl.decide(self, player) or []
-            except Exception:
-                intents = []
+        if self.replay is not None:
+            intents = self.replay.intents_for(self, player) or []
+        if not intents:
+            ctrl = self.controllers.get(getattr(player, "team_id", 0))
+            if ctrl and hasattr(ctrl, "decide"):
+                try:
+                    intents = ctrl.decide(self, player) or []
+                except Exception:
+                    intents = []
 
         # If controller didn’t provide, ask tactics router
         if not intents:
             intents = choose_intent(self, player) or [{"type": "wait"}]
+        self._apply_taunt(intents)  # before recording, so the record holds what actually runs
+        if self.recorder is not None:
+            self.recorder.on_turn(self, intents)
+        self.resolve_intents(player, intents)
 
-        # If taunted: rewrite any attack with missing/other target to the taunter when possible
-        if forced_target_id is not None:
-            taunter = next((a for a in self.actors if _pid(a) == forced_target_id and _alive(a)), None)
-            if taunter:
-                for it in intents:
-                    if it.get("type") in ("attack", "cast") and "target" not in it:
-                        it["target"] = taunter
+    def _apply_taunt(self, intents: List[Dict[str, Any]]) -> None:
+        # If taunted: aim any attack/cast that has no target at the taunter (idempotent)
+        forced_target_id = self._forced_target_id
+        if forced_target_id is None: return
+        taunter = next((a for a in self.actors if _pid(a) == forced_target_id and _alive(a)), None)
+        if taunter:
+            for it in intents:
+                if it.get("type") in ("attack", "cast") and "target" not in it:
+                    it["target"] = taunter
+
+    def resolve_intents(self, player, intents: List[Dict[str, Any]]) -> None:
+        """
+        Second half of take_turn: execute `intents` for the actor whose turn is in progress, then
+        close the turn. Lookahead controllers call it on a snapshot to play out a candidate.
+        """
+        forced_target_id = self._forced_target_id
+        self._apply_taunt(intents)
 
-        # Execute intents (subset supported)
+        # Execute intents (subset supported); stop as soon as the match is decided
         for intent in intents:
+            if self.winner is not None or not _alive(player): break
             itype = intent.get("type")
 
+            if itype == "move":
+                to = intent.get("to")
+                if to is not None: self._move_one(player, (int(to[0]), int(to[1])))
+                continue
+            if itype == "dash":
+                self._moves_left += self.speed(player); continue
+            if itype == "disengage":
+                self._disengaged = True; continue
+            if itype == "dodge":
+                player._dodging = True; continue
+
             if itype == "hide":
-                self.events.append(self._attempt_hide(player))
-
-            elif itype == "lay_on_hands" and str(getattr(player, "class","")).capitalize() == "Crusader":
-                target = intent.get("target", player)
-                amount = max(0, int(intent.get("amount", 0)))
-                pool = int(getattr(player, "cru_lay_on_hands_current", 0))
-                if amount <= 0 or pool <= 0:
-                    self.events.append({"type":"loh","player":_pname(player),"target":_pname(target),"healed":0,"reason":"no_pool_or_zero_amount"})
-                else:
-                    heal = min(amount, pool)
-                    target.hp = min(int(getattr(target, "max_hp", getattr(target, "hp", 1))), int(getattr(target, "hp", 0)) + heal)
-                    player.cru_lay_on_hands_current = pool - heal
-                    self.events.append({"type":"loh","player":_pname(player),"target":_pname(target),"healed":int(heal),"pool_left":int(player.cru_lay_on_hands_current)})
+                ev = self._attempt_hide(player)
+                if self._ev_level >= EVENT_LEVEL_ALL: self.events.append(ev)
+
+            elif (action := self.profile(player).hooks.action(itype)) is not None:
+                action(self, player, intent)  # class actions, e.g. Crusader lay on hands
 
             elif itype == "taunt":
                 target = intent.get("target")
                 if target and _alive(target):
-                    self.events.append(self._attempt_taunt(player, target))
+                    ev = self._attempt_taunt(player, target)
+                    if self._ev_level: self.events.append(ev)
 
             elif itype == "attack":
                 target = intent.get("target")
@@ -335,65 +740,65 @@ class TBCombat:
                     t2 = next((a for a in self.actors if _pid(a) == forced_target_id and _alive(a)), None)
                     if t2: target = t2
                 if not target or not _alive(target): continue
-                main = self._equipped_main(player)
-                dice, ability, is_ranged, reach, finesse, versatile, two_handed_dice = self._weapon_profile_from_item(main)
-                hit, crit, _ = self._attack_roll(player, target, item=main, adv_ctx=0, is_ranged=is_ranged, offhand=False)
+                adv = int(intent.get("adv", 0) or 0)  # one-shot (dis)advantage from the role (RoleSpec)
+                if adv: (self.grant_advantage if adv > 0 else self.grant_disadvantage)(player, 1)
+                prof = self.profile(player); main = prof.main.item; is_ranged = prof.main.is_ranged
+                hit, crit, _ = self._attack_roll(player, target, item=main, adv_ctx=self._attack_adv(player, target, is_ranged), is_ranged=is_ranged, offhand=False)
                 if hit:
-                    dmg = self._weapon_damage_roll(player, main or {}, is_ranged=is_ranged, crit=crit)
-                    if not is_ranged and str(getattr(player, "class","")).capitalize() == "Crusader":
-                        chance = float(getattr(player, "cru_smite_chance", 0.0)); nd6 = int(getattr(player, "cru_smite_nd6", 0))
-                        if nd6 > 0 and self.rng.random() < chance:
-                            extra = sum(self.rng.randint(1, 6) for _ in range(nd6))
-                            dmg += extra; self.events.append({"type":"cru_smite","attacker":_pname(player),"defender":_pname(target),"nd6":nd6,"extra":int(extra),"chance":chance})
-                    dealt = self._apply_damage(target, dmg, dtype="physical", attacker=player)
-                    self.events.append({"type":"damage","attacker":_pname(player),"defender":_pname(target),"amount":int(dealt),"crit":bool(crit)})
-                    # Crusader extra attack @5
-                    if str(getattr(player, "class","")).capitalize() == "Crusader" and int(getattr(player, "level", 1)) >= 5 and _alive(target):
+                    self._weapon_hit(player, target, prof, main, is_ranged, crit, extra=False)
+                    # follow-up attacks from class features (Crusader L5 extra attack)
+                    for _ in range(prof.hooks.extra_attacks):
+                        if not _alive(target): break
                         hit2, crit2, _ = self._attack_roll(player, target, item=main, adv_ctx=0, is_ranged=is_ranged, offhand=False)
-                        if hit2:
-                            dmg2 = self._weapon_damage_roll(player, main or {}, is_ranged=is_ranged, crit=crit2)
-                            if not is_ranged:
-                                chance = float(getattr(player, "cru_smite_chance", 0.0)); nd6 = int(getattr(player, "cru_smite_nd6", 0))
-                                if nd6 > 0 and self.rng.random() < chance:
-                                    extra2 = sum(self.rng.randint(1, 6) for _ in range(nd6))
-                                    dmg2 += extra2; self.events.append({"type":"cru_smite","attacker":_pname(player),"defender":_pname(target),"nd6":nd6,"extra":int(extra2),"chance":chance})
-                            dealt2 = self._apply_damage(target, dmg2, dtype="physical", attacker=player)
-                            self.events.append({"type":"damage","attacker":_pname(player),"defender":_pname(target),"amount":int(dealt2),"crit":bool(crit2),"extra_attack":True})
+                        if hit2: self._weapon_hit(player, target, prof, main, is_ranged, crit2, extra=True)
 
             elif itype == "cast":
                 spell = intent.get("spell", {}); target = intent.get("target")
-                name = spell.get("name", "Spell"); level = int(spell.get("level", 0))
+                name = spell.get("name", "Spell"); plan = spell.get("plan") or self.spell_plan(player, name)
+                level = int(spell.get("level", plan.slot if plan is not None else 0))
                 # spend slot if any
                 if level >= 1:
                     slots = getattr(player, "spell_slots_current", None)
                     if slots is not None and len(slots) > level and slots[level] > 0:
                         slots[level] -= 1
-                if spell.get("attack_roll", False) and target:
+                if plan is not None:
+                    self._cast_plan(player, plan, spell, target)
+                elif spell.get("attack_roll", False) and target:
                     hit, crit, _ = self._attack_roll(player, target, item=None, adv_ctx=0, is_ranged=True, offhand=False)
                     if hit and _alive(target):
                         tier = int(getattr(player, "wiz_cantrip_tier", 1))
-                        dmg = self.rng.randint(1, 10) * tier
+                        dmg = self.dice.d(10) * tier
                         dealt = self._apply_damage(target, dmg, dtype=spell.get("dtype", "fire"), attacker=player)
-                        self.events.append({"type":"spell_hit","name":name,"attacker":_pname(player),"defender":_pname(target),"dmg":int(dealt),"tier":tier})
+                        if self._ev_level: self.events.append({"type":"spell_hit","name":name,"attacker":_pname(player),"defender":_pname(target),"dmg":int(dealt),"tier":tier})
                 elif spell.get("center"):
-                    cx, cy = spell["center"]; candidates = [t for t in self.actors if _alive(t)]
+                    cx, cy = spell["center"]
+                    if spell.get("shape"):  # cached template; line/cone run from the caster toward the center
+                        candidates = self._template_targets(player, spell["shape"], int(spell.get("size", 1)), (cx, cy), spell.get("direction"))
+                    elif spell.get("radius") is not None:  # blast: actors on the tiles of the template
+                        hits = self.board.within((cx, cy), int(spell["radius"]))
+                        candidates = sorted(hits, key=lambda a: self._order.get(id(a), 0))
+                    else:
+                        candidates = [t for t in self.actors if _alive(t)]
                     targets = self._apply_aoe_ally_exemptions(player, candidates, (cx, cy))
                     dc = int(spell.get("dc_override", getattr(player, "spell_save_dc", 10)))
                     for t in targets:
                         if getattr(t, "team_id", -1) == getattr(player, "team_id", -2): continue
                         saved = self._saving_throw(t, "DEX", dc, vs_condition=None)
-                        dmg = self.rng.randint(1, 6) * (2 if level >= 3 else 1)
+                        dmg = self.dice.d(6) * (2 if level >= 3 else 1)
                         if saved: dmg //= 2
                         dealt = self._apply_damage(t, dmg, dtype=spell.get("dtype", "fire"), attacker=player)
-                        self.events.append({"type":"spell_aoe","name":name,"attacker":_pname(player),"defender":_pname(t),"dmg":int(dealt),"saved":bool(saved)})
+                        if self._ev_level: self.events.append({"type":"spell_aoe","name":name,"attacker":_pname(player),"defender":_pname(t),"dmg":int(dealt),"saved":bool(saved)})
                 else:
                     if target:
                         dc = int(spell.get("dc_override", getattr(player, "spell_save_dc", 10)))
                         saved = self._saving_throw(target, "INT", dc, vs_condition=spell.get("vs_condition"))
                         if not saved:
                             setattr(target, "_controlled", True)
-                            self.events.append({"type":"spell_control","name":name,"attacker":_pname(player),"defender":_pname(target),"applied":True})
+                            if self._ev_level: self.events.append({"type":"spell_control","name":name,"attacker":_pname(player),"defender":_pname(target),"applied":True})
             else:
                 pass
 
-        self.turn_idx = (self.turn_idx + 1) % len(self.actors)
+        self._in_turn = False; self._forced_target_id = None
+        if self._moved: self._settle_position(player)
+        if self.winner is not None: self._log_end()
+        self._advance_turn()
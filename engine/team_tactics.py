@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field, asdict
 from typing import Any, Dict, Optional, Tuple, List
 
+from engine.world_view import WorldView, world_view
+
 # -----------------------------
 #   Data models (plain knobs)
 # -----------------------------
@@ -40,11 +42,15 @@ class BaseController:
     def decide(self, world, actor) -> List[dict]:
         raise NotImplementedError
 
+    def view(self, world) -> WorldView:
+        """The world's shared per-turn view (living rosters, HP fractions, ranked targets); read-only."""
+        return world_view(world)
+
 
 class TacticsController(BaseController):
     """
     A simple controller that respects RoleSpec knobs.
-    It plans up to `speed` move steps (using world.path_step) and then attacks if in range.
+    It plans up to `speed` move steps (using world.path_towards) and then attacks if in range.
     """
     def __init__(self, tactics: TeamTactics):
         self.tactics = tactics
@@ -67,13 +73,16 @@ class TacticsController(BaseController):
         return (d, hp, -ovr)
 
     def _select_target(self, world, actor, spec: RoleSpec):
-        best = None; best_score = (10**9, 10**9, 10**9)
-        for e in world.fighters:
-            if getattr(e, "alive", True) and getattr(e, "hp", 1) > 0 and getattr(e, "team_id", getattr(e, "tid", None)) != getattr(actor, "team_id", getattr(actor, "tid", None)):
-                score = self._score_target(world, actor, e, spec)
-                if score < best_score:
-                    best = e; best_score = score
-        return best
+        # rank by the role's focus, then let the match's opposition instructions re-rank (WorldView.oi_pick)
+        view = self.view(world)
+        enemies = view.enemies(getattr(actor, "team_id", getattr(actor, "tid", None)))
+        return view.oi_pick(actor, sorted(enemies, key=lambda e: self._score_target(world, actor, e, spec)))
+
+    @staticmethod
+    def _attack_intent(spec: RoleSpec, enemy) -> dict:
+        # the role's one-shot (dis)advantage rides on the intent, so a replay of the intents applies it too
+        adv = int(bool(getattr(spec, "attack_advantage", False))) - int(bool(getattr(spec, "attack_disadvantage", False)))
+        return {"type": "attack", "target": enemy, "adv": adv} if adv else {"type": "attack", "target": enemy}
 
     def _enforce_anchor(self, world, actor, spec: RoleSpec) -> Optional[Tuple[int, int]]:
         if not spec.anchor:
@@ -124,31 +133,22 @@ class TacticsController(BaseController):
 
         # If already in desired range, consider hide then attack
         if world.distance(actor, enemy) <= desired:
-            if getattr(spec, "attack_advantage", False):
-                world.grant_advantage(actor, 1)
-            if getattr(spec, "attack_disadvantage", False):
-                world.grant_disadvantage(actor, 1)
             if int(desired) >= 2:
                 intents.append({"type": "hide"})
-            intents.append({"type": "attack", "target": enemy})
+            intents.append(self._attack_intent(spec, enemy))
             return intents
 
-        for _ in range(speed):
-            if world.distance(actor, enemy) <= desired:
-                break
-            step = world.path_step(actor, enemy, avoid_oa=spec.avoid_oa)
-            if step is None:
-                break
-            intents.append({"type": "move", "to": step})
+        # Plan the whole move on the world's cached distance field (dash doubles the budget)
+        budget = speed * (2 if any(it["type"] == "dash" for it in intents) else 1)
+        path = world.path_towards(actor, enemy, max_steps=budget, stop_within=desired, avoid_oa=spec.avoid_oa)
+        intents.extend({"type": "move", "to": step} for step in path)
+        end = path[-1] if path else (getattr(actor, "tx", 0), getattr(actor, "ty", 0))
+        in_range = world.distance_xy(enemy, end) <= desired
 
-        if world.distance(actor, enemy) <= desired and int(desired) >= 2:
+        if in_range and int(desired) >= 2:
             intents.append({"type": "hide"})
-        if world.distance(actor, enemy) <= desired:
-            if getattr(spec, "attack_advantage", False):
-                world.grant_advantage(actor, 1)
-            if getattr(spec, "attack_disadvantage", False):
-                world.grant_disadvantage(actor, 1)
-            intents.append({"type": "attack", "target": enemy})
+        if in_range:
+            intents.append(self._attack_intent(spec, enemy))
 
         if not intents:
             intents.append({"type": "end"})
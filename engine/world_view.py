@@ -0,0 +1,145 @@
+# engine/world_view.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from engine.ai.weights import OI_RANK_STEP
+
+# Read-only snapshot of "who is where and how hurt" for routers and controllers.
+# TBCombat.view() builds one lazily and reuses it until the turn changes or the combat marks itself
+# dirty (damage, healing, a death, a move, a hide/detection); `world_view(env)` also builds one for
+# plain envs (tests, tools) that have no view() of their own.
+#
+# Lists are in roster order and hold living actors only. Target rankings that do not depend on the
+# asking actor (lowest_hp, highest_dps, highest_ovr) are sorted once per team and cached; "closest"
+# is per actor and computed on demand. Treat everything here as read-only.
+# A match's opposition instructions (TBCombat.oi_bias) re-rank the candidates a rule produced
+# (oi_pick): rank i scores -OI_RANK_STEP * i before the bias, so a bias of one priority step
+# outweighs one rank place.
+
+def _alive(p) -> bool: return bool(getattr(p, "alive", True)) and int(getattr(p, "hp", 1)) > 0
+def _mod(v) -> int: return (int(v) - 10) // 2
+def _tid(p) -> Any: return getattr(p, "team_id", -1)
+
+def hp_fraction(p) -> float: return int(getattr(p, "hp", 1)) / max(1, int(getattr(p, "max_hp", 1)))
+
+def _dps_key(p) -> int:
+    # cheap proxy: OVR + best of STR/DEX/INT mods (lower key = more dangerous)
+    strm = _mod(getattr(p, "STR", getattr(p, "str", 10)))
+    dexm = _mod(getattr(p, "DEX", getattr(p, "dex", 10)))
+    intm = _mod(getattr(p, "INT", getattr(p, "int", 10)))
+    return -(int(getattr(p, "OVR", 50)) + max(strm, dexm, intm) * 3)
+
+# rule -> sort key over enemies (ascending; sorted() is stable, so ties keep roster order)
+RANK_KEYS: Dict[str, Callable[[Any], Any]] = {
+    "lowest_hp": hp_fraction,
+    "highest_dps": _dps_key,
+    "highest_ovr": lambda p: -int(getattr(p, "OVR", 50)),
+}
+
+
+class WorldView:
+    __slots__ = ("key", "actors", "teams", "_by_team", "_enemies", "_hp", "_ranked", "_tactics",
+                 "_hidden", "_threatened", "_env")
+
+    def __init__(self, env, key: Any = None):
+        self.key = key; self._env = env
+        self.actors: Tuple[Any, ...] = tuple(a for a in env.actors if _alive(a))
+        by_team: Dict[Any, List[Any]] = {}
+        for a in self.actors: by_team.setdefault(_tid(a), []).append(a)
+        self._by_team = {t: tuple(v) for t, v in by_team.items()}
+        self.teams: Tuple[Any, ...] = tuple(self._by_team)
+        self._enemies: Dict[Any, Tuple[Any, ...]] = {}
+        self._hp: Dict[int, float] = {id(a): hp_fraction(a) for a in self.actors}
+        self._ranked: Dict[Tuple[Any, str], Tuple[Any, ...]] = {}
+        self._tactics: Dict[Any, Dict[str, Any]] = {}
+        self._hidden: Optional[FrozenSet[int]] = None
+        self._threatened: Optional[FrozenSet[int]] = None
+
+    # ---- rosters ----
+    def allies(self, team_id) -> Tuple[Any, ...]:
+        """Living members of `team_id` (the asking actor included)."""
+        return self._by_team.get(team_id, ())
+    def enemies(self, team_id) -> Tuple[Any, ...]:
+        out = self._enemies.get(team_id)
+        if out is None:
+            out = self._enemies[team_id] = tuple(a for a in self.actors if _tid(a) != team_id)
+        return out
+    def hp_frac(self, a) -> float:
+        v = self._hp.get(id(a)); return hp_fraction(a) if v is None else v
+
+    # ---- targeting ----
+    def ranked(self, team_id, rule: str) -> Tuple[Any, ...]:
+        """Enemies of `team_id` best-first under an actor-independent priority rule."""
+        k = (team_id, rule); out = self._ranked.get(k)
+        if out is None:
+            key = RANK_KEYS[rule]
+            if rule == "lowest_hp": key = lambda p: self.hp_frac(p)
+            out = self._ranked[k] = tuple(sorted(self.enemies(team_id), key=key))
+        return out
+    def pick_target(self, me, priority: List[str]) -> Optional[Any]:
+        """
+        Enemy chosen by the first applicable `priority` rule (roster order if none applies),
+        re-ranked by the match's opposition instructions (oi_pick).
+        """
+        tid = _tid(me); enemies = self.enemies(tid)
+        if not enemies: return None
+        biased = self._oi_bias() is not None
+        order: Sequence[Any] = enemies
+        for rule in priority:
+            if rule == "closest":
+                mx = getattr(me, "tx", 0); my = getattr(me, "ty", 0)
+                def dist(e, mx=mx, my=my): return abs(mx - getattr(e, "tx", 0)) + abs(my - getattr(e, "ty", 0))
+                if not biased: return min(enemies, key=dist)
+                order = sorted(enemies, key=dist); break
+            if rule in RANK_KEYS: order = self.ranked(tid, rule); break
+        return self.oi_pick(me, order) if biased else order[0]
+
+    def _oi_bias(self) -> Optional[Callable[[Any, Any, float], float]]:
+        env = self._env
+        return getattr(env, "oi_bias", None) if getattr(env, "oi", None) else None
+    def oi_pick(self, me, order: Sequence[Any]) -> Optional[Any]:
+        """
+        Best of `order` (candidates best-first) under the match's opposition instructions:
+        candidate i scores oi_bias(me, e, -OI_RANK_STEP * i), highest wins, ties keep `order`.
+        """
+        if not order: return None
+        bias = self._oi_bias()
+        if bias is None: return order[0]
+        best = order[0]; best_score = bias(me, best, 0.0)
+        for i in range(1, len(order)):
+            score = bias(me, order[i], -OI_RANK_STEP * i)
+            if score > best_score: best = order[i]; best_score = score
+        return best
+
+    # ---- team settings ----
+    def tactics(self, team_id) -> Dict[str, Any]:
+        """DEFAULT_TEAM_TACTICS merged with the team's overrides, resolved once per view."""
+        out = self._tactics.get(team_id)
+        if out is None:
+            from core.tactics import DEFAULT_TEAM_TACTICS  # late import: core.tactics builds views
+            t = getattr(self._env, "team_tactics", None) or {}
+            out = dict(DEFAULT_TEAM_TACTICS)
+            try: out.update(t.get(int(team_id), {}))
+            except (TypeError, ValueError): pass
+            self._tactics[team_id] = out
+        return out
+
+    # ---- status sets (ids of living actors) ----
+    @property
+    def hidden(self) -> FrozenSet[int]:
+        if self._hidden is None:
+            self._hidden = frozenset(id(a) for a in self.actors if getattr(a, "hidden", False))
+        return self._hidden
+    @property
+    def threatened(self) -> FrozenSet[int]:
+        """Actors standing in an enemy's melee reach (needs an env with _threatened_in_melee)."""
+        if self._threatened is None:
+            probe = getattr(self._env, "_threatened_in_melee", None)
+            self._threatened = frozenset(id(a) for a in self.actors if probe is not None and probe(a))
+        return self._threatened
+
+
+def world_view(env) -> WorldView:
+    """The env's cached view when it has one (TBCombat.view), else a fresh one."""
+    view = getattr(env, "view", None)
+    if callable(view): return view()
+    return WorldView(env)
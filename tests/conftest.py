@@ -10,3 +10,30 @@ if ROOT not in sys.path:
 # import importlib, types
 # m = importlib.import_module("engine")
 # print("Using engine from:", getattr(m, "__file__", "<namespace>"))
+
+
+# ---------------- Shared fighter factory ----------------
+# Engine tests build fighters as the UI passes them: plain dicts with attribute access.
+#   from conftest import fighter
+#   P = functools.partial(fighter, STR=16, hp=14, max_hp=14)   # per-file defaults; keywords still override
+
+class Obj(dict):
+    __getattr__ = dict.get
+    __setattr__ = dict.__setitem__
+    __delattr__ = dict.__delitem__
+
+SWORD = {"id": "w_0", "name": "Longsword", "dice": "1d8", "ability": "STR"}
+
+def fighter(name, team_id, x=None, y=0, *, cls="Defender", level=1, weapon=SWORD, **stats):
+    """
+    An Obj fighter: 10 in every stat, 10 hp, AC 10, `weapon` in the main hand (None: no inventory).
+    `x`/`y` set the tile (tx, ty) when given; **stats override any field, including "class".
+    """
+    f = Obj({"name": name, "class": cls, "level": level, "team_id": team_id,
+             "STR": 10, "DEX": 10, "CON": 10, "INT": 10, "CHA": 10, "hp": 10, "max_hp": 10, "ac": 10, "alive": True})
+    if x is not None:
+        f["tx"], f["ty"] = x, y
+    if weapon is not None:
+        f["inventory"] = {"weapons": [dict(weapon)]}; f["equipped"] = {"main_hand_id": weapon.get("id", "w_0")}
+    f.update(stats)
+    return f
@@ -0,0 +1,44 @@
+from functools import partial
+import itertools
+import random
+
+from core.tactics import choose_intent
+from engine.spells import aoe_template, best_aoe_placement, line_aoe_cells, template_cells
+from conftest import Obj, fighter
+
+P = partial(fighter, cls="Wizard", weapon=None)
+
+def test_templates_and_line_cells():
+    assert line_aoe_cells(2, 2, 5, 3, 3, 10, 10) == [(3, 2), (4, 2), (5, 2)]
+    assert line_aoe_cells(1, 1, 1, 0, 5, 10, 10) == [(1, 0)]          # stops at the grid edge
+    assert aoe_template("line", 3, (0, -1)) == ((0, -1), (0, -2), (0, -3))
+    assert set(aoe_template("cone", 3, (1, 0))) == {(1, 0), (2, -1), (2, 0), (2, 1), (3, -1), (3, 0), (3, 1)}
+    assert len(aoe_template("blast", 1)) == 9 and len(aoe_template("circle", 2)) == 13
+    assert aoe_template("square", 2) is aoe_template("blast", 2)       # cached per normalized key
+    assert len(template_cells("blast", 1, (0, 0), 8, 8)) == 4
+
+def _brute_score(shape, size, c, enemies, allies, W, H):
+    tiles = set(template_cells(shape, size, c, W, H))
+    e = sum(p in tiles for p in enemies); a = sum(p in tiles for p in allies)
+    return e - max(0, a - 1)
+
+def test_blast_placement_matches_brute_force():
+    rng = random.Random(3); W = H = 10
+    for _ in range(30):
+        cells = rng.sample([(x, y) for x in range(W) for y in range(H)], 9)
+        enemies, allies = cells[:6], cells[6:]
+        for shape, size in (("blast", 1), ("circle", 2)):
+            best = best_aoe_placement(enemies, allies, shape, size, W, H, exempt_allies=1)
+            brute = max(_brute_score(shape, size, c, enemies, allies, W, H) for c in itertools.product(range(W), range(H)))
+            assert best.score == brute == _brute_score(shape, size, best.origin, enemies, allies, W, H)
+
+def test_bombarder_uses_best_spot_and_honours_min_hits():
+    me = P("wiz", 0, 0, 0, role="DPS", archetype="Bombarder", level=5, ovr=50)
+    lone = P("lone", 1, 1, 1); pair = [P("e1", 1, 7, 7), P("e2", 1, 8, 8)]
+    env = Obj({"actors": [me, lone] + pair, "width": 12, "height": 12, "team_tactics": {}})
+    it = choose_intent(env, me)[0]
+    assert it["type"] == "cast" and it["spell"]["shape"] == "blast"
+    cx, cy = it["spell"]["center"]
+    assert all(abs(e.tx - cx) <= 1 and abs(e.ty - cy) <= 1 for e in pair)
+    env.team_tactics = {0: {"bombarder_min_enemies_hit": 3}}
+    assert choose_intent(env, me)[0]["type"] == "attack"
@@ -0,0 +1,31 @@
+import json
+
+from tools.batch_balance import Cell, StopRule, Tally, play_batch, sweep, sweep_cells
+
+def test_cells_batches_and_stop_rule():
+    cells = sweep_cells(["Berserker", "Archer"], 1, [1, 3])
+    assert [c.key for c in cells[:3]] == ["Archer|Archer|L1", "Archer|Berserker|L1", "Berserker|Berserker|L1"] and len(cells) == 6
+    assert len(sweep_cells(["Berserker", "Archer", "Wizard"], 2, [1], vs=["Defender", "Defender"])) == 6
+    c = cells[1]
+    assert c.seed == Cell(("Archer",), ("Berserker",), 1).seed != cells[0].seed
+    a = play_batch(c, 0, 6); assert a == play_batch(c, 0, 6) and a["n"] == 6 and a["home_wins"] + a["away_wins"] <= 6
+    rule = StopRule(ci=0.1, min_seeds=40, max_seeds=100, batch=20)
+    assert rule.verdict(Tally(n=20, home_wins=20)) is None
+    assert rule.verdict(Tally(n=40, home_wins=40)) == "ci" and rule.verdict(Tally(n=100, home_wins=50)) == "max"
+    assert rule.verdict(Tally(n=60, home_wins=30)) is None
+
+def test_sweep_streams_rows_and_resumes(tmp_path):
+    cells = sweep_cells(["Berserker", "Archer"], 1, [1])
+    rule = StopRule(ci=0.01, min_seeds=10, max_seeds=20, batch=10)
+    full = tmp_path / "full.jsonl"
+    assert sweep(cells, full, rule=rule, log=lambda *_: None) == 3
+    rows = [json.loads(l) for l in full.read_text().splitlines()]
+    assert [r["seeds"] for r in rows] == [20, 20, 20] and all(r["stopped"] == "max" for r in rows)
+    assert not (tmp_path / "full.jsonl.ckpt.json").exists()
+    # an interrupted run: the first cell written, the second half-played in the checkpoint
+    part = tmp_path / "part.jsonl"
+    part.write_text(json.dumps(rows[0]) + "\n")
+    half = Tally(); half.add(play_batch(cells[1], 0, 10))
+    (tmp_path / "part.jsonl.ckpt.json").write_text(json.dumps({"cells": {cells[1].key: vars(half)}}))
+    assert sweep(cells, part, rule=rule, log=lambda *_: None) == 2
+    assert [json.loads(l) for l in part.read_text().splitlines()] == rows
@@ -0,0 +1,31 @@
+from functools import partial
+
+from engine.bitboard import Occupancy, ball, iter_bits
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, weapon=None)
+
+def test_ball_masks_match_manhattan_and_occupancy_queries():
+    m = ball(16, 16, 3, 4, 2)
+    cells = {(i % 16, i // 16) for i in iter_bits(m)}
+    assert cells == {(x, y) for x in range(16) for y in range(16) if abs(x - 3) + abs(y - 4) <= 2}
+    a, b, c = P("a", 0, 3, 3), P("b", 1, 5, 4), P("c", 1, 9, 9)
+    occ = Occupancy(16, 16, [a, b, c])
+    assert [x["name"] for x in occ.within((3, 4), 2)] == ["a", "b"]
+    assert [x["name"] for x in occ.within((3, 4), 2, exclude_team=0)] == ["b"]
+    occ.remove(b); b.tx = 9; b.ty = 8; occ.add(b)
+    assert occ.within((3, 4), 2, team=1) == [] and len(occ.within((9, 9), 1, team=1)) == 2
+
+def test_crusader_aura_lookup_follows_moves_and_deaths():
+    cru = P("cru", 0, 2, 2, **{"class": "Crusader", "cru_aura_radius": 2, "cru_aura_int_bonus": 3})
+    ally = P("ally", 0, 3, 3); foe = P("foe", 1, 6, 6)
+    c = TBCombat(None, None, [cru, ally, foe], width=8, height=8, seed=1)
+    assert c._crusader_int_aura_bonus(ally) == 3
+    c._moves_left = 5; c._disengaged = True
+    c._move_one(ally, (3, 4))
+    assert c._crusader_int_aura_bonus(ally) == 0
+    c._move_one(ally, (3, 3))
+    assert c._crusader_int_aura_bonus(ally) == 3
+    c._apply_damage(cru, 99, attacker=foe)
+    assert c._crusader_int_aura_bonus(ally) == 0
@@ -0,0 +1,39 @@
+from functools import partial
+
+from engine import class_features as cf
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, STR=14, hp=999, max_hp=999, ac=1)
+
+def test_hooks_resolve_once_per_class_and_level():
+    assert cf.resolve("Crusader", 1) is cf.resolve("crusader", 1)
+    assert cf.resolve("Crusader", 4).extra_attacks == 0 and cf.resolve("Crusader", 5).extra_attacks == 1
+    assert len(cf.resolve("Crusader", 1).on_damage_roll) == 0 and len(cf.resolve("Crusader", 2).on_damage_roll) == 1
+    assert cf.resolve("Defender", 20) is cf.NO_HOOKS
+
+def test_a_new_class_plugs_in_without_engine_branches():
+    @cf.register("Berserker", "on_hit", level=3)
+    def _rage(cmb, attacker, target, p, is_ranged):
+        return 0 if is_ranged else 100
+    cf.register_extra_attack("Berserker", level=3)
+    try:
+        b = P("B", 0, 0, cls="Berserker", level=3); d = P("D", 1, 1)
+        c = TBCombat(None, None, [b, d], 6, 6, seed=1, initiative=False)
+        assert c.profile(b).hooks.extra_attacks == 1
+        c.resolve_intents(b, [{"type": "attack", "target": d}])
+        hits = [e for e in c.events if e["type"] == "damage"]
+        assert len(hits) == 2 and hits[1].get("extra_attack") and all(e["amount"] > 100 for e in hits)
+    finally:
+        del cf._REGISTRY["Berserker"]; cf._resolve.cache_clear()
+
+def test_stalker_and_crusader_features_are_hooks():
+    assert cf.resolve("Stalker", 1) is cf.NO_HOOKS
+    assert len(cf.resolve("Stalker", 10).on_hide) == 1 and len(cf.resolve("Stalker", 20).on_attack_roll) == 2
+    assert cf.resolve("Crusader", 1).action("lay_on_hands") is not None and cf.resolve("Defender", 20).action("lay_on_hands") is None
+    cru, hurt, dfd = P("C", 0, 0, cls="Crusader", cru_lay_on_hands_current=5), P("H", 0, 1, hp=1), P("D", 0, 2, cls="Defender", cru_lay_on_hands_current=5)
+    c = TBCombat(None, None, [cru, hurt, dfd, P("E", 1, 5)], 8, 8, seed=1, initiative=False)
+    c.resolve_intents(dfd, [{"type": "lay_on_hands", "target": hurt, "amount": 3}])
+    assert hurt.hp == 1 and not [e for e in c.events if e["type"] == "loh"]
+    c.resolve_intents(cru, [{"type": "lay_on_hands", "target": hurt, "amount": 3}])
+    assert hurt.hp == 4 and cru.cru_lay_on_hands_current == 2
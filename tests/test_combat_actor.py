@@ -0,0 +1,42 @@
+import pytest
+
+from core.xp import grant_xp
+from engine.events import NullSink
+from engine.model import CombatActor, actor_from_dict, actor_to_dict
+from engine.tbcombat import TBCombat
+
+SWORD = {"id": "w_0", "name": "Longsword", "dice": "1d8", "ability": "STR"}
+
+def fighter(name, team_id, x):
+    return {"name": name, "id": name, "cls": "Defender", "level": 1, "team_id": team_id, "tx": x, "ty": 0,
+            "STR": 14, "DEX": 10, "CON": 10, "INT": 10, "WIS": 10, "CHA": 10, "hp": 12, "ac": 10,
+            "inventory": {"weapons": [dict(SWORD)]}, "equipped": {"main_hand_id": "w_0"}, "portrait": "p.png"}
+
+def test_attribute_and_mapping_access_agree():
+    a = actor_from_dict(fighter("A", 0, 0))
+    assert a.pid == a["pid"] == "A" and getattr(a, "class") == "Defender" and a.max_hp == 12 and a.alive
+    assert "portrait" not in a and a.get("portrait") is None and a.get("kills", 0) == 0 and "kills" not in a
+    assert not hasattr(a, "hidden") and getattr(a, "hidden", False) is False
+    a["kills"] = 2; a.kills += 1
+    assert a["kills"] == 3 and a.pop("kills") == 3 and a.get("kills") is None
+    grant_xp(a, 400)
+    assert a.xp_total == a["xp_total"] == 400 and a["level_pending"] == 1
+    with pytest.raises(KeyError): a["nope"]
+    with pytest.raises(AttributeError): a["portrait"] = "q.png"   # no per-instance dict
+    d = actor_to_dict(a)
+    assert "portrait" not in d and d["xp_total"] == 400 and list(d)[:2] == ["pid", "id"]
+    assert not hasattr(a, "__dict__") and not hasattr(CombatActor(hp=3), "__weakref__")
+    b = actor_from_dict({"name": "B", "cls": "Wizard", "AC": 13, "ovr": 61, "dex": 16, "hp": 7})
+    assert (getattr(b, "class"), b.ac, b.OVR, b.DEX, b.max_hp) == ("Wizard", 13, 61, 16, 7)
+
+def test_match_with_combat_actors_and_snapshots():
+    src = [fighter("A", 0, 0), fighter("B", 1, 1)]
+    actors = [actor_from_dict(d) for d in src]
+    c = TBCombat(None, None, actors, 6, 6, seed=2, events=NullSink(), initiative=False)
+    snap = c.snapshot()
+    while c.winner is None and c.turn_no < 200: c.take_turn()
+    assert c.winner in (0, 1) and src[0]["hp"] == src[1]["hp"] == 12     # the career dicts were not touched
+    winner = actors[c.winner]
+    assert winner["xp_total"] == 50 and winner.kills == 1
+    c.restore(snap)
+    assert [a.hp for a in actors] == [12, 12] and "xp_total" not in winner and c.winner is None
@@ -0,0 +1,35 @@
+import dataclasses
+import pytest
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+def P(cls, lvl=1, weapons=(), main=None, off=None, **stats):
+    ws = [dict(w, id=f"w_{i}") for i, w in enumerate(weapons)]
+    return fighter(f"{cls}{lvl}", 0, cls=cls, level=lvl, weapon=None,
+                   inventory={"weapons": ws}, equipped={"main_hand_id": main, "off_hand_id": off}, **stats)
+
+BOW = {"name": "Longbow", "dice": "1d8", "ability": "DEX", "ranged": True, "range": (8, 16)}
+SWORD = {"name": "Longsword", "dice": "1d8", "ability": "STR", "versatile": True, "two_handed_dice": "1d10"}
+
+def test_profile_resolves_weapons_and_class_flags():
+    s = P("stalker", lvl=20, weapons=[BOW], main="w_0", DEX=16, INT=14)
+    c = TBCombat(None, None, [s], width=8, height=8, seed=1)
+    p = c.profile(s)
+    assert p.cls == "Stalker" and p.stalker_l2 and p.stalker_l18 and p.stalker_l20
+    assert p.main.dice == (1, 8) and p.main.is_ranged and p.main.atk_mod == 3
+    assert p.style_bonus(True) == 4 and p.style_bonus(False) == 2 and p.prof == 6
+    assert c.ranged_limits(s, p.main.item) == (10**9, 10**9)
+    assert c.profile(s) is p
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        p.level = 3
+
+def test_invalidate_profile_picks_up_equipment_changes():
+    cru = P("Crusader", lvl=5, weapons=[SWORD, dict(SWORD, name="Spear", reach=2)], main="w_0", STR=16)
+    c = TBCombat(None, None, [cru], width=8, height=8, seed=1)
+    p = c.profile(cru)
+    assert p.crusader_l2 and p.crusader_l5 and p.reach == 1
+    assert p.main.two_handed_in_use and p.main.two_handed_dice == (1, 10)
+    cru["equipped"]["main_hand_id"] = "w_1"
+    assert c.reach(cru) == 1  # cached until invalidated
+    c.invalidate_profile(cru)
+    assert c.reach(cru) == 2
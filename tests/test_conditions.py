@@ -0,0 +1,34 @@
+from functools import partial
+
+from engine import conditions as C
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, weapon=None, hp=30, max_hp=30)
+
+def test_clock_expires_only_what_is_due():
+    actors = [P("A", 0, 0), P("B", 1, 1)]; a, b = actors
+    clock = C.ConditionClock(actors)
+    clock.add(a, "prone", 1, now=1); clock.add(b, "stunned", 3, now=1); clock.add(b, "blinded", 1, now=1)
+    assert C.mask_of(b) == C.STUNNED | C.BLINDED and C.names(C.mask_of(b)) == ["stunned", "blinded"]
+    clock.add(a, "prone", 4, now=1)                     # refreshed: the old expiry is skipped when popped
+    clock.clear(b, "blinded")
+    assert clock.expire(2) == [] and C.has_condition(a, "prone") and not C.has_condition(b, "blinded")
+    assert clock.expire(4) == [(b, "stunned")] and clock.remaining(a, "prone", 4) == 1
+    state = clock.get_state()
+    assert clock.expire(5) == [(a, "prone")] and len(clock) == 0
+    clock.set_state(state); a._cond_mask = C.PRONE
+    assert clock.expire(9) == [(a, "prone")]
+
+def test_attack_and_save_rules_read_the_mask():
+    a = P("A", 0, 0); b = P("B", 1, 1)
+    c = TBCombat(None, None, [a, b], 6, 6, seed=1, initiative=False)
+    assert c._attack_adv(a, b) == 0
+    c.add_condition(b, "restrained", 2)
+    assert c._attack_adv(a, b) == 1 and c._attack_adv(b, a) == -1
+    c.add_condition(b, "prone", 2)
+    assert c._attack_adv(a, b, is_ranged=True) == 0     # restrained (+) and prone vs ranged (-) cancel
+    c.add_condition(b, "paralyzed", 1)
+    assert not c._saving_throw(b, "DEX", 1) and c.events[-1]["auto"] == "incapacitated"
+    snap = c.snapshot(); c.clear_condition(b, "paralyzed"); c.restore(snap)
+    assert c.has_condition(b, "paralyzed") and c.conditions.remaining(b, "paralyzed", c.round) == 1
@@ -0,0 +1,36 @@
+from functools import partial
+
+from engine.tbcombat import TBCombat
+from engine.events import EVENT_LEVEL_OUTCOME, CallbackSink, ListSink, NullSink, RingSink
+from conftest import fighter
+
+P = partial(fighter, STR=16, hp=12, max_hp=12)
+
+def _run(sink=None, seed=5):
+    c = TBCombat(None, None, [P("A", 0), P("B", 1)], width=8, height=8, seed=seed, events=sink)
+    while c.winner is None:
+        c.take_turn()
+    return c
+
+def test_default_sink_is_a_full_list():
+    c = _run()
+    assert isinstance(c.events, ListSink) and isinstance(c.events, list)
+    assert any(e["type"] == "attack_roll" for e in c.events)
+    assert c.events[-1]["type"] == "end"
+
+def test_sinks_do_not_change_the_outcome():
+    full = _run()
+    outcome = _run(ListSink(level=EVENT_LEVEL_OUTCOME))
+    null = _run(NullSink())
+    assert full.winner == outcome.winner == null.winner and full.round == null.round
+    assert len(null.events) == 0
+    assert [e for e in full.events if e["type"] in ("damage", "down", "end")] == list(outcome.events)
+
+def test_ring_and_callback_sinks():
+    full = _run()
+    ring = _run(RingSink(4))
+    assert len(ring.events) == 4 and ring.events.total == len(full.events)
+    assert ring.events[-4:] == full.events[-4:]
+    seen = []
+    _run(CallbackSink(seen.append, level=EVENT_LEVEL_OUTCOME))
+    assert seen and seen[-1]["type"] == "end"
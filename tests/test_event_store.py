@@ -0,0 +1,49 @@
+from functools import partial
+
+from core.adapters import as_event_dict
+from engine.tbcombat import TBCombat
+from engine.event_store import ColumnarEventStore
+from conftest import fighter
+
+P = partial(fighter, STR=16, hp=14, max_hp=14, ac=11)
+
+def _run(sink=None, seed=9):
+    c = TBCombat(None, None, [P("A", 0), P("B", 1), P("C", 0), P("D", 1)], width=8, height=8, seed=seed, events=sink)
+    while c.winner is None:
+        c.take_turn()
+    return c
+
+def test_columnar_store_materializes_the_same_events():
+    full = _run()
+    store = _run(ColumnarEventStore()).events
+    assert len(store) == len(full.events) and not store.other
+    assert list(store) == list(full.events)
+    assert store[-1] == full.events[-1] and store[-3:] == full.events[-3:]
+    assert as_event_dict(store[-1]) == {"type": "end", "winner": full.winner, "round": full.events[-1]["round"]}
+
+def test_columnar_aggregation_and_binary_roundtrip():
+    store = _run(ColumnarEventStore()).events
+    dmg = store.total_damage_by_actor()
+    assert dmg and all(v >= 0 for v in dmg.values())
+    assert sum(dmg.values()) == sum(e["amount"] for e in store if e["type"] == "damage")
+    assert 0.0 <= store.crit_rate() <= 1.0
+    store.append({"type": "custom", "note": "kept verbatim"})
+    back = ColumnarEventStore.loads(store.dumps())
+    assert list(back) == list(store) and back.count("attack_roll") == store.count("attack_roll")
+
+def test_known_events_keep_keys_outside_their_spec():
+    store = ColumnarEventStore()
+    ev = {"type": "damage", "attacker": "A", "defender": "B", "amount": 4, "crit": False, "dtype": "fire"}
+    store.append(ev)
+    assert store[0] == ev and not store.other and store.total_damage_by_actor() == {"A": 4}
+    assert list(ColumnarEventStore.loads(store.dumps())) == [ev]
+
+def test_catalog_casts_count_towards_damage():
+    store = ColumnarEventStore()
+    wiz = P("W", 0, 0, 0, cls="Wizard", level=5, spell_save_dc=30); a = P("A", 1, 4, 2, hp=200, max_hp=200)
+    c = TBCombat(None, None, [wiz, a, P("B", 1, 5, 3, hp=200, max_hp=200)], 8, 8, seed=3, initiative=False, events=store)
+    c.resolve_intents(wiz, [{"type": "cast", "spell": {"name": "Fireball", "center": (4, 3)}}])
+    c.resolve_intents(wiz, [{"type": "cast", "spell": {"name": "Frost Bolt"}, "target": a}])
+    spells = [e for e in store if e["type"] in ("spell_aoe", "spell_hit")]
+    assert len(spells) == 3 and not store.other and "saved" in spells[0] and "hit" in spells[2]
+    assert store.total_damage_by_actor() == {"W": sum(e["dmg"] for e in spells)} and spells[0]["dmg"] > 0
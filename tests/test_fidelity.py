@@ -0,0 +1,36 @@
+import core.sim
+from core.career import Career
+from core.sim import FIDELITY_FULL, FIDELITY_REDUCED, FIDELITY_SURROGATE, drift_report, play_fixture, rivals, week_jobs
+from core.surrogate import FixtureFeatures, fit_surrogate
+from engine.analytic import resolve_analytic
+from conftest import fighter
+
+def P(name, team_id, hp, **stats):
+    return fighter(name, team_id, cls="Berserker", level=3, weapon=None, **{"STR": 16, "DEX": 12, "CON": 14, "hp": hp, "max_hp": hp, "ac": 12, **stats})
+
+def test_analytic_tier_and_fidelity_choice(monkeypatch):
+    roster = [P("A", 0, 40), P("B", 0, 40), P("C", 1, 12)]
+    r = resolve_analytic(roster, seed=5)
+    assert (r.k_home, r.k_away, r.winner) == (1, 0, 0) and roster[2].hp == 12
+    assert resolve_analytic(roster, seed=5) == r
+    car = Career.new(seed=11, n_teams=6, team_size=3, user_team_id=0)
+    near = rivals(car, 1)
+    assert near and "0" not in near
+    assert {j.fidelity for j in week_jobs(car, 0)} == {FIDELITY_FULL}         # cheaper tiers are opt-in
+    monkeypatch.setattr(core.sim, "SIM_FIDELITY", FIDELITY_SURROGATE)
+    jobs = week_jobs(car, 0)
+    assert jobs and all(j.fidelity == (FIDELITY_FULL if {str(j.home_tid), str(j.away_tid)} & rivals(car) else FIDELITY_SURROGATE) for j in jobs)
+    car.fidelity_policy = lambda c, h, a: FIDELITY_REDUCED
+    assert {j.fidelity for j in week_jobs(car, 0)} == {FIDELITY_REDUCED}
+    assert play_fixture(week_jobs(car, 0)[0])["fidelity"] == FIDELITY_REDUCED
+
+def test_surrogate_fit_sample_and_drift():
+    strong = FixtureFeatures(70.0, 50.0, 1600.0, 1400.0, 3, 3, (("Wizard", 3),), (("Berserker", 3),))
+    weak = FixtureFeatures(50.0, 70.0, 1400.0, 1600.0, 3, 3, (("Berserker", 3),), (("Wizard", 3),))
+    model = fit_surrogate([(strong, 3, 0), (weak, 0, 3)] * 5, ridge=0.01)
+    ph, pa = model.predict(strong)
+    assert ph > 0.9 and pa < 0.1 and model.sample(strong, 7) == model.sample(strong, 7)
+    assert model.sample(strong, 7)[0] >= 2
+    car = Career.new(seed=3, n_teams=4, team_size=2, user_team_id=None)
+    rep = drift_report(week_jobs(car, 0, fidelity=FIDELITY_SURROGATE), FIDELITY_REDUCED)
+    assert rep["fixtures"] == 2 and 0 <= rep["winner_agree"] <= 1 and rep["speedup"] > 0
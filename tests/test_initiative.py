@@ -0,0 +1,39 @@
+from functools import partial
+
+from engine.conditions import add_condition
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, STR=14, hp=30, max_hp=30)
+
+WAIT = type("Wait", (), {"decide": lambda self, w, me: [{"type": "wait"}]})()
+
+def test_initiative_order_and_dead_actors_cost_no_turns():
+    actors = [P("A", 0, 0, DEX=8), P("B", 1, 1, DEX=18), P("C", 0, 2), P("D", 1, 3)]
+    c = TBCombat(None, None, actors, 8, 8, seed=4)
+    c.controllers = {0: WAIT, 1: WAIT}
+    c.take_turn()
+    rolls = {e["actor"]: e["roll"] for e in c.events if e["type"] == "initiative"}
+    assert list(rolls) == [a.name for a in c.turn_order] and list(rolls.values()) == sorted(rolls.values(), reverse=True)
+    c._apply_damage(actors[2], 99)                     # C drops mid-round
+    order = [a.name for a in c.turn_order]
+    assert "C" not in order and len(order) == 3
+    start = c.round; acted = []
+    while c.round == start:
+        acted.append(c.current_actor.name); c.take_turn()
+    assert "C" not in acted and c.turn_no == 1 + len(acted)
+    assert sum(1 for e in c.events if e["type"] == "round_start") == 1  # round 2 starts with its first turn
+    c.take_turn()
+    assert [e["round"] for e in c.events if e["type"] == "round_start"] == [1, 2]
+
+def test_round_start_ticks_conditions_and_checks_hidden_once_per_team():
+    a = P("A", 0, 0, hidden=True, _hide_roll=99); b = P("B", 1, 1); d = P("D", 1, 2, INT=16)
+    add_condition(b, "prone", 2)
+    c = TBCombat(None, None, [a, b, d], 8, 8, seed=1)
+    c.controllers = {0: WAIT, 1: WAIT}
+    for _ in range(3): c.take_turn()                   # one full round
+    checks = [e for e in c.events if e["type"] == "detect_hidden"]
+    assert len(checks) == 1 and checks[0]["detector"] == "D"
+    assert c.conditions.remaining(b, "prone", 1) == 1 and c.has_condition(b, "prone")   # expires as round 2 starts
+    c.take_turn()
+    assert not c.has_condition(b, "prone") and any(e["type"] == "condition_ended" for e in c.events)
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from engine.events import NullSink
+from engine.lockstep import run_lockstep
+from engine.tbcombat import TBCombat
+from conftest import Obj, fighter
+
+AXE = {"id": "w_0", "name": "Greataxe", "dice": "1d12", "ability": "STR", "two_handed": True}
+SWORD = {"id": "w_0", "name": "Shortsword", "dice": "1d6", "finesse": True}
+
+def P(name, team_id, weapon, hp=20, ac=13, **stats):
+    return fighter(name, team_id, cls="Berserker", level=3, weapon=weapon, **{"STR": 15, "DEX": 14, "hp": hp, "max_hp": hp, "ac": ac, **stats})
+
+def test_replicas_are_reproducible_and_leave_actors_alone():
+    roster = [P("A", 0, AXE), P("B", 0, SWORD), P("C", 1, AXE), P("D", 1, SWORD, hp=1)]
+    r = run_lockstep(roster, 500, seed=9)
+    again = run_lockstep(roster, 500, seed=9)
+    assert (r.winner == again.winner).all() and (r.rounds == again.rounds).all()
+    assert roster[3].hp == 1 and roster[3].alive
+    assert set(np.unique(r.winner)) <= {0, 1} and r.replicas_per_sec > 0
+    assert ((r.winner == 0) == (r.k_home == 2)).all() and (r.k_away <= 2).all() and (r.turns >= 1).all()
+    walls = run_lockstep([P("A", 0, SWORD, ac=40), P("W", 1, SWORD, hp=500, ac=40)], 50, seed=1, stalemate_rounds=3)
+    assert (walls.winner == -1).all() and (walls.rounds == 5).all()
+
+def test_win_rate_agrees_with_the_scalar_engine():
+    roster = [P("A", 0, AXE), P("B", 1, SWORD, hp=24, DEX=16)]
+    wins = 0; seeds = 300
+    for s in range(seeds):
+        c = TBCombat(None, None, [Obj(dict(f, inventory={"weapons": [dict(f["inventory"]["weapons"][0])]})) for f in roster],
+                     6, 6, seed=s, events=NullSink())
+        while c.winner is None: c.take_turn()
+        wins += c.winner == 0
+    p, lo, hi = run_lockstep(roster, 20_000, seed=3).win_rate(0)
+    se = (p * (1 - p) / seeds) ** 0.5
+    assert abs(wins / seeds - p) < 4 * se + 1e-9
@@ -0,0 +1,33 @@
+import core.matchups as mu
+from core.matchups import MatchupMatrix, build_matrix, load_matrix, rules_fingerprint
+
+def test_fingerprint_tracks_rule_sources(tmp_path, monkeypatch):
+    for rel in mu.RULES_FILES:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True); (tmp_path / rel).write_text("# rules\n")
+    monkeypatch.setattr(mu, "ROOT", tmp_path); rules_fingerprint.cache_clear()
+    try:
+        before = rules_fingerprint(); rules_fingerprint.cache_clear()
+        assert rules_fingerprint() == before
+        (tmp_path / "engine/tbcombat.py").write_text("# rules changed\n"); rules_fingerprint.cache_clear()
+        after = rules_fingerprint()
+        assert after != before
+        old = MatchupMatrix(before); old.add(0, 1, 10, 7, 3); path = old.save(tmp_path / "m.json")
+        assert load_matrix(path, fingerprint=before).win_prob(*old.entries[0], *old.entries[1]) == 0.7
+        assert load_matrix(path, fingerprint=after).built() == 0   # stale rules: start over
+    finally:
+        rules_fingerprint.cache_clear()
+
+def test_incremental_build_and_queries(tmp_path):
+    path = tmp_path / "m.json"; calls = []
+    classes = ["Berserker", "Wizard"]
+    m = build_matrix(classes, [1, 3], seeds=20, path=path, progress=lambda d, t: calls.append((d, t)))
+    assert calls[-1] == (10, 10) and m.built() == 10 and not m.missing(classes, [1, 3])
+    p = m.win_prob("Berserker", 3, "Wizard", 1); r = m.record("Berserker", 3, "Wizard", 1)
+    assert r[0] == 20 and abs(p + m.win_prob("Wizard", 1, "Berserker", 3) - 1) < 1e-9
+    assert m.win_prob("Berserker", 1, "Berserker", 1) == 0.5 and m.win_prob("Berserker", 1, "Wizard", 5) is None
+    again = build_matrix(classes, [1, 3], seeds=20, path=path, progress=lambda d, t: calls.append((d, t)))
+    assert calls[-1] == (10, 10) and again.n == m.n        # nothing left to play
+    more = build_matrix(classes, [1, 3, 5], seeds=20, path=path)
+    assert more.built() == 21 and more.record("Berserker", 3, "Wizard", 1) == r
+    t = more.team_win_prob([("Berserker", 3), ("Wizard", 3)], [("Wizard", 1)])
+    assert 0.5 < t <= 1 and more.team_win_prob([("Berserker", 3)], [("Monk", 20)]) is None
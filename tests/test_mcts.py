@@ -0,0 +1,38 @@
+import copy
+from functools import partial
+
+from engine.tbcombat import TBCombat
+from engine.ai.mcts import MCTSController, candidate_intents
+from conftest import fighter
+
+P = partial(fighter, STR=16, hp=14, max_hp=14, ac=11)
+
+def _combat(seed=2):
+    return TBCombat(None, None, [P("A", 0), P("B", 1), P("C", 0), P("D", 1, hp=5)], width=8, height=8, seed=seed)
+
+def test_decide_leaves_the_combat_untouched():
+    c = _combat(); c._in_turn = True
+    before = (copy.deepcopy([dict(a) for a in c.actors]), c.rng.getstate(), list(c.events), c.turn_no)
+    ctrl = MCTSController(rollouts=12, seed=3)
+    intents = ctrl.decide(c, c.actors[0])
+    assert intents and intents[0]["type"] in {"attack", "hide"}
+    assert (copy.deepcopy([dict(a) for a in c.actors]), c.rng.getstate(), list(c.events), c.turn_no) == before
+    assert ctrl.stats["rollouts"] == 12 and ctrl.rollouts_per_second > 0
+    assert {k[1] for k, _ in candidate_intents(c, c.actors[0])} == {"attack", "hide"}
+
+def test_same_seed_and_budget_replays_the_same_match():
+    def play():
+        c = _combat(seed=5); c.controllers[0] = MCTSController(rollouts=8, seed=1)
+        while c.winner is None:
+            c.take_turn()
+        return list(c.events)
+    assert play() == play()
+
+def test_rollouts_leave_kill_credit_alone():
+    c = TBCombat(None, None, [P("A", 0, pid="a", kills=1), P("B", 1, pid="b"), P("C", 0, pid="c", assists=4),
+                              P("D", 1, pid="d", hp=2, _dmg_from={"c": 12})], width=8, height=8, seed=2)
+    c._in_turn = True
+    def counters(): return [(a.get("xp_total"), a.get("kills"), a.get("assists")) for a in c.actors]
+    before = counters()
+    MCTSController(rollouts=16, seed=3).decide(c, c.actors[0])
+    assert counters() == before and c.actors[3]._dmg_from == {"c": 12}
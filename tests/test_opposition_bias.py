@@ -0,0 +1,75 @@
+import pickle
+
+from engine.ai import weights as OI
+from engine.tbcombat import TBCombat
+from engine.team_tactics import RoleSpec, TacticsController, TeamTactics
+from engine.tactics.opposition import OppositionInstruction, compile_query, instruction_applies_to
+from conftest import Obj, fighter
+
+def test_queries_compile_once_and_match_like_before():
+    q = "DEX>=14 AND role=Healer"
+    assert compile_query(q) is compile_query(q) and compile_query(q).attrs == ("DEX", "role")
+    oi = OppositionInstruction("attribute_query", q, {})
+    assert instruction_applies_to(oi, {"DEX": 15, "role": "Healer"})
+    assert not instruction_applies_to(oi, {"DEX": 12, "role": "Healer"})
+    assert not instruction_applies_to(OppositionInstruction("attribute_query", "DEX>>3", {}), {"DEX": 15})
+    assert instruction_applies_to(OppositionInstruction("player_id", "pid:7", {}), {"pid": 7})
+
+def test_bias_table_is_built_once_and_refreshed_on_attribute_change():
+    healer = Obj(name="H", role="Healer", DEX=16, hp=10, max_hp=20); brute = Obj(name="B", role="Bruiser", DEX=10, hp=20, max_hp=20)
+    OI.set_oi_map({"prefer_roles": {"Healer": 20}, "focus_low_hp": True,
+                   "instructions": [{"target_kind": "attribute_query", "target_value": "DEX>=14", "priority": 2}]})
+    try:
+        OI.prime_oi([healer, brute])
+        table = OI.current_oi().table; n = table.evaluations
+        assert OI.apply_oi_bias(None, healer, 1.0) == 1.0 + 7.5 + 20 + 20
+        assert OI.apply_oi_bias(None, brute, 0.0) == 0.0 and table.evaluations == n  # read from the table
+        brute.DEX = 14
+        assert OI.apply_oi_bias(None, brute, 0.0) == 20.0 and table.evaluations == n + 1
+    finally:
+        OI.clear_oi()
+    assert OI.apply_oi_bias(None, healer, 3.0) == 3.0
+
+def test_each_match_owns_its_instructions():
+    def roster(): return [Obj(name="A", team_id=0, tx=0, ty=0, hp=10, max_hp=10, role="Healer"),
+                          Obj(name="B", team_id=1, tx=1, ty=0, hp=10, max_hp=10, role="Healer")]
+    OI.set_oi_map({"prefer_roles": {"Healer": 5}})
+    try:
+        inherited = TBCombat(None, None, roster(), 4, 4, seed=1)
+        own = TBCombat(None, None, roster(), 4, 4, seed=1, oi={"prefer_roles": {"Healer": 30}})
+        OI.set_oi_map({"prefer_roles": {"Healer": 99}})           # e.g. the UI picking a new exhibition
+        a, b = inherited.actors[1], own.actors[1]
+        assert inherited.oi_bias(None, a, 0.0) == 5.0 and own.oi_bias(None, b, 0.0) == 30.0
+        assert OI.apply_oi_bias(None, a, 0.0) == 99.0 and OI.apply_oi_bias(None, a, 0.0, own.oi) == 30.0
+        ctx = pickle.loads(pickle.dumps(own.oi))                   # ships to worker processes as its map
+        assert ctx.oi == own.oi.oi and ctx.apply(None, b, 1.0) == 31.0
+    finally:
+        OI.clear_oi()
+
+def test_bias_rows_are_scoped_to_each_match():
+    def roster(): return [fighter("A", 0, 0), fighter("B", 1, 1), fighter("C", 1, 2)]
+    ctx = OI.OIContext({"prefer_roles": {"Healer": 5}})
+    one, two = TBCombat(None, None, roster(), 4, 4, seed=1, oi=ctx), TBCombat(None, None, roster(), 4, 4, seed=1, oi=ctx)
+    assert one.oi.table is not two.oi.table and ctx.table.evaluations == 0
+    assert one.oi.table.evaluations == 3                            # both sides have an enemy
+    solo = TBCombat(None, None, [fighter("A", 0, 0), fighter("B", 0, 1)], 4, 4, seed=1, oi=ctx)
+    assert solo.oi.table.evaluations == 0                           # nobody to target them
+    OI.set_oi_map({"prefer_roles": {"Healer": 5}})
+    try:
+        for _ in range(3): OI.prime_oi(roster())
+        assert len(OI.current_oi().table._rows) == 3                 # earlier rosters are dropped
+    finally:
+        OI.clear_oi()
+
+def test_instructions_steer_both_target_pickers():
+    me, weak, healer = fighter("M", 0, 0, ovr=50), fighter("W", 1, 1, hp=2, ovr=50), fighter("H", 1, 5, role="Healer", ovr=50)
+    plain = TBCombat(None, None, [me, weak, healer], 8, 8, seed=1, oi={})
+    steered = TBCombat(None, None, [me, weak, healer], 8, 8, seed=1, oi={"prefer_roles": {"Healer": 25}})
+    spec = RoleSpec(focus="lowest_hp"); ctrl = TacticsController(TeamTactics(spec))
+    for rule in ("lowest_hp", "closest"):
+        assert plain.view().pick_target(me, [rule]) is weak and steered.view().pick_target(me, [rule]) is healer
+    assert ctrl._select_target(plain, me, spec) is weak and ctrl._select_target(steered, me, spec) is healer
+    # one rank place costs OI_RANK_STEP: a smaller preference does not override the rule
+    mild = TBCombat(None, None, [me, weak, healer], 8, 8, seed=1, oi={"prefer_roles": {"Healer": 5}})
+    assert mild.view().pick_target(me, ["lowest_hp"]) is weak
+
@@ -0,0 +1,46 @@
+from functools import partial
+
+from engine.tbcombat import TBCombat
+from engine.team_tactics import TacticsController, TeamTactics, RoleSpec
+from conftest import fighter
+
+P = partial(fighter, STR=16, hp=14, max_hp=14, ac=11, ovr=50)
+
+def test_paths_go_around_enemies_and_never_end_on_allies():
+    me = P("A", 0, 0, 2); ally = P("B", 0, 1, 2); wall = [P(f"E{y}", 1, 3, y) for y in range(0, 4)]
+    goal = P("G", 1, 6, 2)
+    c = TBCombat(None, None, [me, ally, goal] + wall, width=8, height=8, seed=1)
+    path = c.path_towards(me, goal, max_steps=20, stop_within=1)
+    assert path and c.distance_xy(goal, path[-1]) == 1
+    assert all((3, y) not in path for y in range(4))                 # enemies block
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip([(0, 2)] + path[:-1], path, strict=True))
+    short = c.path_towards(me, goal, max_steps=1, stop_within=1)      # (1,2) holds an ally
+    assert (1, 2) not in short[-1:]
+    assert c.paths.stats["fields_built"] == 1                         # both queries shared one field
+
+def test_avoid_oa_routes_around_enemy_reach():
+    me = P("A", 0, 2, 1); guard = P("E", 1, 3, 3); goal = P("G", 1, 2, 7)
+    c = TBCombat(None, None, [me, guard, goal], width=8, height=9, seed=1)
+    plain = c.path_towards(me, goal, max_steps=10, stop_within=1)
+    careful = c.path_towards(me, goal, max_steps=10, stop_within=1, avoid_oa=True)
+    assert (2, 3) in plain and (2, 3) not in careful                  # (2,3) is inside the guard's reach
+    assert len(careful) > len(plain) and c.distance_xy(goal, careful[-1]) <= 1
+
+def test_tactics_controller_moves_into_reach_then_attacks():
+    a = P("A", 0, 0, 0); b = P("B", 1, 5, 0, hp=200, max_hp=200)
+    c = TBCombat(None, None, [a, b], width=8, height=8, seed=3, initiative=False)
+    c.controllers[0] = TacticsController(TeamTactics(default=RoleSpec(desired_range=1)))
+    c.controllers[1] = type("Idle", (), {"decide": lambda self, w, me: [{"type": "end"}]})()
+    c.take_turn()
+    assert (a.tx, a.ty) == (4, 0)
+    assert any(e["type"] == "attack_roll" and e["attacker"] == "A" for e in c.events)
+
+def test_leaving_reach_provokes_unless_disengaged():
+    for disengage in (False, True):
+        a = P("A", 0, 2, 2, hp=100, max_hp=100); e = P("E", 1, 3, 2)
+        c = TBCombat(None, None, [a, e], width=8, height=8, seed=2, initiative=False)
+        c.controllers[0] = type("Run", (), {"decide": lambda self, w, me, d=disengage:
+                                            ([{"type": "disengage"}] if d else []) + [{"type": "move", "to": (1, 2)}, {"type": "move", "to": (0, 2)}]})()
+        c.take_turn()
+        assert (a.tx, a.ty) == (0, 2)
+        assert any(ev["type"] == "attack_roll" and ev["attacker"] == "E" for ev in c.events) is (not disengage)
@@ -0,0 +1,69 @@
+import copy
+from functools import partial
+import json
+
+from engine.tbcombat import TBCombat
+from engine.replay import MatchRecord, MatchRecorder, Replayer
+from engine.team_tactics import RoleSpec, TacticsController, TeamTactics
+from conftest import fighter
+
+P = partial(fighter, STR=16, hp=14, max_hp=14, ac=11)
+
+def _record(seed=5):
+    c = TBCombat(None, None, [P("A", 0), P("B", 1), P("C", 0), P("D", 1)], width=8, height=8, seed=seed)
+    rec = MatchRecorder(c)
+    while c.winner is None:
+        c.take_turn()
+    return c, rec.record
+
+def test_replay_from_json_reproduces_the_match():
+    live, record = _record()
+    back = MatchRecord.from_dict(json.loads(json.dumps(record.to_dict())))
+    cmb = Replayer(back).run_to_end()
+    assert cmb.winner == live.winner and cmb.round == live.round
+    assert list(cmb.events) == list(live.events)
+
+def test_seek_back_and_forth_is_consistent():
+    live, record = _record(seed=11)
+    rp = Replayer(record, checkpoint_every=5)
+    mid = rp.seek(len(record.turns) // 2)
+    snap = (copy.deepcopy([dict(a) for a in mid.actors]), list(mid.events), mid.round)
+    rp.seek(len(record.turns))
+    again = rp.seek(len(record.turns) // 2)
+    assert ([dict(a) for a in again.actors], list(again.events), again.round) == snap
+    assert list(rp.run_to_end().events) == list(live.events)
+
+def test_record_keeps_the_match_setup_and_scrubs_in_place():
+    from engine.model import Team
+    actors = [P("A", 0, role="Healer"), P("B", 1), P("C", 0), P("D", 1)]
+    live = TBCombat(Team(0, "Home", (1, 2, 3)), "away", actors, 8, 8, seed=7, oi={"prefer_roles": {"Healer": 20}})
+    record = MatchRecorder(live).record
+    rp = Replayer(record, combat=live)
+    while live.winner is None: live.take_turn()
+    end = ([dict(a) for a in actors], list(live.events))
+    assert rp.seek(3) is live and live.actors[0] is actors[0] and live.turn_no == 3
+    assert rp.run_to_end() is live and ([dict(a) for a in actors], list(live.events)) == end
+    back = MatchRecord.from_dict(json.loads(json.dumps(record.to_dict())))
+    cmb = Replayer(back).run_to_end()
+    assert cmb.team_a == Team(0, "Home", (1, 2, 3)) and cmb.team_b == "away"
+    assert cmb.oi.oi == {"prefer_roles": {"Healer": 20}} and list(cmb.events) == end[1]
+
+def test_replay_keeps_the_advantage_a_controller_grants():
+    actors = [P(n, t, x, 3 * t, ovr=50) for n, t, x in (("A", 0, 0), ("B", 1, 0), ("C", 0, 1), ("D", 1, 1))]
+    live = TBCombat(None, None, actors, width=8, height=8, seed=3)
+    live.controllers[0] = TacticsController(TeamTactics(RoleSpec(attack_advantage=True)))
+    record = MatchRecorder(live).record
+    while live.winner is None: live.take_turn()
+    assert any(it.get("adv") == 1 for turn in record.turns if turn for it in turn)
+    back = MatchRecord.from_dict(json.loads(json.dumps(record.to_dict())))
+    assert list(Replayer(back).run_to_end().events) == list(live.events)
+
+def test_record_of_combat_actors_round_trips():
+    from engine.model import CombatActor, actor_from_dict
+    actors = [actor_from_dict(dict(P(n, t, x, 3 * t))) for n, t, x in (("A", 0, 0), ("B", 1, 0), ("C", 0, 1), ("D", 1, 1))]
+    live = TBCombat(None, None, actors, width=8, height=8, seed=9)
+    record = MatchRecorder(live).record
+    while live.winner is None: live.take_turn()
+    back = MatchRecord.from_dict(json.loads(json.dumps(record.to_dict())), actor_factory=actor_from_dict)
+    assert all(isinstance(a, CombatActor) for a in back.actors) and back.to_dict() == record.to_dict()
+    assert list(Replayer(back).run_to_end().events) == list(live.events)
@@ -0,0 +1,35 @@
+import copy
+from functools import partial
+
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, STR=16, hp=14, max_hp=14, ac=11)
+
+def _finish(c):
+    while c.winner is None:
+        c.take_turn()
+    return [dict(a) for a in c.actors], list(c.events), c.round, c.winner
+
+def test_restore_rewinds_to_the_snapshot_and_is_reusable():
+    c = TBCombat(None, None, [P("A", 0), P("B", 1), P("C", 0), P("D", 1)], width=8, height=8, seed=4)
+    for _ in range(6):
+        c.take_turn()
+    before = copy.deepcopy([dict(a) for a in c.actors])
+    snap = c.snapshot()
+    first = _finish(c)
+    c.restore(snap)
+    assert [dict(a) for a in c.actors] == before and c.winner is None
+    assert _finish(c) == first
+    c.restore(snap)
+    assert _finish(c) == first
+
+def test_restore_undoes_kill_credit_for_a_shared_kill():
+    a, b, d = P("A", 0, pid="a", assists=2), P("B", 0, pid="b"), P("D", 1, pid="d", hp=6, max_hp=6)
+    c = TBCombat(None, None, [a, b, d], width=8, height=8, seed=1)
+    snap = c.snapshot()
+    c._apply_damage(d, 2, attacker=a); c._apply_damage(d, 4, attacker=b)
+    assert a.assists == 3 and b.kills == 1 and a.xp_total > 0 and c.winner == 0
+    c.restore(snap)
+    assert a.assists == 2 and "kills" not in b and not a.xp_total and not b.xp_total
+    assert d.hp == 6 and c.winner is None
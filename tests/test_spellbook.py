@@ -0,0 +1,34 @@
+from functools import partial
+
+from engine.dice import Dice
+from engine.spellbook import compile_spell, load_spellbook
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, weapon=None, hp=200, max_hp=200, spell_save_dc=30)
+
+def test_rows_compile_to_plans():
+    fb = compile_spell({"spell": "Fireball", "class": "Wizard", "slot_type": 3, "die": "5th level (8d6), 11th level  (9d6), and 17th level (10d6)",
+                        "damage_type": "Fire", "save_attr": "DEX SAVE, HALF ON SAVE", "save_success_multiplier": 0.5,
+                        "range_tiles": 10.0, "aoe_shape": "Square", "conditions": []})
+    assert (fb.kind, fb.save, fb.save_mult, fb.shape, fb.dtype) == ("save", "DEX", 0.5, "blast", "fire")
+    assert fb.dice_at(5) == Dice(8, 6) and fb.dice_at(17) == Dice(10, 6)
+    bolt = compile_spell({"spell": "Frost Bolt", "die": "1d8, 5th level (2d8)", "save_attr": "RANGED SPELL ATTAACK", "range_tiles": 12})
+    assert bolt.kind == "attack" and bolt.save is None and bolt.dice_at(1) == Dice(1, 8)
+    slow = compile_spell({"spell": "Slow", "save_attr": "DEX SAVE, NONE ON SAVE", "save_success_multiplier": 0.5, "aoe_shape": "Square"})
+    assert slow.save_mult == 0.0 and slow.dice_at(20) is None
+    heal = compile_spell({"spell": "Heal", "die": "70 HP", "damage_type": "Healing"})
+    assert heal.kind == "heal" and heal.dice_at(1) == Dice(0, 1, 70)
+    book = load_spellbook()
+    assert load_spellbook() is book and book.get("fireball", "Wizard").shape == "blast" and "Debuff" not in book
+
+def test_cast_runs_the_compiled_plan():
+    wiz = P("W", 0, 0, 0, cls="Wizard", level=5); a = P("A", 1, 4, 2); b = P("B", 1, 5, 3)
+    far = P("F", 1, 0, 5); priest = P("P", 1, 7, 7, cls="War Priest", level=9)
+    c = TBCombat(None, None, [wiz, a, b, far, priest], 8, 8, seed=3, initiative=False)
+    c.resolve_intents(wiz, [{"type": "cast", "spell": {"name": "Fireball", "center": (4, 3)}}])
+    hits = [e for e in c.events if e["type"] == "spell_aoe"]
+    assert [e["defender"] for e in hits] == ["A", "B"] and all(not e["saved"] and 8 <= e["dmg"] <= 48 for e in hits)
+    assert far.hp == 200 and a.hp == 200 - hits[0]["dmg"]
+    c.resolve_intents(priest, [{"type": "cast", "spell": {"name": "Heal"}, "target": a}])
+    assert a.hp == min(200, 200 - hits[0]["dmg"] + 70)
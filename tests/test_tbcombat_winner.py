@@ -0,0 +1,35 @@
+from functools import partial
+
+from engine.tbcombat import TBCombat
+from conftest import fighter
+
+P = partial(fighter, STR=14, fighter_archery_bonus=0)
+
+def test_winner_set_on_decisive_kill():
+    a = P("A", 0); b = P("B", 1, hp=1, max_hp=1)
+    c = TBCombat(None, None, [a, b], width=8, height=8, seed=1)
+    assert c.alive_count(1) == 1 and not c.finished
+    c._apply_damage(b, 5, attacker=a)
+    assert c.winner == 0 and c.finished
+    assert [e["type"] for e in c.events[-2:]] == ["down", "end"]
+    c.take_turn()  # no-op once decided
+    assert c.events[-1]["type"] == "end"
+
+def test_match_stops_within_one_turn_of_last_kill():
+    a = P("A", 0, STR=20); b = P("B", 1)
+    c = TBCombat(None, None, [a, b], width=8, height=8, seed=3, initiative=False)
+    steps = 0
+    while c.winner is None and steps < 2000:
+        c.take_turn(); steps += 1
+    assert c.winner == 0 and steps < 100
+    assert sum(1 for e in c.events if e["type"] == "end") == 1
+
+def test_stalemate_ends_as_draw():
+    a = P("A", 0); b = P("B", 1)
+    c = TBCombat(None, None, [a, b], width=8, height=8, seed=1, stalemate_rounds=3)
+    waiter = type("Ctrl", (), {"decide": lambda self, env, me: [{"type": "wait"}]})()
+    c.controllers[0] = waiter; c.controllers[1] = waiter
+    steps = 0
+    while not c.finished and steps < 100:
+        c.take_turn(); steps += 1
+    assert c.winner == -1 and c.round == 5
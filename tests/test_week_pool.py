@@ -0,0 +1,36 @@
+import pickle
+
+from core.career import Career
+from core.sim import fixture_job, play_fixture, run_fixtures, simulate_week_ai, week_jobs
+
+def _career():
+    return Career.new(seed=11, n_teams=6, team_size=3, user_team_id=0)
+
+def _played(car):
+    return [(f["home_id"], f["away_id"], f["k_home"], f["k_away"], f["winner"]) for wk in car.fixtures_by_week for f in wk if f.get("played")]
+
+def test_jobs_are_self_contained_and_stable():
+    car = _career()
+    jobs = week_jobs(car)
+    assert len(jobs) == 2 and [j.index for j in jobs] == [0, 1]          # the user's fixture is left out
+    assert all(0 not in (j.home_tid, j.away_tid) for j in jobs)
+    again = week_jobs(_career())
+    assert [j.seed for j in jobs] == [j.seed for j in again]
+    job = pickle.loads(pickle.dumps(jobs[0]))
+    assert play_fixture(job) == play_fixture(jobs[0])                    # a fresh roster copy every time
+    assert car.teams[1]["fighters"][0]["hp"] == 10                       # career rosters are not touched
+
+def test_pool_matches_serial():
+    serial, pooled = _career(), _career()
+    for _ in range(2):
+        assert simulate_week_ai(serial, workers=0)
+        assert simulate_week_ai(pooled, workers=2, chunksize=1)
+    assert _played(serial) == _played(pooled) and len(_played(serial)) == 4
+    jobs = week_jobs(serial)
+    assert run_fixtures(jobs, workers=3) == [play_fixture(j) for j in jobs]
+
+def test_a_fixture_plays_the_same_from_any_entry_point():
+    car = _career()
+    jobs = week_jobs(car, 0)
+    one = [fixture_job(car, j.index, 0, int(j.home_tid), int(j.away_tid)) for j in jobs]   # e.g. the season hub
+    assert one == jobs and [play_fixture(j) for j in one] == run_fixtures(jobs)
@@ -0,0 +1,33 @@
+from core.tactics import DEFAULT_TEAM_TACTICS, choose_intent, get_team_tactics
+from engine.tbcombat import TBCombat
+from engine.world_view import WorldView
+from conftest import Obj, fighter
+
+def P(name, team_id, x, **stats):
+    return fighter(name, team_id, x, **{"pid": name, "STR": 14, "hp": 30, "max_hp": 30, "OVR": 50, **stats})
+
+def test_view_is_shared_until_the_world_changes():
+    a = P("A", 0, 0); b = P("B", 1, 1); d = P("D", 1, 5)
+    c = TBCombat(None, None, [a, b, d], 8, 8, seed=3, initiative=False)
+    v = c.view()
+    assert c.view() is v and v.allies(0) == (a,) and v.enemies(0) == (b, d)
+    assert choose_intent(c, a) and c.view() is v          # reading never invalidates
+    c._apply_damage(b, 20)
+    v2 = c.view()
+    assert v2 is not v and v2.hp_frac(b) == 10 / 30 and v2.ranked(0, "lowest_hp")[0] is b
+    snap = c.snapshot(); c._apply_damage(d, 99); c.restore(snap)
+    assert c.view().enemies(0) == (b, d)                  # restore never revives a stale view
+
+def test_ranked_targets_match_a_full_scan_with_roster_tie_breaks():
+    a = P("A", 0, 4)
+    foes = [P("E1", 1, 0, hp=15, OVR=60), P("E2", 1, 7, hp=15, OVR=70, DEX=18), P("E3", 1, 5, OVR=70)]
+    env = Obj({"actors": [a] + foes, "team_tactics": {0: {"target_priority": ["highest_ovr"]}}})
+    v = WorldView(env)
+    assert v.pick_target(a, ["lowest_hp"]) is foes[0]     # tie on 0.5: first in roster order
+    assert v.pick_target(a, ["highest_ovr"]) is foes[1]
+    assert v.pick_target(a, ["highest_dps"]) is foes[1]
+    assert v.pick_target(a, ["closest"]) is foes[2]
+    assert v.pick_target(a, ["unknown"]) is foes[0]
+    assert choose_intent(env, a) == [{"type": "attack", "target": foes[1]}]
+    cfg = get_team_tactics(env, 0)
+    assert cfg["target_priority"] == ["highest_ovr"] and cfg["heal_threshold"] == DEFAULT_TEAM_TACTICS["heal_threshold"]
@@ -1,23 +1,56 @@
 # tools/batch_balance.py
 from __future__ import annotations
-import argparse, random, statistics
-from typing import Dict, Any, List, Tuple
+import argparse, csv, itertools, json, os, random, time, zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from engine.tbcombat import TBCombat
-from engine.model import Fighter, Team
-from core.creator import ensure_class_features, grant_starting_kit
+from engine.events import NullSink
+from engine.lockstep import HAVE_NUMPY, run_lockstep, wilson
+from engine.model import actor_from_dict
+from core.matchups import MAIN_HANDS as KITS
+
+try:
+    from core.classes import ensure_class_features, grant_starting_kit
+except Exception:  # class tables unavailable: stat-scaled hp and the class's main hand only
+    def ensure_class_features(f: Dict[str, Any]) -> None:
+        f["max_hp"] = 10 + (int(f["level"]) - 1) * 6 + (int(f["CON"]) - 10) // 2; f["hp"] = f["max_hp"]
+        f.setdefault("ac", 12)
+    def grant_starting_kit(f: Dict[str, Any]) -> None:
+        w = KITS.get(f["class"])
+        if w: f["inventory"] = {"weapons": [dict(w, id="w_0")]}; f["equipped"] = {"main_hand_id": "w_0"}
+
+# Balance sweeps: every cell of a class-composition x level grid is played until its home win-rate
+# confidence interval is tight enough, on a process pool, with progress checkpointed to disk.
+#
+# A cell is (home comp, away comp, level). Its seeds come in batches of --batch (seed = cell seed +
+# index, so a cell's results do not depend on scheduling or on the worker count); after each batch
+# the cell stops once it has --min-seeds and the Wilson interval's half-width is <= --ci, or at
+# --max-seeds. Cells run side by side: each has at most one batch in flight.
+# Finished cells stream to --out (.csv or .jsonl); partial counts go to <out>.ckpt.json every
+# --checkpoint seconds. Rerunning the same command resumes: cells already in --out are skipped
+# and partial ones continue from their next batch.
+# --engine lockstep (engine.lockstep, needs numpy) plays each batch as replicas of one rolled
+# roster: much faster, so use larger batches; rules as TBCombat's default headless path.
+#
+#   python -m tools.batch_balance --classes Berserker,Archer,Wizard --size 2 --levels 1,5,10 --out sweep.csv
+#   python -m tools.batch_balance --vs Defender,Defender --size 2 --workers 8 --engine lockstep
 
 # --- knobs ---
 GRID_W = 16; GRID_H = 16
+MAX_TURNS = 200
 
-CLASSES = ["Fighter","Ranger","Paladin","Wizard","Druid","Rogue","Barbarian","Cleric","Bard","Monk","Warlock","Sorcerer"]  # trim to your current set
+CLASSES = sorted(KITS)   # classes with a starting weapon (core.classes.CLASS_STARTING_KIT)
 TEAM_SIZE = 5
 
-def _mk_fighter(pid: int, team_id: int, klass: str, seed: int) -> Fighter:
+def _mk_fighter(pid: int, team_id: int, klass: str, seed: int, level: int = 1) -> Dict[str, Any]:
     rng = random.Random(seed + pid*997 + team_id*131)
-    base = {
+    f = {
+        "pid": f"{team_id}-{pid}",
         "name": f"{klass[:3]}-{team_id}-{pid}",
-        "level": 1,
-        "hp": 10 + rng.randint(0, 8),
+        "level": int(level),
+        "hp": 10**6,   # ensure_class_features caps it at the class formula
         "STR": 10 + rng.randint(0, 6),
         "DEX": 10 + rng.randint(0, 6),
         "CON": 10 + rng.randint(0, 6),
@@ -26,79 +59,236 @@ def _mk_fighter(pid: int, team_id: int, klass: str, seed: int) -> Fighter:
         "CHA": 10 + rng.randint(0, 6),
         "team_id": team_id,
         "class": klass,
+        "alive": True,
+        "tx": pid, "ty": 0 if team_id == 0 else GRID_H - 1,
     }
-    f = Fighter(**base)
     # apply class features & starting kit so this aligns with game rules:
-    ensure_class_features(f.__dict__)
-    grant_starting_kit(f.__dict__)
-    # snapshot
+    ensure_class_features(f)
+    grant_starting_kit(f)
     return f
 
-def _mk_team(tid: int, klasses: List[str], seed: int) -> Team:
-    fighters = []
+def _mk_team(tid: int, klasses: Sequence[str], seed: int, level: int = 1, size: Optional[int] = None) -> List[Dict[str, Any]]:
     # evenly cycle through provided classes
-    for i in range(TEAM_SIZE):
-        k = klasses[i % len(klasses)]
-        fighters.append(_mk_fighter(i, tid, k, seed))
-    color = (200,50,50) if tid==0 else (50,50,200)
-    return Team(id=tid, name=f"T{tid}", color=color, fighters=fighters)
-
-def run_match(seed: int, klasses_home: List[str], klasses_away: List[str]) -> Dict[str, Any]:
-    t1 = _mk_team(0, klasses_home, seed)
-    t2 = _mk_team(1, klasses_away, seed)
-    actors = t1.fighters + t2.fighters
-    cmb = TBCombat(t1, t2, actors, width=GRID_W, height=GRID_H, seed=seed)
+    return [_mk_fighter(i, tid, klasses[i % len(klasses)], seed, level) for i in range(size or TEAM_SIZE)]
+
+def match_roster(seed: int, klasses_home: Sequence[str], klasses_away: Sequence[str], *, level: int = 1,
+                 size: Optional[int] = None) -> List[Any]:
+    return [actor_from_dict(f) for f in _mk_team(0, klasses_home, seed, level, size) + _mk_team(1, klasses_away, seed, level, size)]
+
+def run_match(seed: int, klasses_home: Sequence[str], klasses_away: Sequence[str], *, level: int = 1,
+              size: Optional[int] = None) -> Dict[str, Any]:
+    actors = match_roster(seed, klasses_home, klasses_away, level=level, size=size)
+    cmb = TBCombat(None, None, actors, width=GRID_W, height=GRID_H, seed=seed, events=NullSink())
     turns = 0
-    while not cmb.finished and turns < 200:
+    while not cmb.finished and turns < MAX_TURNS:
         cmb.take_turn()
         turns += 1
     # summarize
-    k_home = sum(1 for f in t2.fighters if not f.alive or getattr(f, "hp", 1) <= 0)
-    k_away = sum(1 for f in t1.fighters if not f.alive or getattr(f, "hp", 1) <= 0)
+    k_home = sum(1 for f in actors if f.team_id == 1 and (not f.alive or getattr(f, "hp", 1) <= 0))
+    k_away = sum(1 for f in actors if f.team_id == 0 and (not f.alive or getattr(f, "hp", 1) <= 0))
     winner = 0 if k_home > k_away else (1 if k_away > k_home else -1)
     return {"seed": seed, "k_home": k_home, "k_away": k_away, "turns": turns, "winner": winner}
 
+
+# ---------------- Sweep cells ----------------
+@dataclass(frozen=True, slots=True)
+class Cell:
+    home: Tuple[str, ...]
+    away: Tuple[str, ...]
+    level: int
+
+    @property
+    def key(self) -> str: return f"{'+'.join(self.home)}|{'+'.join(self.away)}|L{self.level}"
+    @property
+    def seed(self) -> int:  # stable across processes and runs (no hash(): it is salted per process)
+        return zlib.crc32(self.key.encode()) << 20
+
+def sweep_cells(classes: Sequence[str], size: int, levels: Iterable[int],
+                vs: Optional[Sequence[str]] = None) -> List[Cell]:
+    """Every composition of `size` from `classes` against every other (mirrors included), or against `vs`."""
+    comps = list(itertools.combinations_with_replacement(sorted(classes), size))
+    pairs = [(c, tuple(vs)) for c in comps] if vs else list(itertools.combinations_with_replacement(comps, 2))
+    return [Cell(h, a, int(lv)) for lv in levels for h, a in pairs]
+
+@dataclass
+class Tally:
+    n: int = 0
+    home_wins: int = 0
+    away_wins: int = 0
+    turns: int = 0
+    k_home: int = 0
+    k_away: int = 0
+    batches: int = 0
+
+    def add(self, other: Dict[str, int]) -> None:
+        for k, v in other.items(): setattr(self, k, getattr(self, k) + int(v))
+        self.batches += 1
+
+    def interval(self) -> Tuple[float, float, float]: return wilson(self.home_wins, self.n)
+
+def play_batch(cell: Cell, start: int, count: int, engine: str = "scalar") -> Dict[str, int]:
+    """Seeds cell.seed + [start, start + count) of one cell; -> summed counts (top-level for the pool)."""
+    if engine == "lockstep":
+        actors = match_roster(cell.seed + start, cell.home, cell.away, level=cell.level, size=len(cell.home))
+        r = run_lockstep(actors, count, seed=cell.seed + start, max_rounds=MAX_TURNS)
+        return {"n": count, "home_wins": int((r.winner == 0).sum()), "away_wins": int((r.winner == 1).sum()),
+                "turns": int(r.turns.sum()), "k_home": int(r.k_home.sum()), "k_away": int(r.k_away.sum())}
+    out = {"n": 0, "home_wins": 0, "away_wins": 0, "turns": 0, "k_home": 0, "k_away": 0}
+    for s in range(cell.seed + start, cell.seed + start + count):
+        r = run_match(s, cell.home, cell.away, level=cell.level, size=len(cell.home))
+        out["n"] += 1; out["home_wins"] += r["winner"] == 0; out["away_wins"] += r["winner"] == 1
+        out["turns"] += r["turns"]; out["k_home"] += r["k_home"]; out["k_away"] += r["k_away"]
+    return out
+
+
+# ---------------- Output / checkpoint ----------------
+FIELDS = ("home", "away", "level", "seeds", "home_wins", "away_wins", "draws", "win_rate", "ci_lo", "ci_hi",
+          "avg_turns", "avg_k_home", "avg_k_away", "stopped")
+
+def result_row(cell: Cell, t: Tally, stopped: str) -> Dict[str, Any]:
+    p, lo, hi = t.interval(); n = max(1, t.n)
+    return {"home": "+".join(cell.home), "away": "+".join(cell.away), "level": cell.level, "seeds": t.n,
+            "home_wins": t.home_wins, "away_wins": t.away_wins, "draws": t.n - t.home_wins - t.away_wins,
+            "win_rate": round(p, 4), "ci_lo": round(lo, 4), "ci_hi": round(hi, 4), "avg_turns": round(t.turns / n, 2),
+            "avg_k_home": round(t.k_home / n, 3), "avg_k_away": round(t.k_away / n, 3), "stopped": stopped}
+
+class ResultSink:
+    """Appends finished cells to a .csv or .jsonl file, flushed per row (safe to tail while running)."""
+    def __init__(self, path: Path):
+        self.path = Path(path); self.jsonl = self.path.suffix.lower() in (".jsonl", ".json")
+        fresh = not self.path.exists() or self.path.stat().st_size == 0
+        self._fh = self.path.open("a", encoding="utf-8", newline="")
+        self._csv = None if self.jsonl else csv.DictWriter(self._fh, fieldnames=FIELDS)
+        if self._csv is not None and fresh: self._csv.writeheader()
+    def done_keys(self) -> set:
+        """Keys of cells already written (a row may land just before a checkpoint: never write it twice)."""
+        out = set()
+        with self.path.open(encoding="utf-8", newline="") as fh:
+            rows = (json.loads(l) for l in fh if l.strip()) if self.jsonl else csv.DictReader(fh)
+            for r in rows: out.add(f"{r['home']}|{r['away']}|L{r['level']}")
+        return out
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._csv is not None: self._csv.writerow(row)
+        else: self._fh.write(json.dumps(row) + "\n")
+        self._fh.flush()
+    def close(self) -> None: self._fh.close()
+
+def load_checkpoint(path: Path) -> Dict[str, Tally]:
+    try: raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError): return {}
+    return {k: Tally(**v) for k, v in raw.get("cells", {}).items()}
+
+def save_checkpoint(path: Path, tallies: Dict[str, Tally]) -> None:
+    tmp = Path(str(path) + ".tmp")
+    tmp.write_text(json.dumps({"cells": {k: vars(t) for k, t in tallies.items()}}), encoding="utf-8")
+    os.replace(tmp, path)  # atomic: an interrupt never leaves a half-written checkpoint
+
+
+# ---------------- Sweep ----------------
+@dataclass(frozen=True)
+class StopRule:
+    ci: float = 0.05          # stop once the 95% interval's half-width is at most this
+    min_seeds: int = 40
+    max_seeds: int = 2000
+    batch: int = 20
+
+    def verdict(self, t: Tally) -> Optional[str]:
+        if t.n >= self.max_seeds: return "max"
+        _, lo, hi = t.interval()
+        return "ci" if t.n >= self.min_seeds and (hi - lo) / 2 <= self.ci else None
+
+def sweep(cells: Sequence[Cell], out: Path, *, rule: Optional[StopRule] = None, workers: Optional[int] = 0,
+          engine: str = "scalar", checkpoint_every: float = 10.0, log=print) -> int:
+    """Run `cells` to their stop rule (default StopRule()); -> cells finished in this run."""
+    rule = StopRule() if rule is None else rule
+    out = Path(out); ckpt = Path(str(out) + ".ckpt.json")
+    sink = ResultSink(out); done = sink.done_keys()
+    tallies = {k: t for k, t in load_checkpoint(ckpt).items() if k not in done}
+    todo = [c for c in cells if c.key not in done]
+    if done or tallies: log(f"[batch] resume: {len(done)} cells done, {len(tallies)} partial, {len(todo)} to go")
+    finished = 0; last_save = time.monotonic(); t0 = time.perf_counter(); seeds = 0
+
+    def next_batch(c: Cell) -> Optional[Tuple[Cell, int, int]]:
+        t = tallies.setdefault(c.key, Tally())
+        if rule.verdict(t): return None
+        return (c, t.n, min(rule.batch, rule.max_seeds - t.n))
+
+    def close(c: Cell) -> None:
+        nonlocal finished
+        t = tallies.pop(c.key); sink.write(result_row(c, t, rule.verdict(t) or "max")); finished += 1
+
+    def checkpoint(force: bool = False) -> None:
+        nonlocal last_save
+        if force or time.monotonic() - last_save >= checkpoint_every:
+            save_checkpoint(ckpt, tallies); last_save = time.monotonic()
+
+    queue: Iterator[Cell] = iter(todo)
+    n = (os.cpu_count() or 1) if workers is None else int(workers)
+    try:
+        if n <= 1:
+            for c in queue:
+                while (job := next_batch(c)) is not None:
+                    tallies[c.key].add(play_batch(*job, engine)); seeds += job[2]; checkpoint()
+                close(c)
+        else:
+            with ProcessPoolExecutor(max_workers=n) as pool:
+                running: Dict[Any, Cell] = {}
+                def feed() -> None:  # keep ~2 batches per worker in flight, one per cell
+                    while len(running) < 2 * n:
+                        c = next(queue, None)
+                        if c is None: return
+                        job = next_batch(c)
+                        if job is None: close(c); continue
+                        running[pool.submit(play_batch, *job, engine)] = c
+                feed()
+                while running:
+                    ready, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in ready:
+                        c = running.pop(fut); res = fut.result()
+                        tallies[c.key].add(res); seeds += res["n"]
+                        job = next_batch(c)
+                        if job is None: close(c)
+                        else: running[pool.submit(play_batch, *job, engine)] = c
+                    checkpoint(); feed()
+    finally:
+        checkpoint(force=True); sink.close()
+    if not tallies and ckpt.exists(): ckpt.unlink()  # sweep complete
+    dt = time.perf_counter() - t0
+    log(f"[batch] {finished} cells, {seeds} seeds in {dt:.1f}s ({seeds / dt if dt > 0 else 0:.0f} seeds/s) -> {out}")
+    return finished
+
+def _csv_list(s: str) -> List[str]: return [x.strip() for x in s.split(",") if x.strip()]
+
 def main() -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--seeds", type=int, default=50)
-    ap.add_argument("--quick", action="store_true")
+    ap.add_argument("--classes", type=_csv_list, default=CLASSES, help="comma-separated classes to compose teams from")
+    ap.add_argument("--size", type=int, default=2, help="fighters per team")
+    ap.add_argument("--levels", type=lambda s: [int(x) for x in _csv_list(s)], default=[1, 5, 10])
+    ap.add_argument("--vs", type=_csv_list, default=None, help="fixed away comp (default: every comp vs every comp)")
+    ap.add_argument("--ci", type=float, default=0.05, help="stop a cell at this 95%% CI half-width")
+    ap.add_argument("--min-seeds", type=int, default=40)
+    ap.add_argument("--max-seeds", type=int, default=2000)
+    ap.add_argument("--batch", type=int, default=20, help="seeds per scheduling unit")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores, 0/1 = serial)")
+    ap.add_argument("--engine", choices=("scalar", "lockstep"), default="scalar")
+    ap.add_argument("--checkpoint", type=float, default=10.0, help="seconds between checkpoints")
+    ap.add_argument("--out", default="balance_sweep.csv", help=".csv or .jsonl")
+    ap.add_argument("--quick", action="store_true", help="one level, looser CI")
     args = ap.parse_args()
     if args.quick:
-        args.seeds = min(args.seeds, 20)
-
-    # Example: mirror comp (same class set vs itself)
-    comp = ["Fighter","Ranger","Wizard","Cleric","Rogue"]  # tweak comp here per pass
-    results: List[Dict[str,Any]] = []
-    for s in range(args.seeds):
-        results.append(run_match(10_000 + s, comp, comp))
-
-    # aggregate
-    wins = sum(1 for r in results if r["winner"] == 0)
-    losses = sum(1 for r in results if r["winner"] == 1)
-    draws = len(results) - wins - losses
-    avg_k = statistics.mean((r["k_home"] + r["k_away"]) / 2 for r in results)
-    avg_turns = statistics.mean(r["turns"] for r in results)
-
-    print(f"[batch] seeds={args.seeds}  W/L/D={wins}/{losses}/{draws}  avg_kills={avg_k:.2f}  avg_turns={avg_turns:.1f}")
+        args.levels = args.levels[:1]; args.ci = max(args.ci, 0.1); args.max_seeds = min(args.max_seeds, 200)
+    if args.engine == "lockstep" and not HAVE_NUMPY:
+        ap.error("--engine lockstep needs numpy")
+    if args.vs and len(args.vs) != args.size:
+        ap.error(f"--vs has {len(args.vs)} classes, --size is {args.size}")
+    cells = sweep_cells(args.classes, args.size, args.levels, args.vs)
+    print(f"[batch] {len(cells)} cells ({len(args.classes)} classes, size {args.size}, levels {args.levels}), engine={args.engine}")
+    try:
+        sweep(cells, Path(args.out), rule=StopRule(args.ci, args.min_seeds, args.max_seeds, args.batch),
+              workers=args.workers, engine=args.engine, checkpoint_every=args.checkpoint)
+    except KeyboardInterrupt:
+        print("[batch] interrupted: progress saved, rerun the same command to resume"); return 130
     return 0
 
 if __name__ == "__main__":
     raise SystemExit(main())
-# inside tools/batch_balance.py main(), replace aggregation/prints with:
-
-    # aggregate global
-    wins = sum(1 for r in results if r["winner"] == 0)
-    losses = sum(1 for r in results if r["winner"] == 1)
-    draws = len(results) - wins - losses
-    avg_k = statistics.mean((r["k_home"] + r["k_away"]) / 2 for r in results)
-    avg_turns = statistics.mean(r["turns"] for r in results)
-    print(f"[batch] seeds={args.seeds}  W/L/D={wins}/{losses}/{draws}  avg_kills={avg_k:.2f}  avg_turns={avg_turns:.1f}")
-
-    # optional: breakdown by class presence (very coarse)
-    def class_counts(team):
-        from collections import Counter
-        return Counter(f.class_ if hasattr(f, 'class_') else getattr(f, 'class', None) for f in team.fighters)
-
-    # If you want richer per-tag/damage-type analysis, we’ll need to
-    # sample spell usage from events (once events include spell metadata).
-    # For now the global line is the main actionable output.
@@ -0,0 +1,30 @@
+# tools/bench_dice.py
+from __future__ import annotations
+import argparse, random, time
+from typing import Dict
+from engine.dice import make_dice
+
+# Compares the "randint" and "buffered" dice modes (engine.dice) on the engine's roll mix:
+# straight d20s, advantage d20s, weapon dice and smite-sized Nd6 sums. Reports ns per roll.
+
+def bench(mode: str, iters: int, seed: int = 7) -> Dict[str, float]:
+    dice = make_dice(mode, random.Random(seed)); out: Dict[str, float] = {}
+    for label, fn in (("d20", lambda: dice.d20(0)), ("d20_adv", lambda: dice.d20(1)),
+                      ("1d8", lambda: dice.sum(1, 8)), ("4d6", lambda: dice.sum(4, 6))):
+        t0 = time.perf_counter()
+        for _ in range(iters): fn()
+        out[label] = (time.perf_counter() - t0) / iters * 1e9
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iters", type=int, default=200_000)
+    args = ap.parse_args()
+    rows = {m: bench(m, args.iters) for m in ("randint", "buffered")}
+    print(f"{'roll':>8} {'randint ns':>11} {'buffered ns':>12} {'speedup':>8}")
+    for k in rows["randint"]:
+        a = rows["randint"][k]; b = rows["buffered"][k]
+        print(f"{k:>8} {a:>11.0f} {b:>12.0f} {a / b:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
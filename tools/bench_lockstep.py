@@ -0,0 +1,70 @@
+# tools/bench_lockstep.py
+from __future__ import annotations
+import argparse, math, time
+from typing import Any, Dict, List, Sequence, Tuple
+from engine.events import NullSink
+from engine.lockstep import compile_roster, run_lockstep, wilson
+from engine.model import actor_from_dict
+from engine.tbcombat import TBCombat
+from core.matchups import MAIN_HANDS as KITS
+
+# Validates engine.lockstep against the scalar engine and reports replicas per second.
+# For each matchup of the validation corpus: `--seeds` TBCombat matches (one seed each, headless,
+# no controllers) and `--replicas` lockstep replicas. Home win rates are compared with a
+# two-proportion z-test; |z| > 3 on any matchup means the two rule sets have drifted apart.
+#
+#   python -m tools.bench_lockstep --seeds 400 --replicas 20000
+
+# (home classes, away classes, level)
+CORPUS: Tuple[Tuple[Tuple[str, ...], Tuple[str, ...], int], ...] = (
+    (("Berserker",), ("Defender",), 1),
+    (("Duelist", "Duelist"), ("Berserker", "Archer"), 3),
+    (("Crusader", "Crusader", "Wizard"), ("Berserker", "Stalker", "Defender"), 5),
+    (("Crusader", "Archer", "Defender", "Duelist"), ("Stalker", "Berserker", "Wizard", "War Priest"), 8),
+)
+
+def fighter(name: str, cls: str, level: int, team_id: int, x: int) -> Dict[str, Any]:
+    """A fixed-stat fighter with its class's main hand (the same in every matchup, so classes differ only by kit)."""
+    hp = 10 + 7 * (level - 1)
+    return {"name": name, "class": cls, "level": level, "team_id": team_id, "tx": x, "ty": team_id * 6,
+            "hp": hp, "max_hp": hp, "ac": 13, "alive": True, "STR": 15, "DEX": 14, "CON": 13, "INT": 10, "WIS": 10, "CHA": 10,
+            "inventory": {"weapons": [dict(KITS[cls], id="w_0")]}, "equipped": {"main_hand_id": "w_0"}}
+
+def matchup(home: Sequence[str], away: Sequence[str], level: int) -> List[Dict[str, Any]]:
+    return ([fighter(f"H{i}", c, level, 0, i) for i, c in enumerate(home)]
+            + [fighter(f"A{i}", c, level, 1, i) for i, c in enumerate(away)])
+
+def scalar_wins(roster: List[Dict[str, Any]], seeds: int, max_rounds: int = 200) -> Tuple[int, float]:
+    """Home wins over `seeds` TBCombat matches, and matches per second."""
+    wins = 0; t0 = time.perf_counter()
+    for s in range(seeds):
+        c = TBCombat(None, None, [actor_from_dict(dict(f)) for f in roster], 8, 8, seed=10_000 + s, events=NullSink())
+        while c.winner is None and c.round <= max_rounds: c.take_turn()
+        wins += c.winner == 0
+    return wins, seeds / (time.perf_counter() - t0)
+
+def z_two(w1: int, n1: int, w2: int, n2: int) -> float:
+    p = (w1 + w2) / (n1 + n2); se = math.sqrt(p * (1 - p) * (1 / n1 + 1 / n2))
+    return 0.0 if se == 0 else (w1 / n1 - w2 / n2) / se
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seeds", type=int, default=300, help="scalar TBCombat matches per matchup")
+    ap.add_argument("--replicas", type=int, default=20_000, help="lockstep replicas per matchup")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    print(f"{'matchup':<44} {'scalar':>15} {'lockstep':>15} {'z':>6} {'scalar/s':>9} {'replicas/s':>11}")
+    worst = 0.0
+    for home, away, lvl in CORPUS:
+        roster = matchup(home, away, lvl)
+        w, rate = scalar_wins(roster, args.seeds)
+        r = run_lockstep([actor_from_dict(dict(f)) for f in roster], args.replicas, seed=args.seed,
+                         roster=compile_roster([actor_from_dict(dict(f)) for f in roster]))
+        lw = int((r.winner == 0).sum()); z = z_two(w, args.seeds, lw, r.replicas); worst = max(worst, abs(z))
+        p, lo, hi = wilson(w, args.seeds); q, qlo, qhi = r.win_rate(0)
+        label = f"L{lvl} {'/'.join(c[:3] for c in home)} v {'/'.join(c[:3] for c in away)}"
+        print(f"{label:<44} {p:>6.1%} ±{(hi - lo) / 2:>6.1%} {q:>6.1%} ±{(qhi - qlo) / 2:>6.1%} {z:>+6.2f} {rate:>9.0f} {r.replicas_per_sec:>11.0f}")
+    print(f"[lockstep] max |z| = {worst:.2f} ({'agrees' if worst <= 3 else 'DRIFT'})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# tools/bench_snapshot.py
+from __future__ import annotations
+import argparse, time
+from typing import Any, Dict, List
+from engine.tbcombat import TBCombat
+from engine.events import NullSink
+
+# Measures TBCombat.snapshot()/restore() cost for growing rosters, mid-match (damage ledgers,
+# hidden flags etc. populated), and reports microseconds per call and per actor.
+
+class _Actor(dict):
+    __getattr__ = dict.get
+    __setattr__ = dict.__setitem__
+    __delattr__ = dict.__delitem__
+
+def _roster(n: int) -> List[Any]:
+    out = []
+    for i in range(n):
+        tid = i % 2
+        out.append(_Actor({"name": f"P{i}", "class": "Defender", "level": 3, "team_id": tid,
+                           "STR": 14, "DEX": 12, "CON": 12, "INT": 10, "CHA": 10, "hp": 30, "max_hp": 30, "ac": 12,
+                           "alive": True, "tx": i // 2, "ty": tid * 5,
+                           "inventory": {"weapons": [{"id": "w_0", "name": "Longsword", "dice": "1d8", "ability": "STR"}]},
+                           "equipped": {"main_hand_id": "w_0"}}))
+    return out
+
+def bench(n_actors: int, iters: int, warm_turns: int = 40) -> Dict[str, float]:
+    cmb = TBCombat(None, None, _roster(n_actors), 16, 16, seed=7, events=NullSink())
+    for _ in range(warm_turns):
+        if cmb.winner is not None: break
+        cmb.take_turn()
+    t0 = time.perf_counter()
+    for _ in range(iters): snap = cmb.snapshot()
+    t1 = time.perf_counter()
+    for _ in range(iters): cmb.restore(snap)
+    t2 = time.perf_counter()
+    snap_us = (t1 - t0) / iters * 1e6; rest_us = (t2 - t1) / iters * 1e6
+    return {"actors": n_actors, "snapshot_us": snap_us, "restore_us": rest_us,
+            "snapshot_us_per_actor": snap_us / n_actors, "restore_us_per_actor": rest_us / n_actors}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iters", type=int, default=5000)
+    ap.add_argument("--sizes", type=str, default="2,10,20,50")
+    args = ap.parse_args()
+    print(f"{'actors':>6} {'snap us':>9} {'restore us':>11} {'snap/actor':>11} {'restore/actor':>14}")
+    for n in (int(s) for s in args.sizes.split(",") if s):
+        r = bench(n, args.iters)
+        print(f"{r['actors']:>6} {r['snapshot_us']:>9.2f} {r['restore_us']:>11.2f} "
+              f"{r['snapshot_us_per_actor']:>11.2f} {r['restore_us_per_actor']:>14.2f}")
+
+if __name__ == "__main__":
+    main()
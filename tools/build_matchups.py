@@ -0,0 +1,96 @@
+# tools/build_matchups.py
+from __future__ import annotations
+import argparse, random, sys, time
+from typing import List, Sequence, Tuple
+from core.matchups import (LEVELS, MATCHUP_CLASSES, build_matrix, load_matrix, matrix_path,
+                           rules_fingerprint, standard_fighter)
+from engine.lockstep import HAVE_NUMPY
+
+# Builds and queries the matchup matrix (core.matchups) for the current rules fingerprint.
+#
+#   python -m tools.build_matchups build --levels 1-20 --seeds 200 --workers 8    # incremental: only missing cells
+#   python -m tools.build_matchups query Berserker 5 Wizard 7
+#   python -m tools.build_matchups teams --size 3 --samples 40                    # decomposition vs direct sims
+
+def _levels(s: str) -> List[int]:
+    out: List[int] = []
+    for part in s.split(","):
+        a, _, b = part.partition("-")
+        out.extend(range(int(a), int(b or a) + 1))
+    return out
+
+def _bar(done: int, total: int) -> None:
+    if done == total or done % 200 == 0:
+        sys.stdout.write(f"\r[matchups] {done}/{total} cells"); sys.stdout.flush()
+        if done == total: sys.stdout.write("\n")
+
+def cmd_build(args) -> None:
+    t0 = time.perf_counter()
+    m = build_matrix(args.classes, args.levels, seeds=args.seeds, workers=args.workers, engine=args.engine, progress=_bar)
+    print(f"[matchups] {m.built()} cells built ({time.perf_counter() - t0:.1f}s) -> {matrix_path(m.fingerprint)}")
+
+def cmd_query(args) -> None:
+    m = load_matrix(); r = m.record(args.a, args.la, args.b, args.lb)
+    if r is None: print(f"[matchups] {args.a} L{args.la} vs {args.b} L{args.lb}: not built"); return
+    n, wa, wb = r
+    print(f"{args.a} L{args.la} vs {args.b} L{args.lb}: p={m.win_prob(args.a, args.la, args.b, args.lb):.3f}  "
+          f"({wa}W {wb}L {n - wa - wb}D of {n})")
+
+def direct_win_prob(home: Sequence[Tuple[str, int]], away: Sequence[Tuple[str, int]], seeds: int) -> float:
+    """Home win rate (draws as half) of the team matchup, played out with standard fighters."""
+    from engine.model import actor_from_dict
+    roster = ([standard_fighter(c, lv, 0, f"H{i}") for i, (c, lv) in enumerate(home)]
+              + [standard_fighter(c, lv, 1, f"A{i}") for i, (c, lv) in enumerate(away)])
+    if HAVE_NUMPY:
+        from engine.lockstep import run_lockstep
+        r = run_lockstep([actor_from_dict(f) for f in roster], seeds, seed=7)
+        w, l = int((r.winner == 0).sum()), int((r.winner == 1).sum())
+    else:
+        from engine.events import NullSink
+        from engine.tbcombat import TBCombat
+        w = l = 0
+        for s in range(seeds):
+            c = TBCombat(None, None, [actor_from_dict(dict(f)) for f in roster], 8, 8, seed=s, events=NullSink())
+            while c.winner is None and c.round <= 200: c.take_turn()
+            w += c.winner == 0; l += c.winner == 1
+    return (w + 0.5 * (seeds - w - l)) / seeds
+
+def cmd_teams(args) -> None:
+    m = load_matrix(); rng = random.Random(args.seed); errs = []
+    classes = [c for c in args.classes if c in m.classes]
+    for _ in range(args.samples):
+        lv = rng.choice(args.levels)
+        home = [(rng.choice(classes), lv) for _ in range(args.size)]
+        away = [(rng.choice(classes), lv) for _ in range(args.size - rng.randint(0, 1 if args.size > 1 else 0))]
+        est = m.team_win_prob(home, away)
+        if est is None: continue
+        errs.append(abs(est - direct_win_prob(home, away, args.seeds)))
+    if not errs: print("[matchups] no built cells cover the sampled teams (run build first)"); return
+    errs.sort()
+    print(f"[matchups] teams of {args.size}: {len(errs)} samples  MAE={sum(errs) / len(errs):.3f}  "
+          f"p90={errs[int(0.9 * (len(errs) - 1))]:.3f}  max={errs[-1]:.3f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--classes", type=lambda s: [c.strip() for c in s.split(",")], default=list(MATCHUP_CLASSES))
+    b.add_argument("--levels", type=_levels, default=list(LEVELS), help="e.g. 1-20 or 1,5,10-12")
+    b.add_argument("--seeds", type=int, default=200, help="games per cell")
+    b.add_argument("--workers", type=int, default=None, help="processes (default: all cores, 0/1 = serial)")
+    b.add_argument("--engine", choices=("scalar", "lockstep"), default="lockstep" if HAVE_NUMPY else "scalar")
+    q = sub.add_parser("query")
+    q.add_argument("a"); q.add_argument("la", type=int); q.add_argument("b"); q.add_argument("lb", type=int)
+    t = sub.add_parser("teams")
+    t.add_argument("--classes", type=lambda s: [c.strip() for c in s.split(",")], default=list(MATCHUP_CLASSES))
+    t.add_argument("--levels", type=_levels, default=[1, 5, 10])
+    t.add_argument("--size", type=int, default=3)
+    t.add_argument("--samples", type=int, default=40)
+    t.add_argument("--seeds", type=int, default=2000, help="direct games per sampled matchup")
+    t.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    print(f"[matchups] rules {rules_fingerprint()[:16]}")
+    {"build": cmd_build, "query": cmd_query, "teams": cmd_teams}[args.cmd](args)
+
+if __name__ == "__main__":
+    main()
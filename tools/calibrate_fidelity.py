@@ -0,0 +1,74 @@
+# tools/calibrate_fidelity.py
+from __future__ import annotations
+import argparse, random, time
+from typing import Any, Dict, List, Optional
+from core.career import Career
+from core.matchups import MAIN_HANDS as KITS   # main hand per class (core.classes.CLASS_STARTING_KIT)
+from core.sim import FIDELITY_FULL, FIDELITY_REDUCED, FIDELITY_SURROGATE, FixtureJob, _with_fidelity, drift_report, run_fixtures, week_jobs
+from core.surrogate import SURROGATE_PATH, fit_surrogate, load_surrogate
+
+# Fits the surrogate tier of core.sim and reports how far the cheaper tiers drift from the full
+# engine. Fixtures come from synthetic leagues: random classes (starting main-hand weapon), stats,
+# levels and club Elo, so the features the surrogate reads actually vary.
+#
+#   python -m tools.calibrate_fidelity fit --fixtures 400          # writes data/surrogate.json
+#   python -m tools.calibrate_fidelity report --fixtures 200       # drift of reduced + surrogate
+
+def _fighter(rng: random.Random, pid: int) -> Dict[str, Any]:
+    cls = rng.choice(sorted(KITS)); lvl = rng.randint(1, 8)
+    w = dict(KITS[cls], id="w_0"); hp = 8 + lvl * rng.randint(4, 8)
+    return {"pid": pid, "name": f"{cls[:3]}{pid}", "class": cls, "level": lvl, "hp": hp, "max_hp": hp,
+            "ac": rng.randint(10, 17), "alive": True,
+            **{k: rng.randint(8, 18) for k in ("STR", "DEX", "CON", "INT", "WIS", "CHA")},
+            "inventory": {"weapons": [w]}, "equipped": {"main_hand_id": "w_0"}}
+
+def synthetic_league(seed: int, teams: int = 6, size: int = 4) -> Career:
+    """A league of random rosters and club ratings, with no user club (every fixture is AI)."""
+    rng = random.Random(seed)
+    car = Career.new(seed=seed, n_teams=teams, team_size=size, user_team_id=None)
+    for t in car.teams:
+        t["fighters"] = [_fighter(rng, p) for p in range(size - rng.randint(0, 1))]
+    clubs = car.reputation.setdefault("clubs", {}) if isinstance(car.reputation, dict) else {}
+    for t in car.teams: clubs[str(t["tid"])] = 1500.0 + rng.uniform(-200, 200)
+    return car
+
+def sample_jobs(n: int, seed: int) -> List[FixtureJob]:
+    """`n` surrogate-tier jobs (they carry features; run them at any tier with drift_report)."""
+    jobs: List[FixtureJob] = []; s = seed
+    while len(jobs) < n:
+        car = synthetic_league(s); s += 1
+        for w in range(len(car.fixtures_by_week)):
+            jobs.extend(week_jobs(car, w, fidelity=FIDELITY_SURROGATE))
+    return jobs[:n]
+
+def fit(n: int, seed: int, workers: Optional[int], out: str) -> None:
+    jobs = sample_jobs(n, seed); t0 = time.perf_counter()
+    full = run_fixtures([_with_fidelity(j, FIDELITY_FULL) for j in jobs], workers=workers)
+    model = fit_surrogate((j.features, r["k_home"], r["k_away"]) for j, r in zip(jobs, full, strict=True))
+    model.save(out); load_surrogate.cache_clear()
+    print(f"[fit] fixtures={len(jobs)}  engine={time.perf_counter() - t0:.1f}s  classes={len(model.classes)}  -> {out}")
+
+def report(n: int, seed: int, workers: Optional[int], tiers: List[str]) -> None:
+    jobs = sample_jobs(n, seed)
+    print(f"{'tier':>10} {'kills_mae':>9} {'bias':>6} {'agree':>6} {'home_win':>8} {'tvd':>6} {'speedup':>8}")
+    for tier in tiers:
+        r = drift_report(jobs, tier, workers=workers)
+        print(f"{tier:>10} {r['kills_mae']:>9.2f} {r['kills_bias']:>+6.2f} {r['winner_agree']:>6.1%} "
+              f"{r['home_win_diff']:>+8.1%} {r['kills_tvd']:>6.3f} {r['speedup']:>7.1f}x")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=("fit", "report"))
+    ap.add_argument("--fixtures", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=0, help="processes (0 = serial)")
+    ap.add_argument("--tier", action="append", choices=(FIDELITY_REDUCED, FIDELITY_SURROGATE))
+    ap.add_argument("--out", default=str(SURROGATE_PATH))
+    args = ap.parse_args()
+    if args.cmd == "fit":
+        fit(args.fixtures, args.seed, args.workers, args.out)
+    else:  # held-out seeds by default: fit on --seed 1, report on another
+        report(args.fixtures, args.seed, args.workers, args.tier or [FIDELITY_REDUCED, FIDELITY_SURROGATE])
+
+if __name__ == "__main__":
+    main()
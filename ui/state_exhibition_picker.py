@@ -31,12 +31,6 @@ try:
 except Exception:
     MatchState = None
 
-# Optional OI weights
-try:
-    from engine.ai import weights as OI
-except Exception:
-    OI = None
-
 def _team_name(t: Dict[str, Any]) -> str:
     return t.get("name", f"Team {t.get('tid', t.get('id','?'))}")
 
@@ -190,17 +184,8 @@ class ExhibitionPickerState:
     def _start(self):
         if self.sel_home == self.sel_away or MatchState is None:
             return
-        # Apply OI if enabled
-        if self.use_oi and OI is not None:
-            oi_map = {
-                "focus_low_hp": bool(self.oi_focus_low_hp),
-                "prefer_roles": dict(self.oi_prefer_roles),
-            }
-            OI.set_oi_map(oi_map)
-        elif OI is not None:
-            OI.clear_oi()
-
-        # Build a friendly fixture dict and push MatchState
+        # Build a friendly fixture dict and push MatchState; OI rides along with the fixture so this
+        # match gets its own instructions (TBCombat(oi=...)) instead of a process-wide setting
         fixture = {
             "week": getattr(self.career, "week", 1),
             "home_id": self.sel_home,
@@ -208,6 +193,8 @@ class ExhibitionPickerState:
             "played": False,
             "k_home": 0, "k_away": 0, "winner": None,
             "comp_kind": "friendly",
+            "oi": ({"focus_low_hp": bool(self.oi_focus_low_hp), "prefer_roles": dict(self.oi_prefer_roles)}
+                   if self.use_oi else None),
         }
         try:
             self.app.push_state(MatchState(self.app, self.career, fixture=fixture))
@@ -6,6 +6,8 @@ from typing import Any, Dict, List, Optional, Tuple
 from engine.tbcombat import TBCombat, Team
 from engine.constants import GRID_COLS, GRID_ROWS
 from engine.team_tactics import load_match_tactics, TacticsController
+from engine.events import RingSink
+from engine.replay import MatchRecorder, Replayer
 
 # Optional helpers if present in your project; all of these calls are guarded.
 # They make it easier to place units and/or pull teams from a career fixture.
@@ -60,7 +62,7 @@ class MatchState:
     Match viewer:
       - Grid board with colored unit dots, inline HP bars, short names.
       - Scrollable log (last N rows shown).
-      - Controls: Space=Play/Pause, N=Next Turn, R=Next Round, Esc/Backspace=Back.
+      - Controls: Space=Play/Pause, N=Next Turn, R=Next Round, B=Back a Turn, Esc/Backspace=Back.
       - Resizes with window; the board expands to fill remaining space.
       - Patch G: reads fixture['tactics'] and attaches TacticsControllers.
     """
@@ -76,6 +78,9 @@ class MatchState:
         self.teamB_info: Any = None
 
         self.combat: Optional[TBCombat] = None
+        # intent log of the match (seed + intents) and a replayer built from it for scrubbing
+        self.recorder: Optional[MatchRecorder] = None
+        self.replayer: Optional[Replayer] = None
         self.playing: bool = False
         self.tps: float = 8.0  # "turns per second" while playing
         self._accum: float = 0.0
@@ -150,7 +155,9 @@ class MatchState:
             else:
                 seed = None
 
-        self.combat = TBCombat(teamA, teamB, fighters, GRID_COLS, GRID_ROWS, seed=seed)
+        # the log panel only ever shows the last SHORT_LOG_ROWS events
+        self.combat = TBCombat(teamA, teamB, fighters, GRID_COLS, GRID_ROWS, seed=seed,
+                               events=RingSink(SHORT_LOG_ROWS), oi=self.fixture.get("oi") or {})
 
         # ---- Patch G: tactics -> controllers wiring ----
         mt = load_match_tactics(self.fixture)
@@ -161,6 +168,9 @@ class MatchState:
         if tt_away:
             self.combat.controllers[1] = TacticsController(tt_away)
         # -----------------------------------------------
+        self.recorder = MatchRecorder(self.combat)
+        # scrubs this combat in place: the fighters, controllers and log stay the ones built above
+        self.replayer = Replayer(self.recorder.record, combat=self.combat)
 
         self.playing = False
         self._accum = 0.0
@@ -213,6 +223,11 @@ class MatchState:
             if event.key == pygame.K_n:
                 # next turn
                 self._step_turns(1)
+            if event.key == pygame.K_b:
+                # back one turn (rebuilt from the intent log)
+                if self.combat:
+                    self.playing = False
+                    self._seek_turn(self.combat.turn_no - 1)
             if event.key == pygame.K_r:
                 # next round (advance until round increments or battle ends)
                 if self.combat:
@@ -327,6 +342,8 @@ class MatchState:
             return f"— Round {e.get('round', '?')} —"
         if t == "turn_start":
             return f"{e.get('actor', '?')} starts turn"
+        if t == "initiative":
+            return f"{e.get('actor', '?')} rolls {e.get('roll', '?')} for initiative"
         if t == "move_step":
             x, y = e.get("to", (0, 0))
             return f"{e.get('actor', '?')} moved to ({x},{y})"
@@ -375,6 +392,7 @@ class MatchState:
             "[Space] Play/Pause",
             "[N] Next Turn",
             "[R] Next Round",
+            "[B] Back Turn",
             "[Esc/Backspace] Back",
         ]
         x = rect.x + 10
@@ -384,6 +402,12 @@ class MatchState:
             y += 18
 
     # ---------- stepping helpers ----------
+    def _seek_turn(self, n: int):
+        if not self.combat or not self.replayer:
+            return
+        # in place: turns already played replay from the record, later ones are decided (and recorded) live
+        self.combat = self.replayer.seek(max(0, int(n)))
+
     def _step_turns(self, n: int):
         if not self.combat or self.combat.winner is not None:
             return
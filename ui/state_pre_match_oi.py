@@ -24,11 +24,6 @@ except Exception:
     def panel(surface, rect, color=(30,30,38)):
         pygame.draw.rect(surface, color, rect, border_radius=10)
 
-try:
-    from engine.ai import weights as OI
-except Exception:
-    OI = None
-
 try:
     from ui.state_match import MatchState
 except Exception:
@@ -111,14 +106,11 @@ class PreMatchOIState:
         draw_text(screen, label, x + 26, y - 2, size=18)
 
     def _start(self):
-        if self.use_oi and OI is not None:
-            OI.set_oi_map({
-                "focus_low_hp": bool(self.focus_low_hp),
-                "prefer_roles": dict(self.prefer_roles),
-            })
-        elif OI is not None:
-            OI.clear_oi()
-        self.app.push_state(MatchState(self.app, self.career, fixture=self.fixture))
+        # per-match OI: travels with the fixture to TBCombat(oi=...)
+        fixture = dict(self.fixture)
+        fixture["oi"] = ({"focus_low_hp": bool(self.focus_low_hp), "prefer_roles": dict(self.prefer_roles)}
+                         if self.use_oi else None)
+        self.app.push_state(MatchState(self.app, self.career, fixture=fixture))
 
     def _back(self):
         self.app.pop_state()
@@ -1,12 +1,11 @@
 # ui/state_season_hub.py
 from __future__ import annotations
-import pygame, random, traceback
+import pygame, traceback
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
-# engine bits
-from engine.constants import GRID_COLS, GRID_ROWS
-from engine import TBCombat, Team, fighter_from_dict, layout_teams_tiles
+from core.config import SIM_WORKERS
+from core.sim import FixtureJob, fixture_job, rivals, run_fixtures
 
 # screens we navigate to
 from ui.state_match import MatchState
@@ -58,22 +57,6 @@ def _team_name(career, tid: int) -> str:
         pass
     return f"Team {tid}"
 
-def _fighters_for_team(career, tid: int) -> List[Dict[str,Any]]:
-    ts = getattr(career, "teams", {})
-    if isinstance(ts, dict):
-        t = ts.get(tid, {})
-        return list(t.get("fighters", []))
-    for t in ts or []:
-        if int(t.get("tid", -1)) == tid:
-            return list(t.get("fighters", []))
-    return []
-
-def _top5(lst: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
-    try:
-        return sorted(lst, key=lambda p: int(p.get("ovr", p.get("OVR", 60))), reverse=True)[:5]
-    except Exception:
-        return lst[:5]
-
 class SeasonHubState:
     def __init__(self, app, career):
         self.app = app
@@ -178,13 +161,12 @@ class SeasonHubState:
 
     def _sim_week(self):
         """
-        Simulate all fixtures for the current week EXCEPT the user's match, using
-        the same 16×16 grid the viewer uses. Results are written back to career.
+        Simulate all fixtures for the current week EXCEPT the user's match, as
+        core.sim.simulate_week_ai would. Results are written back to career.
         """
         wk = getattr(self.career, "week", getattr(self.career, "date", {}).get("week", 1))
         season = self.career.date["season"] if isinstance(self.career.date, dict) else getattr(self.career, "season", 1)
         user_tid = int(getattr(self.career, "user_tid", getattr(self.career, "user_team_id", 0)))
-        rng = random.Random(getattr(self.career, "seed", 0) ^ (wk * 7919))
 
         # Collect fixtures list for this week
         fixtures: List[Dict[str,Any]] = []
@@ -207,40 +189,24 @@ class SeasonHubState:
                     dd["week"] = int(dd.get("week", wk))
                     fixtures.append(dd)
 
-        # Sim each AI-vs-AI match
+        # Jobs built by core.sim (fixture_seed streams, the same rosters and grid as simulate_week_ai),
+        # so a fixture plays the same whichever entry point sims the week; results in fixture order
+        jobs: List[FixtureJob] = []; ai_fixtures: List[Dict[str,Any]] = []
+        rival_ids = rivals(self.career)
         for fx in fixtures:
             h = int(fx["home_id"]); a = int(fx["away_id"])
             if h == user_tid or a == user_tid:
                 # skip the user's playable match; they'll watch/play it via Play
                 continue
+            jobs.append(fixture_job(self.career, len(jobs), wk - 1, h, a, rival_ids=rival_ids))
+            ai_fixtures.append(fx)
 
-            # Build fighters (top 5) for both teams
-            f_home_src = _top5(_fighters_for_team(self.career, h))
-            f_away_src = _top5(_fighters_for_team(self.career, a))
-            f_home = [fighter_from_dict({**fd, "team_id": 0}) for fd in f_home_src]
-            f_away = [fighter_from_dict({**fd, "team_id": 1}) for fd in f_away_src]
-            fighters = f_home + f_away
-
-            # Layout on a 16x16 grid
-            layout_teams_tiles(fighters, GRID_COLS, GRID_ROWS)
-
-            # Create combat on 16x16 and auto-resolve
-            tA = Team(0, _team_name(self.career, h))
-            tB = Team(1, _team_name(self.career, a))
-            seed = rng.randint(0, 10_000_000)
-            combat = TBCombat(tA, tB, fighters, GRID_COLS, GRID_ROWS, seed=seed)
-
-            guard = 0
-            while combat.winner is None and guard < 2000:
-                combat.take_turn()
-                guard += 1
-
-            # Record result
-            home_kos = len([f for f in combat.fighters if getattr(f, "team_id", 0) == 1 and not getattr(f, "alive", True)])
-            away_kos = len([f for f in combat.fighters if getattr(f, "team_id", 0) == 0 and not getattr(f, "alive", True)])
-            if combat.winner == 0:   winner = "home"
-            elif combat.winner == 1: winner = "away"
-            else:                    winner = "draw"
+        for fx, r in zip(ai_fixtures, run_fixtures(jobs, workers=SIM_WORKERS), strict=True):
+            h = int(fx["home_id"]); a = int(fx["away_id"])
+            home_kos = r["k_home"]; away_kos = r["k_away"]
+            if r["engine_winner"] == 0:   winner = "home"
+            elif r["engine_winner"] == 1: winner = "away"
+            else:                         winner = "draw"
 
             try:
                 if hasattr(self.career, "record_result") and callable(self.career.record_result):